@@ -1,12 +1,14 @@
 # app/agents/chatbot_agent.py
 import re
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 import asyncio
 import logging
 
 from app.clients.mistralai_client import MistralChatClient
+from app.clients.cohere_client import CohereClient
+from app.clients.llm_gateway import LLMGateway
 from app.services.summarize_video import summarize_video_service
 from app.services.rag_service import RAGService
 from app.services.sql_rag_service import SQLRAGService
@@ -39,12 +41,12 @@ class ChatbotService:
         self.advanced_planner = AdvancedLessonPlannerAgent()
 
         # --- Core dependencies ---
-        llm_client = MistralChatClient()
+        llm_gateway = LLMGateway([("mistral", MistralChatClient()), ("cohere", CohereClient())])
         google_calendar = GoogleCalendarService()
 
         # --- Calendar Agent (fixed initialization) ---
         self.plan_calendar_agent = PlanCalendarAgent(
-            llm=llm_client,
+            llm=llm_gateway,
             chat_repo=self.chat_repo,  # pass ChatHistoryRepository instance
             google_calendar=google_calendar,
         )
@@ -152,14 +154,16 @@ class ChatbotService:
         self.chat_repo.save_message(user_id, "assistant", response)
         return response
 
+    def rag_response_stream(self, user_id: str, message: str) -> AsyncIterator[str]:
+        """Streamed RAG answer; RAGService saves the exchange once the stream ends."""
+        return self.rag_service.chat_stream(user_input=message, user_id=user_id)
+
     async def sql_rag_response(self, user_id: str, query_embedding: list[float], k: int = 5) -> str:
         self.chat_repo.save_message(user_id, "user", f"[SQL RAG QUERY] {query_embedding}")
 
         try:
-            docs = self.sql_rag_service.get_similar_documents(query_embedding=query_embedding, k=k)
-            if asyncio.iscoroutine(docs):
-                docs = await docs
-            response = " ".join(str(d) for d in docs) if isinstance(docs, list) else str(docs)
+            docs = self.sql_rag_service.get_similar_documents(query_embedding=query_embedding, k=k, user_id=user_id)
+            response = "\n\n".join(f"[{d.filename}] {d.content}" for d in docs)
         except Exception as e:
             logger.error(f"[ChatbotService] SQL RAG failed: {e}")
             response = "[SQL RAG ERROR] Unable to fetch documents."
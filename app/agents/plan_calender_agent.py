@@ -33,8 +33,7 @@ class PlanCalendarAgent:
         - Respond ONLY with valid JSON.
         """
 
-        llm_response = await self.llm.chat(user=user_text, system=system_prompt)
-        raw_answer = llm_response.answer.strip()
+        raw_answer = (await self.llm.generate(user_text, system=system_prompt)).strip()
 
         try:
             plan = json.loads(raw_answer)
@@ -0,0 +1,104 @@
+# app/cache/embedding_cache.py
+import logging
+from array import array
+from functools import lru_cache
+from typing import List, Optional
+
+from app.cache.lru import LRUCache
+from app.cache.sqlite_store import SQLiteKVStore
+from app.core.config import settings
+from app.utils.content_hash import hash_text
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode_vector(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (model name, normalized text hash).
+
+    Two tiers:
+    - in-process LRU for hot texts
+    - local SQLite file so cached vectors survive restarts
+    """
+
+    def __init__(self, maxsize: int = 50_000, path: Optional[str] = None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = SQLiteKVStore(path, table="embeddings") if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return f"{model}:{hash_text(text)}"
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors aligned with `texts`; None marks a miss."""
+        keys = [self.make_key(model, t) for t in texts]
+        results: List[Optional[List[float]]] = [self.memory.get(k) for k in keys]
+
+        missing = [k for k, r in zip(keys, results) if r is None]
+        from_disk = self.disk.get_many(list(set(missing))) if self.disk and missing else {}
+
+        for i, key in enumerate(keys):
+            if results[i] is not None:
+                self.memory_hits += 1
+            elif key in from_disk:
+                vector = _decode_vector(from_disk[key])
+                self.memory.set(key, vector)
+                results[i] = vector
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+        return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def set_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        items = []
+        for text, vector in zip(texts, vectors):
+            key = self.make_key(model, text)
+            vector = list(vector)
+            self.memory.set(key, vector)
+            items.append((key, _encode_vector(vector)))
+        if self.disk:
+            try:
+                self.disk.set_many(items)
+            except Exception as e:
+                # The disk tier is an optimization; never fail ingestion because of it
+                logger.warning(f"Failed to persist {len(items)} embeddings to disk cache: {e}")
+
+    def set(self, model: str, text: str, vector: List[float]) -> None:
+        self.set_many(model, [text], [vector])
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache shared by every EmbeddingService instance."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache(
+        maxsize=settings.EMBEDDING_CACHE_MAX_ITEMS,
+        path=settings.EMBEDDING_CACHE_PATH or None,
+    )
@@ -0,0 +1,91 @@
+# app/cache/llm_response_cache.py
+import hashlib
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.cache.lru import LRUCache
+from app.cache.sqlite_store import SQLiteKVStore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache of LLM answers keyed by (provider, model, system prompt, prompt,
+    sampling params), for call sites that send byte-identical prompts.
+
+    Two tiers, like EmbeddingCache:
+    - in-process LRU (per-entry TTL)
+    - optional local SQLite file, entries stored with their wall-clock expiry
+    """
+
+    def __init__(self, maxsize: int = 5_000, path: Optional[str] = None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = SQLiteKVStore(path, table="llm_responses") if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        provider: str, model: str, prompt: str, system: Optional[str] = None, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps(
+            [provider, model, system or "", prompt, params or {}], sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.disk:
+            blob = self.disk.get_many([key]).get(key)
+            if blob is not None:
+                entry = json.loads(blob)
+                remaining = entry["expires_at"] - time.time()
+                if remaining > 0:
+                    self.memory.set(key, entry["value"], ttl=remaining)
+                    self.disk_hits += 1
+                    return entry["value"]
+                self.disk.delete(key)
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk:
+            entry = json.dumps({"value": value, "expires_at": time.time() + ttl}, ensure_ascii=False)
+            try:
+                self.disk.set_many([(key, entry.encode("utf-8"))])
+            except Exception as e:
+                # The disk tier is an optimization; never fail a request because of it
+                logger.warning(f"Failed to persist LLM response to disk cache: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide LLM response cache shared by every LLMGateway."""
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    return LLMResponseCache(
+        maxsize=settings.LLM_CACHE_MAX_ITEMS,
+        path=settings.LLM_CACHE_PATH or None,
+    )
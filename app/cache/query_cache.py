@@ -0,0 +1,86 @@
+# app/cache/query_cache.py
+import asyncio
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.cache.lru import LRUCache
+from app.core.config import settings
+
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.]+$")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a student question: NFKC, case-folded, collapsed
+    whitespace, no trailing ?/!/. so "What is backpropagation?" and
+    "what is  backpropagation" share one entry.
+    """
+    text = " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+class QueryEmbeddingCache:
+    """
+    LRU + TTL memo of query embeddings, keyed by (model, normalized query).
+
+    Concurrent misses for the same question share a single provider call.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: Optional[float] = 3600):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(model: str, query: str) -> str:
+        return f"{model}:{normalize_query(query)}"
+
+    async def get_or_compute(
+        self,
+        model: str,
+        query: str,
+        compute: Callable[[], Awaitable[List[float]]],
+    ) -> List[float]:
+        key = self.make_key(model, query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            vector = await compute()
+            self.cache.set(key, vector)
+            future.set_result(vector)
+            return vector
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """Process-wide query-embedding memo shared by every EmbeddingService instance."""
+    if not settings.QUERY_CACHE_ENABLED:
+        return None
+    return QueryEmbeddingCache(
+        maxsize=settings.QUERY_CACHE_MAX_ITEMS,
+        ttl=settings.QUERY_CACHE_TTL_SECONDS or None,
+    )
@@ -0,0 +1,159 @@
+# app/cache/semantic_cache.py
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.cache.lru import LRUCache
+from app.core.config import settings
+
+
+_FOLLOW_UP_WORDS = frozenset(
+    "it its that this these those they them their he she him her his above previous again same else".split()
+)
+_FOLLOW_UP_OPENERS = ("and ", "but ", "so ", "also ", "what about", "how about")
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    Whether `question` likely refers back to the conversation ("and the
+    second one?", "explain it again"). Errs towards yes: a follow-up only
+    costs a cache miss, a false standalone could reuse a wrong answer.
+    """
+    text = question.strip().lower()
+    if text.startswith(_FOLLOW_UP_OPENERS):
+        return True
+    words = re.findall(r"[a-z']+", text)
+    return len(words) < 3 or any(word in _FOLLOW_UP_WORDS for word in words)
+
+
+def fingerprint_chunks(chunk_ids: Iterable[int], history: Sequence[str] = ()) -> str:
+    """
+    Fingerprint of the retrieved chunk ids (order-insensitive) and, for
+    follow-up questions, the conversation history in the prompt (in order):
+    a follow-up can only reuse an answer given in the same conversation state.
+    """
+    digest = hashlib.sha1(",".join(str(i) for i in sorted(chunk_ids)).encode("utf-8"))
+    for turn in history:
+        digest.update(b"\x00" + turn.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _UserAnswers:
+    """One user's cached answers: entry id -> (unit query vector, fingerprint, answer, expires_at)."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[int, Tuple[np.ndarray, str, str, float]]" = OrderedDict()
+        self.next_id = 0
+
+
+class SemanticAnswerCache:
+    """
+    Semantic cache for RAG answers.
+
+    A stored answer is reused when a new question from the same user
+    - retrieves exactly the same chunks, with the same conversation history
+      if it is a follow-up question (fingerprint match), and
+    - has a query embedding with cosine similarity >= `threshold`.
+
+    Entries expire after `ttl` seconds, each user keeps at most
+    `max_entries_per_user` (LRU), and `invalidate_user` drops everything for
+    a user whose document set changed. The cache is per process; the chunk
+    fingerprint and TTL bound staleness across worker processes.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl: float = 900,
+        max_entries_per_user: int = 256,
+        max_users: int = 10_000,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries_per_user = max_entries_per_user
+        self._users = LRUCache(maxsize=max_users)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, user_id: str, query_vector, fingerprint: str) -> Optional[str]:
+        user = self._users.get(user_id)
+        if user is None:
+            self.misses += 1
+            return None
+
+        query = self._unit(query_vector)
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in user.entries.items() if e[3] <= now]
+            for k in expired:
+                del user.entries[k]
+
+            candidates = [(k, e) for k, e in user.entries.items() if e[1] == fingerprint]
+            if candidates:
+                # One matrix-vector product over every candidate
+                sims = np.stack([e[0] for _, e in candidates]) @ query
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    user.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+
+        self.misses += 1
+        return None
+
+    def store(self, user_id: str, query_vector, fingerprint: str, answer: str) -> None:
+        user = self._users.get(user_id)
+        if user is None:
+            user = _UserAnswers()
+            self._users.set(user_id, user)
+
+        with self._lock:
+            user.entries[user.next_id] = (
+                self._unit(query_vector), fingerprint, answer, time.monotonic() + self.ttl
+            )
+            user.next_id += 1
+            while len(user.entries) > self.max_entries_per_user:
+                user.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a user's answers, e.g. after their uploaded documents changed."""
+        if self._users.pop(user_id) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "users": len(self._users),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> Optional[SemanticAnswerCache]:
+    """Process-wide semantic answer cache shared by every RAGService instance."""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticAnswerCache(
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries_per_user=settings.SEMANTIC_CACHE_MAX_ENTRIES_PER_USER,
+        max_users=settings.SEMANTIC_CACHE_MAX_USERS,
+    )
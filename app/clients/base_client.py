@@ -1,15 +1,56 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
+
+from app.utils.batching import map_batches
 
 class LLMClient(ABC):
     """Interface for all LLM clients."""
 
+    # Max texts per provider embedding request; subclasses override with the provider's limit
+    max_embed_batch_size: int = 96
+
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text from the LLM provider."""
         pass
 
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Yield the completion as text deltas while it is generated.
+        Default yields the whole `generate` result once; providers with a
+        streaming endpoint override this.
+        """
+        yield await self.generate(prompt, **kwargs)
+
     @abstractmethod
     async def embed(self, text: str, **kwargs) -> Any:
         """Generate embeddings from the LLM provider."""
         pass
+
+    async def embed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Embed several texts in a single provider request.
+        Default falls back to one `embed` call per text; providers with a
+        native batch endpoint override this.
+        """
+        return [await self.embed(text, **kwargs) for text in texts]
+
+    async def embed_many(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        max_concurrency: int = 4,
+        **kwargs,
+    ) -> List[List[float]]:
+        """
+        Embed any number of texts by packing them into provider-sized batches
+        and running up to `max_concurrency` batches concurrently.
+        Output order matches the input order.
+        """
+        size = min(batch_size or self.max_embed_batch_size, self.max_embed_batch_size)
+        return await map_batches(
+            lambda batch: self.embed_batch(list(batch), **kwargs),
+            texts,
+            batch_size=size,
+            max_concurrency=max_concurrency,
+        )
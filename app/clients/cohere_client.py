@@ -2,13 +2,18 @@
 import cohere
 import logging
 import asyncio
+from typing import List
 from app.clients.base_client import LLMClient
+from app.clients.rate_limiter import get_rate_limiter
 from app.core.config import settings
+from app.utils.chunker import count_tokens
 
 logger = logging.getLogger(__name__)
 
 
 class CohereClient(LLMClient):
+    max_embed_batch_size = 96  # Cohere embed API limit per request
+
     def __init__(self):
         self.api_key = settings.COHERE_API_KEY
         if not self.api_key:
@@ -16,6 +21,7 @@ class CohereClient(LLMClient):
 
         self.client = cohere.Client(self.api_key)
         self.embedding_model = "embed-english-light-v2.0"  # 1536-dim
+        self.limiter = get_rate_limiter("cohere")
         logger.info(f"CohereClient initialized with embedding model {self.embedding_model}")
 
     async def generate(self, prompt: str, **kwargs) -> str:
@@ -23,14 +29,19 @@ class CohereClient(LLMClient):
         Use Cohere Chat API (replacement for deprecated Generate API).
         """
         try:
-            # Run in threadpool to avoid blocking
-            response = await asyncio.to_thread(
-                self.client.chat,
-                model=kwargs.get("model", "command-r7b-12-2024"),  # latest recommended chat model
-                message=prompt,
-                temperature=kwargs.get("temperature", 0.7),
-                max_tokens=kwargs.get("max_tokens", 200),
-            )
+            extra = {"preamble": kwargs["system"]} if kwargs.get("system") else {}
+            max_tokens = kwargs.get("max_tokens", 200)
+            tokens = count_tokens(prompt) + count_tokens(kwargs.get("system") or "") + max_tokens
+            async with self.limiter.acquire(tokens=tokens):
+                # Run in threadpool to avoid blocking
+                response = await asyncio.to_thread(
+                    self.client.chat,
+                    model=kwargs.get("model", "command-r7b-12-2024"),  # latest recommended chat model
+                    message=prompt,
+                    temperature=kwargs.get("temperature", 0.7),
+                    max_tokens=max_tokens,
+                    **extra,
+                )
             return response.text.strip()
         except Exception as e:
             logger.error(f"Cohere chat failed: {e}")
@@ -42,12 +53,32 @@ class CohereClient(LLMClient):
         """
         try:
             model_to_use = kwargs.get("model", self.embedding_model)
-            response = await asyncio.to_thread(
-                self.client.embed,
-                texts=[text],
-                model=model_to_use
-            )
+            async with self.limiter.acquire(tokens=count_tokens(text)):
+                response = await asyncio.to_thread(
+                    self.client.embed,
+                    texts=[text],
+                    model=model_to_use
+                )
             return response.embeddings[0]
         except Exception as e:
             logger.error(f"Cohere embed failed: {e}")
             raise
+
+    async def embed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Embed a batch of texts with a single Cohere Embed API call.
+        """
+        if not texts:
+            return []
+        try:
+            model_to_use = kwargs.get("model", self.embedding_model)
+            async with self.limiter.acquire(tokens=sum(count_tokens(t) for t in texts)):
+                response = await asyncio.to_thread(
+                    self.client.embed,
+                    texts=list(texts),
+                    model=model_to_use
+                )
+            return [list(e) for e in response.embeddings]
+        except Exception as e:
+            logger.error(f"Cohere batch embed failed ({len(texts)} texts): {e}")
+            raise
@@ -1,9 +1,12 @@
+import asyncio
 import logging
 from typing import Optional, List
 from pydantic import BaseModel
 import google.generativeai as genai
 from app.clients.base_client import LLMClient
+from app.clients.rate_limiter import get_rate_limiter
 from app.core.config import settings  # <-- import config
+from app.utils.chunker import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,9 @@ class GeminiEmbedResponse(BaseModel):
 
 # --- Client implementation ---
 class GeminiClient(LLMClient):
+    max_embed_batch_size = 100  # batchEmbedContents limit
+    expected_output_tokens = 1024  # reserved per call when max_output_tokens is not set
+
     def __init__(self, model_name: str = "gemini-2.5-flash"):
         if not settings.GEMINI_API_KEY:
             raise ValueError("Gemini API key is required (set GEMINI_API_KEY or GOOGLE_API_KEY).")
@@ -27,6 +33,15 @@ class GeminiClient(LLMClient):
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model_name = model_name
         self.model = genai.GenerativeModel(self.model_name)
+        self.limiter = get_rate_limiter("gemini")
+
+    def _output_tokens(self, generation_config) -> int:
+        """Completion tokens to reserve: the configured output limit, else an estimate."""
+        if isinstance(generation_config, dict):
+            limit = generation_config.get("max_output_tokens")
+        else:
+            limit = getattr(generation_config, "max_output_tokens", None)
+        return limit or self.expected_output_tokens
 
     async def generate(self, prompt: str, **kwargs) -> GeminiGenerateResponse:
         try:
@@ -39,11 +54,12 @@ class GeminiClient(LLMClient):
                     response_schema=GeminiGenerateResponse,
                 )
 
-            resp = await self.model.generate_content_async(
-                prompt,
-                generation_config=generation_config,
-                **{k: v for k, v in kwargs.items() if k != "generation_config"},
-            )
+            async with self.limiter.acquire(tokens=count_tokens(prompt) + self._output_tokens(generation_config)):
+                resp = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=generation_config,
+                    **{k: v for k, v in kwargs.items() if k != "generation_config"},
+                )
 
             return GeminiGenerateResponse.model_validate({
                 "text": resp.text,
@@ -59,7 +75,8 @@ class GeminiClient(LLMClient):
             logger.info("Generating embedding via Gemini")
             embed_model = kwargs.get("model", "models/embedding-001")
 
-            resp = genai.embed_content(model=embed_model, content=text)
+            async with self.limiter.acquire(tokens=count_tokens(text)):
+                resp = await asyncio.to_thread(genai.embed_content, model=embed_model, content=text)
 
             return GeminiEmbedResponse.model_validate({
                 "embedding": resp["embedding"],
@@ -69,3 +86,24 @@ class GeminiClient(LLMClient):
         except Exception as e:
             logger.exception("Gemini embed failed")
             raise
+
+    async def embed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Embed a batch of texts in one call; genai.embed_content accepts a list
+        of contents and returns one embedding per item, in order.
+        """
+        if not texts:
+            return []
+        try:
+            logger.info(f"Generating {len(texts)} embeddings via Gemini")
+            embed_model = kwargs.get("model", "models/embedding-001")
+
+            async with self.limiter.acquire(tokens=sum(count_tokens(t) for t in texts)):
+                resp = await asyncio.to_thread(
+                    genai.embed_content, model=embed_model, content=list(texts)
+                )
+            return resp["embedding"]
+
+        except Exception as e:
+            logger.exception("Gemini batch embed failed")
+            raise
@@ -0,0 +1,76 @@
+# app/clients/http_pool.py
+"""
+Process-wide keep-alive HTTP client for async provider SDKs.
+
+Every async client (Mistral chat/embeddings, ...) sends its requests through
+one `httpx.AsyncClient`, so TLS connections are reused across requests and
+the number of open sockets is bounded by HTTP_MAX_CONNECTIONS instead of by
+thread or task count. Proxies come from HTTPS_PROXY / HTTP_PROXY / NO_PROXY
+(httpx `trust_env`).
+
+Pooled connections belong to the event loop that opened them, so there is
+one client per running loop (Streamlit runs each action in a fresh
+`asyncio.run`). Look the client up per call instead of keeping a reference.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Optional[asyncio.AbstractEventLoop], httpx.AsyncClient] = {}
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        read=settings.HTTP_READ_TIMEOUT,
+        write=settings.HTTP_WRITE_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT,
+    )
+    proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("HTTP_PROXY")
+    if proxy:
+        # Never log the URL itself: it may carry user:password
+        logger.info(f"Using proxy for outbound API clients: {urlsplit(proxy).hostname or 'configured'}")
+    return httpx.AsyncClient(limits=limits, timeout=timeout, trust_env=True)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Shared AsyncClient for the running event loop, created on first use (and
+    again after `aclose_async_http_client`).
+    """
+    # Clients of finished loops cannot be closed any more; let them be collected
+    for loop in [loop for loop in _clients if loop is not None and loop.is_closed()]:
+        del _clients[loop]
+
+    loop = _running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = build_async_http_client()
+    return client
+
+
+async def aclose_async_http_client() -> None:
+    """Close the running loop's pooled connections; call on application shutdown."""
+    client = _clients.pop(_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
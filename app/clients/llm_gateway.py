@@ -0,0 +1,304 @@
+# app/clients/llm_gateway.py
+"""
+Provider gateway for text generation: failover, circuit breakers and hedging.
+
+Providers are tried in order. Each provider has a circuit breaker shared by
+the whole process: after LLM_BREAKER_FAILURES consecutive failures (a call
+slower than LLM_SLOW_CALL_SECONDS counts as one) the provider is skipped for
+LLM_BREAKER_RESET_SECONDS, then a single trial call decides whether it is
+healthy again.
+
+With hedging, if the provider in flight has not answered within its recent
+p95 latency (clamped to LLM_HEDGE_MIN/MAX_DELAY), the next provider is started
+as well and the first successful answer wins; the other call is cancelled.
+
+A gateway built with `cache_ttl` answers repeated identical calls from the
+LLM response cache (see app/cache/llm_response_cache.py) without a request.
+Entries are keyed on the primary provider; an answer from a fallback is
+kept for at most LLM_CACHE_TTL_FALLBACK so the primary takes over again
+soon after it recovers.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.cache.llm_response_cache import get_llm_response_cache
+from app.clients.base_client import LLMClient
+from app.clients.rate_limiter import rate_limit_wait
+from app.core.config import settings
+from app.exceptions.base_exceptions import ExternalServiceError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds  # 0 = latency never counts as failure
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go to this provider now; an expired open breaker admits one trial call."""
+        if self.state == self.OPEN:
+            return self.clock() - self.opened_at >= self.reset_timeout
+        if self.state == self.HALF_OPEN:
+            return not self.trial_in_flight
+        return True
+
+    def before_call(self) -> None:
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = True
+
+    def release(self) -> None:
+        """The call was abandoned (e.g. lost a hedge) without an outcome."""
+        self.trial_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        if self.slow_call_seconds and latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: deque = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q-quantile of the window, or None until `min_samples` calls were seen."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a provider, shared by every gateway that uses it."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+            slow_call_seconds=settings.LLM_SLOW_CALL_SECONDS,
+        )
+    return _breakers[name]
+
+
+_latencies: Dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    """Process-wide latency window for a provider, so hedge delays learn across gateways."""
+    if name not in _latencies:
+        _latencies[name] = LatencyTracker(window=settings.LLM_LATENCY_WINDOW)
+    return _latencies[name]
+
+
+def _text(result) -> str:
+    """Answer text of a client result (str, MistralChatResponse, GeminiGenerateResponse, ...)."""
+    if isinstance(result, str):
+        return result
+    for attr in ("answer", "text", "content"):
+        if hasattr(result, attr):
+            return str(getattr(result, attr))
+    return str(result)
+
+
+class _Provider:
+    def __init__(self, name: str, client: LLMClient, breaker: CircuitBreaker):
+        self.name = name
+        self.client = client
+        self.breaker = breaker
+        self.latency = get_latency_tracker(name)
+
+    def cache_key(self, prompt: str, kwargs: dict) -> str:
+        params = {k: v for k, v in kwargs.items() if k != "system"}
+        model = params.pop("model", None) or getattr(self.client, "model_name", "")
+        return get_llm_response_cache().make_key(self.name, model, prompt, kwargs.get("system"), params)
+
+
+class LLMGateway:
+    """
+    Route `generate` calls over an ordered list of (name, client) providers,
+    e.g. [("mistral", MistralChatClient()), ("cohere", CohereClient())].
+    `cache_ttl` (seconds) enables response caching for this call site; leave
+    it None for prompts whose answer must not be reused.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, LLMClient]],
+        hedging: Optional[bool] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
+        cache_ttl: Optional[float] = None,
+    ):
+        if not providers:
+            raise ValueError("LLMGateway needs at least one provider")
+        breakers = breakers or {}
+        self.providers = [
+            _Provider(name, client, breakers.get(name) or get_breaker(name)) for name, client in providers
+        ]
+        self.hedging = settings.LLM_HEDGING_ENABLED if hedging is None else hedging
+        self.hedged_calls = 0
+        self.cache_ttl = cache_ttl
+
+    def _route(self) -> List[_Provider]:
+        healthy = [p for p in self.providers if p.breaker.allow()]
+        # Every breaker open: trying anyway beats failing without a request
+        return healthy or list(self.providers)
+
+    def hedge_delay(self, provider: _Provider) -> float:
+        p95 = provider.latency.quantile(0.95)
+        if p95 is None:
+            return settings.LLM_HEDGE_DEFAULT_DELAY
+        return min(max(p95, settings.LLM_HEDGE_MIN_DELAY), settings.LLM_HEDGE_MAX_DELAY)
+
+    async def _call(self, provider: _Provider, prompt: str, **kwargs) -> str:
+        provider.breaker.before_call()
+        start = time.monotonic()
+        waited = rate_limit_wait()
+
+        def provider_time() -> float:
+            # Time queued on our own rate limiter says nothing about the provider
+            return time.monotonic() - start - (rate_limit_wait() - waited)
+
+        try:
+            result = await provider.client.generate(prompt, **kwargs)
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            # A call that lost a hedge was at least this slow; dropping it would
+            # leave only the fast calls in the window and shrink the hedge delay.
+            # Short cancellations (the hedge itself losing) carry no signal.
+            elapsed = provider_time()
+            if elapsed >= self.hedge_delay(provider):
+                provider.latency.add(elapsed)
+            raise
+        except Exception:
+            provider.breaker.record_failure()
+            raise
+        latency = provider_time()
+        provider.latency.add(latency)
+        provider.breaker.record_success(latency)
+        return _text(result)
+
+    async def generate(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        cache_if: Optional[Callable[[str], bool]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        First successful answer from the providers, in order.
+        A cached answer is returned without a call; `bypass_cache` skips the
+        lookup and stores the fresh answer. Answers rejected by `cache_if` are
+        returned but not stored.
+        Raises ExternalServiceError when every provider failed.
+        """
+        cache = get_llm_response_cache() if self.cache_ttl else None
+        key = self.providers[0].cache_key(prompt, kwargs) if cache is not None else None
+        if cache is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        answer, provider = await self._generate(prompt, **kwargs)
+        if cache is not None and (cache_if is None or cache_if(answer)):
+            ttl = self.cache_ttl
+            if provider is not self.providers[0]:
+                ttl = min(ttl, settings.LLM_CACHE_TTL_FALLBACK)
+            cache.set(key, answer, ttl=ttl)
+        return answer
+
+    async def _generate(self, prompt: str, **kwargs) -> Tuple[str, _Provider]:
+        queue = self._route()
+        in_flight: Dict[asyncio.Task, _Provider] = {}
+        errors: List[str] = []
+
+        def launch():
+            provider = queue.pop(0)
+            in_flight[asyncio.create_task(self._call(provider, prompt, **kwargs))] = provider
+
+        launch()
+        try:
+            while in_flight:
+                timeout = None
+                if self.hedging and queue and len(in_flight) == 1:
+                    timeout = self.hedge_delay(next(iter(in_flight.values())))
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    slow = next(iter(in_flight.values()))
+                    logger.info(f"{slow.name} slower than {timeout:.1f}s; hedging with {queue[0].name}")
+                    self.hedged_calls += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    provider = in_flight.pop(task)
+                    if task.exception() is None:
+                        return task.result(), provider
+                    logger.warning(f"{provider.name} failed: {task.exception()}")
+                    errors.append(f"{provider.name}: {task.exception()}")
+                if not in_flight and queue:
+                    launch()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            # Let the losers release their breaker and record latency before returning
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+        raise ExternalServiceError(f"All LLM providers failed ({'; '.join(errors)})")
+
+    def stats(self) -> dict:
+        return {
+            "hedged_calls": self.hedged_calls,
+            "providers": {
+                p.name: {
+                    "state": p.breaker.state,
+                    "failures": p.breaker.failures,
+                    "p95_seconds": p.latency.quantile(0.95),
+                }
+                for p in self.providers
+            },
+        }
@@ -1,13 +1,13 @@
 # app/clients/mistralai_client.py
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel
 import logging
-import asyncio
-import os
-import httpx
 from mistralai import Mistral
 from app.clients.base_client import LLMClient
+from app.clients.http_pool import get_async_http_client
+from app.clients.rate_limiter import get_rate_limiter
 from app.core.config import settings
+from app.utils.chunker import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -18,49 +18,67 @@ class MistralChatResponse(BaseModel):
     language: str = "english"
 
 
+def _content_text(content, sep: str = "") -> str:
+    """Plain text of a message/delta `content`, which is a string or a list of typed chunks."""
+    if content is None:
+        return ""
+    if isinstance(content, list):
+        return sep.join(chunk.text for chunk in content if getattr(chunk, "type", None) == "text")
+    return str(content)
+
+
 class MistralChatClient(LLMClient):
+    max_embed_batch_size = 64
+
     def __init__(self, model_name: str = "ministral-8b-latest"):
         self.api_key = settings.MISTRAL_API_KEY
         if not self.api_key:
             raise ValueError("Mistral API key is required.")
         self.model_name = model_name
 
-        # ✅ Optional proxy setup with httpx.Client
-        proxies = os.environ.get("HTTPS_PROXY") or os.environ.get("HTTP_PROXY")
-        if proxies:
-            logger.info(f"Using proxy for Mistral client: {proxies}")
-            http_client = httpx.Client(proxies=proxies, timeout=30.0)
-            self.client = Mistral(api_key=self.api_key, http_client=http_client)
-        else:
-            self.client = Mistral(api_key=self.api_key)
+        self._sdk: Optional[Mistral] = None
+        self._sdk_http = None
+        # Shared with every other Mistral client in the process
+        self.limiter = get_rate_limiter("mistral")
+
+    @property
+    def client(self) -> Mistral:
+        """
+        SDK bound to the running loop's keep-alive pool (proxy from env),
+        rebuilt when that pool changes (new event loop, or pool closed).
+        """
+        http = get_async_http_client()
+        if self._sdk is None or self._sdk_http is not http:
+            self._sdk = Mistral(api_key=self.api_key, async_client=http)
+            self._sdk_http = http
+        return self._sdk
+
+    @staticmethod
+    def _messages(user: str, system: Optional[str]) -> List[dict]:
+        return [
+            {"role": "system", "content": system or "You are a helpful AI assistant."},
+            {"role": "user", "content": user},
+        ]
+
+    @staticmethod
+    def _chat_tokens(user: str, system: Optional[str], max_tokens: int = 512) -> int:
+        """Token budget of a chat call: prompt estimate plus the completion limit."""
+        return count_tokens(user) + count_tokens(system or "") + max_tokens
 
     async def chat(self, user: str, system: Optional[str] = None) -> MistralChatResponse:
         """Send chat request to Mistral asynchronously"""
         try:
             logger.info("Sending chat request to Mistral...")
 
-            loop = asyncio.get_event_loop()
-            sdk_response = await loop.run_in_executor(
-                None,
-                lambda: self.client.chat.complete(
+            async with self.limiter.acquire(tokens=self._chat_tokens(user, system)):
+                sdk_response = await self.client.chat.complete_async(
                     model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": system or "You are a helpful AI assistant."},
-                        {"role": "user", "content": user},
-                    ],
+                    messages=self._messages(user, system),
                     temperature=0.2,
                     max_tokens=512,
-                ),
-            )
-
-            # --- Normalize response ---
-            content = sdk_response.choices[0].message.content
-            if isinstance(content, list):
-                answer = " ".join(
-                    chunk.text for chunk in content if getattr(chunk, "type", None) == "text"
                 )
-            else:
-                answer = str(content)
+
+            answer = _content_text(sdk_response.choices[0].message.content, sep=" ")
 
             return MistralChatResponse(
                 answer=answer.strip(),
@@ -71,22 +89,66 @@ class MistralChatClient(LLMClient):
             logger.exception("Mistral API request failed")
             raise
 
+    async def chat_stream(self, user: str, system: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the chat answer from Mistral as text deltas"""
+        try:
+            logger.info("Sending streaming chat request to Mistral...")
+            # The in-flight slot is held until the stream is fully read
+            async with self.limiter.acquire(tokens=self._chat_tokens(user, system)):
+                events = await self.client.chat.stream_async(
+                    model=self.model_name,
+                    messages=self._messages(user, system),
+                    temperature=0.2,
+                    max_tokens=512,
+                )
+                async for event in events:
+                    choices = event.data.choices
+                    if not choices:
+                        continue
+                    delta = _content_text(choices[0].delta.content)
+                    if delta:
+                        yield delta
+        except Exception as e:
+            logger.exception("Mistral streaming request failed")
+            raise
+
     async def generate(self, prompt: str, **kwargs) -> str:
         resp = await self.chat(user=prompt, system=kwargs.get("system"))
         return resp.answer
 
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        async for delta in self.chat_stream(user=prompt, system=kwargs.get("system")):
+            yield delta
+
     async def embed(self, text: str, **kwargs) -> List[float]:
         """Generate embeddings with Mistral"""
         try:
-            loop = asyncio.get_event_loop()
-            resp = await loop.run_in_executor(
-                None,
-                lambda: self.client.embeddings.create(
+            async with self.limiter.acquire(tokens=count_tokens(text)):
+                resp = await self.client.embeddings.create_async(
                     model="mistral-embed",
-                    input=text
-                ),
-            )
+                    inputs=[text],
+                )
             return resp.data[0].embedding
         except Exception as e:
             logger.exception("Mistral embeddings request failed")
             raise
+
+    async def embed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Generate embeddings for several texts in one Mistral request"""
+        if not texts:
+            return []
+        try:
+            async with self.limiter.acquire(tokens=sum(count_tokens(t) for t in texts)):
+                resp = await self.client.embeddings.create_async(
+                    model=kwargs.get("model", "mistral-embed"),
+                    inputs=list(texts),
+                )
+            # Mistral returns one item per input, each tagged with its index
+            ordered = sorted(
+                enumerate(resp.data),
+                key=lambda pair: pair[1].index if pair[1].index is not None else pair[0],
+            )
+            return [d.embedding for _, d in ordered]
+        except Exception as e:
+            logger.exception("Mistral batch embeddings request failed")
+            raise
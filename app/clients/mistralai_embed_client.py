@@ -1,9 +1,13 @@
 # app/clients/mistralai_embed_client.py
 import os
 import logging
-import httpx
 from typing import List
 
+from app.clients.http_pool import get_async_http_client
+from app.clients.rate_limiter import get_rate_limiter
+from app.utils.chunker import count_tokens
+from app.utils.batching import map_batches
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,6 +17,8 @@ class MistralEmbedClient:
     Uses the new endpoint and enforces expected vector dimension.
     """
 
+    max_embed_batch_size = 64
+
     def __init__(self, api_key: str = None, model_name: str = "mistral-embed", expected_dim: int = 1536):
         self.api_key = api_key or os.environ.get("MISTRAL_API_KEY")
         if not self.api_key:
@@ -21,36 +27,67 @@ class MistralEmbedClient:
         self.api_url = "https://api.mistral.ai/v1/embeddings"
         self.model_name = model_name
         self.expected_dim = expected_dim
+        self.limiter = get_rate_limiter("mistral")
         logger.info(f"Initialized MistralEmbedClient with model {self.model_name}")
 
-    async def embed(self, text: str, model: str = None) -> List[float]:
+    async def _request_embeddings(self, inputs, model: str = None) -> List[List[float]]:
         model_to_use = model or self.model_name
-        logger.info(f"Requesting embedding from Mistral model={model_to_use}")
-
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
         payload = {
             "model": model_to_use,
-            "input": text
+            "input": inputs
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
+        client = get_async_http_client()
+        try:
+            texts = inputs if isinstance(inputs, list) else [inputs]
+            async with self.limiter.acquire(tokens=sum(count_tokens(t) for t in texts)):
                 response = await client.post(self.api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                data = response.json()
+            response.raise_for_status()
+            data = response.json()
 
-                # The actual embedding depends on Mistral API response structure
-                embedding = data["data"][0]["embedding"]
-                logger.info(f"Received embedding of length {len(embedding)}")
+            # One item per input; keep the input order using the returned index
+            items = sorted(data["data"], key=lambda d: d.get("index", 0))
+            embeddings = [item["embedding"] for item in items]
 
+            for embedding in embeddings:
                 if len(embedding) != self.expected_dim:
                     raise ValueError(f"Embedding dimension mismatch: got {len(embedding)}, expected {self.expected_dim}")
 
-                return embedding
+            return embeddings
+
+        except Exception as e:
+            logger.exception("Mistral embedding request failed")
+            raise
+
+    async def embed(self, text: str, model: str = None) -> List[float]:
+        logger.info(f"Requesting embedding from Mistral model={model or self.model_name}")
+        embedding = (await self._request_embeddings(text, model))[0]
+        logger.info(f"Received embedding of length {len(embedding)}")
+        return embedding
+
+    async def embed_batch(self, texts: List[str], model: str = None) -> List[List[float]]:
+        """Embed several texts with a single request to the embeddings endpoint."""
+        if not texts:
+            return []
+        logger.info(f"Requesting {len(texts)} embeddings from Mistral model={model or self.model_name}")
+        return await self._request_embeddings(list(texts), model)
 
-            except Exception as e:
-                logger.exception("Mistral embedding request failed")
-                raise
+    async def embed_many(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        max_concurrency: int = 4,
+        model: str = None,
+    ) -> List[List[float]]:
+        """Embed any number of texts in concurrent batches, preserving input order."""
+        size = min(batch_size or self.max_embed_batch_size, self.max_embed_batch_size)
+        return await map_batches(
+            lambda batch: self.embed_batch(list(batch), model=model),
+            texts,
+            batch_size=size,
+            max_concurrency=max_concurrency,
+        )
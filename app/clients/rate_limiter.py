@@ -0,0 +1,185 @@
+# app/clients/rate_limiter.py
+"""
+Per-provider client-side rate limiting.
+
+Each provider (mistral, cohere, gemini) has one process-wide limiter that
+enforces three budgets before a request is sent:
+- requests per second (token bucket, bursts up to one second's worth)
+- model tokens per minute (token bucket, callers pass an estimate)
+- a maximum number of calls in flight
+
+Callers wait instead of failing. Waiting is FIFO: the caller at the head of
+the queue holds the turn until it has an in-flight slot and enough budget,
+so a large request is never starved by a stream of small ones.
+
+Time spent waiting is added to a per-task total (`rate_limit_wait`), so
+code that times a client call can tell queueing apart from provider latency.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_task_wait: ContextVar[float] = ContextVar("rate_limit_wait", default=0.0)
+
+
+def rate_limit_wait() -> float:
+    """Seconds the current task has spent waiting on rate limiters so far."""
+    return _task_wait.get()
+
+
+class TokenBucket:
+    """`rate` units per second, holding at most `capacity` units."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.level = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests above capacity wait for a full bucket)."""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class ProviderRateLimiter:
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: float = 0,
+        tokens_per_minute: float = 0,
+        max_in_flight: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.clock = clock
+        # 0 disables a budget
+        self.requests = (
+            TokenBucket(requests_per_second, max(1.0, requests_per_second), clock) if requests_per_second else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute, clock) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        # Budgets are process-wide, but asyncio primitives bind to one event
+        # loop, and callers like Streamlit start a new loop per action
+        self._loop_primitives: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Lock, Optional[asyncio.Semaphore]]] = {}
+
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits: deque = deque(maxlen=500)
+
+    def _primitives(self) -> Tuple[asyncio.Lock, Optional[asyncio.Semaphore]]:
+        """(FIFO turn lock, in-flight semaphore) for the running event loop."""
+        loop = asyncio.get_running_loop()
+        primitives = self._loop_primitives.get(loop)
+        if primitives is None:
+            for closed in [other for other in self._loop_primitives if other.is_closed()]:
+                del self._loop_primitives[closed]
+            slots = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+            # FIFO: waiters take the lock in arrival order
+            primitives = self._loop_primitives[loop] = (asyncio.Lock(), slots)
+        return primitives
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0):
+        """Hold one request's budget (and an in-flight slot) for the body of the `async with`."""
+        enqueued = self.clock()
+        self.queue_depth += 1
+        turn, slots = self._primitives()
+        holds_slot = False
+        try:
+            async with turn:
+                if slots is not None:
+                    await slots.acquire()
+                    holds_slot = True
+                while True:
+                    delay = max(
+                        self.requests.delay(1) if self.requests else 0.0,
+                        self.tokens.delay(tokens) if self.tokens and tokens else 0.0,
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self.requests:
+                    self.requests.consume(1)
+                if self.tokens and tokens:
+                    self.tokens.consume(tokens)
+        except BaseException:
+            if holds_slot:
+                slots.release()
+            _task_wait.set(_task_wait.get() + self.clock() - enqueued)
+            raise
+        finally:
+            self.queue_depth -= 1
+
+        self._record_wait(self.clock() - enqueued)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if holds_slot:
+                slots.release()
+
+    def _record_wait(self, waited: float) -> None:
+        _task_wait.set(_task_wait.get() + waited)
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._recent_waits.append(waited)
+        if waited > 1.0:
+            logger.info(f"{self.name} request waited {waited:.2f}s for rate budget (queue depth {self.queue_depth})")
+
+    def stats(self) -> dict:
+        recent = sorted(self._recent_waits)
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "acquired": self.acquired,
+            "mean_wait_seconds": self.total_wait / self.acquired if self.acquired else 0.0,
+            "p95_wait_seconds": recent[min(len(recent) - 1, int(0.95 * len(recent)))] if recent else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """
+    Process-wide limiter for `provider`, configured from
+    <PROVIDER>_REQUESTS_PER_SECOND / _TOKENS_PER_MINUTE / _MAX_IN_FLIGHT.
+    """
+    if provider not in _limiters:
+        prefix = provider.upper()
+        _limiters[provider] = ProviderRateLimiter(
+            provider,
+            requests_per_second=getattr(settings, f"{prefix}_REQUESTS_PER_SECOND", 0),
+            tokens_per_minute=getattr(settings, f"{prefix}_TOKENS_PER_MINUTE", 0),
+            max_in_flight=getattr(settings, f"{prefix}_MAX_IN_FLIGHT", 0),
+        )
+    return _limiters[provider]
+
+
+def rate_limiter_stats() -> Dict[str, dict]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
@@ -1,6 +1,6 @@
 # app/container/core_container.py
 from sqlalchemy.orm import Session
-from app.clients.supabase_client import get_db  # SQLAlchemy session dependency
+from app.clients.supabase_client import get_db, SessionLocal  # SQLAlchemy session dependency
 from app.core.config import settings
 
 # --- Repositories ---
@@ -14,6 +14,7 @@ from app.repositories.user_repository import UserRepository
 from app.services.auth_service import AuthService
 from app.services.embedding_service import EmbeddingService
 from app.services.file_processing import FileProcessingService
+from app.services.ingestion_job_service import IngestionJobService
 from app.services.langchain_service import LangChainLLMService
 from app.services.rag_service import RAGService
 from app.services.sql_rag_service import SQLRAGService
@@ -38,6 +39,10 @@ user_repo = UserRepository(db_session)
 auth_service = AuthService()
 embedding_service = EmbeddingService(db_session)
 file_processing_service = FileProcessingService()
+ingestion_jobs = IngestionJobService(
+    session_factory=SessionLocal,
+    file_processing_service=file_processing_service,
+)
 mistral_service = LangChainLLMService()
 rag_service = RAGService(db=db_session , top_k=5, memory_size=7)
 sql_rag_service = SQLRAGService(
@@ -68,6 +73,7 @@ class CoreContainer:
         self.auth_service = auth_service
         self.embedding_service = embedding_service
         self.file_processing_service = file_processing_service
+        self.ingestion_jobs = ingestion_jobs
         self.mistral_service = mistral_service
         self.rag_service = rag_service
         self.sql_rag_service = sql_rag_service
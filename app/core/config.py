@@ -23,6 +23,92 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str 
     COHERE_API_KEY: str
     TTS_ENGINE: str = "gtts"
+    # Outbound HTTP (shared keep-alive pool, see app/clients/http_pool.py)
+    HTTP_MAX_CONNECTIONS: int = 100  # open sockets across all providers
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20  # idle connections kept for reuse
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection stays open
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 60.0  # long LLM completions
+    HTTP_WRITE_TIMEOUT: float = 10.0
+    HTTP_POOL_TIMEOUT: float = 10.0  # wait for a free connection before failing
+    # LLM provider gateway (see app/clients/llm_gateway.py)
+    LLM_BREAKER_FAILURES: int = 5  # consecutive failures before a provider is skipped
+    LLM_BREAKER_RESET_SECONDS: float = 30.0  # skip time before a trial call
+    LLM_SLOW_CALL_SECONDS: float = 20.0  # slower calls count as failures; 0 disables
+    LLM_HEDGING_ENABLED: bool = True  # start the fallback when the primary is slower than its p95
+    LLM_HEDGE_DEFAULT_DELAY: float = 4.0  # seconds, until enough latencies were observed
+    LLM_HEDGE_MIN_DELAY: float = 1.0
+    LLM_HEDGE_MAX_DELAY: float = 10.0
+    LLM_LATENCY_WINDOW: int = 200  # recent calls per provider used for the p95
+    LLM_CACHE_ENABLED: bool = True  # reuse answers to byte-identical prompts
+    LLM_CACHE_MAX_ITEMS: int = 5_000  # in-process LRU tier
+    LLM_CACHE_PATH: str = ".cache/llm_responses.sqlite3"  # on-disk tier; empty disables it
+    LLM_CACHE_TTL_FALLBACK: int = 300  # cap for answers that came from a fallback provider
+    LLM_CACHE_TTL_ROUTING: int = 86_400  # orchestrator routing decisions
+    LLM_CACHE_TTL_LESSON_SUMMARY: int = 604_800  # lesson summaries
+    LLM_CACHE_TTL_VIDEO_SUMMARY: int = 604_800  # video transcript summaries
+    # Provider rate limits, enforced client-side per process (0 = unlimited; match your plan)
+    MISTRAL_REQUESTS_PER_SECOND: float = 5.0
+    MISTRAL_TOKENS_PER_MINUTE: int = 500_000
+    MISTRAL_MAX_IN_FLIGHT: int = 16
+    COHERE_REQUESTS_PER_SECOND: float = 5.0
+    COHERE_TOKENS_PER_MINUTE: int = 0
+    COHERE_MAX_IN_FLIGHT: int = 8
+    GEMINI_REQUESTS_PER_SECOND: float = 2.0
+    GEMINI_TOKENS_PER_MINUTE: int = 1_000_000
+    GEMINI_MAX_IN_FLIGHT: int = 8
+    # Embeddings
+    EMBED_BATCH_SIZE: int = 96  # texts per provider request (capped by each client's limit)
+    EMBED_MAX_CONCURRENCY: int = 4  # embedding batches in flight at once
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ITEMS: int = 50_000  # in-process LRU tier
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite3"  # on-disk tier; empty disables it
+    QUERY_CACHE_ENABLED: bool = True  # memoize query embeddings of repeated questions
+    QUERY_CACHE_MAX_ITEMS: int = 2048
+    QUERY_CACHE_TTL_SECONDS: int = 3600  # 0 = never expire
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # min cosine similarity between questions
+    SEMANTIC_CACHE_TTL_SECONDS: int = 900
+    SEMANTIC_CACHE_MAX_ENTRIES_PER_USER: int = 256
+    SEMANTIC_CACHE_MAX_USERS: int = 10_000
+    EMBEDDING_BULK_INSERT_MODE: str = "auto"  # "auto" | "copy" | "multirow"
+    EMBEDDING_COPY_MIN_ROWS: int = 500  # in auto mode, use binary COPY from this many rows
+    # Vector search
+    VECTOR_INDEX_TYPE: str = "hnsw"  # "hnsw" | "ivfflat" | "none"
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 64
+    HNSW_EF_SEARCH: int = 40  # higher = better recall, slower queries
+    HNSW_ITERATIVE_SCAN: str = "relaxed_order"  # keeps user-filtered HNSW scans at k rows; needs pgvector >= 0.8, "" on older
+    IVFFLAT_LISTS: int = 0  # 0 = derive from row count at build time
+    IVFFLAT_PROBES: int = 10
+    VECTOR_SEARCH_PRECISION: str = "full"  # "full" | "halfvec" (half-size index, full-precision re-scoring)
+    VECTOR_RESCORE_CANDIDATES: int = 40  # compact-search candidates re-scored at full precision
+    RETRIEVER_BACKEND: str = "pgvector"  # "pgvector" | "mmap" (local per-user memory-mapped store)
+    VECTOR_STORE_DIR: str = ".cache/vector_store"
+    VECTOR_STORE_DTYPE: str = "float32"  # "float16" halves, "int8" quarters disk and page cache
+    HYBRID_SEARCH_ENABLED: bool = True  # fuse vector and full-text results
+    HYBRID_CANDIDATES: int = 20  # candidates fetched from each side before fusion
+    RRF_K: int = 60  # reciprocal rank fusion damping constant
+    MMR_ENABLED: bool = True  # re-rank retrieved chunks for diversity
+    MMR_FETCH_K: int = 20  # candidates over-fetched before MMR selection
+    MMR_LAMBDA: float = 0.5  # 1.0 = pure relevance, lower = more diverse
+    FILE_ROUTING_ENABLED: bool = False  # opt-in: pick the closest files by summary vector, then search their chunks
+    FILE_ROUTING_TOP_FILES: int = 5  # files searched per query; no-op for users with fewer files
+    # Prompt budgets (approximate model tokens, see app/utils/context_packer.py)
+    CONTEXT_DOC_TOKENS: int = 3000  # retrieved documents in RAG prompts
+    CONTEXT_HISTORY_TOKENS: int = 1000  # conversation history in RAG prompts
+    SUMMARY_INPUT_TOKENS: int = 24000  # text sent to lesson / video summarizers
+    # Ingestion
+    CHUNK_MAX_TOKENS: int = 256  # approximate model tokens per chunk
+    CHUNK_OVERLAP_TOKENS: int = 32  # trailing sentences repeated in the next chunk
+    INGEST_QUEUE_SIZE: int = 4  # batches buffered between pipeline stages
+    INGEST_WORKERS: int = 2  # background ingestion jobs processed concurrently
+    INGEST_SPOOL_DIR: str = ".cache/ingest_spool"  # uploads wait here until their job finishes
+    INGEST_HEARTBEAT_SECONDS: float = 30  # running jobs refresh their lease this often
+    INGEST_LEASE_SECONDS: float = 300  # running jobs without a heartbeat this long are re-queued
+    PDF_EXTRACT_WORKERS: int = 0  # extraction processes; 0 = one per CPU core
+    PDF_PAGES_PER_TASK: int = 25  # page range handed to one worker at a time
+    PDF_POOL_MIN_PAGES: int = 40  # smaller PDFs are extracted in a thread instead
     #GOOGLE_CLIENT_SECRET_FILE: str
     GOOGLE_CALENDAR_SCOPES: str 
     #GOOGLE_CALENDAR_TOKEN_FILE: str 
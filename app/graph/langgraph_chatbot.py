@@ -4,13 +4,15 @@ from app.agents.chatbot_agent import ChatbotService
 from sqlalchemy.orm import Session
 from app.clients.mistralai_client import MistralChatClient
 from app.clients.cohere_client import CohereClient
+from app.clients.llm_gateway import LLMGateway
 from app.core.config import settings
 from app.utils.web_search import search_web
 from app.utils.youtube_search import YouTubeSearch
+from app.utils.sse import answer_events, format_event
 import asyncio
 import logging
 import json
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,6 +26,10 @@ class ChatbotGraph:
         self.primary_client = MistralChatClient(model_name=settings.MISTRAL_MODEL)
         # Fallback LLM: Cohere
         self.fallback_client = CohereClient()
+        self.llm = LLMGateway(
+            [("mistral", self.primary_client), ("cohere", self.fallback_client)],
+            cache_ttl=settings.LLM_CACHE_TTL_ROUTING,
+        )
 
         # External searchers
         self.youtube_searcher = YouTubeSearch(max_results=5)
@@ -52,16 +58,21 @@ class ChatbotGraph:
           (e.g., "add the plan to my google calendar", "put it on my calendar", "schedule it tomorrow").
         """
         try:
-            response = await self.primary_client.chat(user=message, system=system_prompt)
-            return (response.answer or "").strip().lower()
+            # Only valid agent names are cached; a stray answer must not stick for a day
+            decision = await self.llm.generate(
+                message,
+                system=system_prompt,
+                cache_if=lambda answer: self._parse_decision(answer) is not None,
+            )
+            return self._parse_decision(decision) or "rag_agent"
         except Exception as e:
-            logger.warning(f"[ChatbotGraph] Primary LLM failed: {e}, falling back to Cohere")
-            try:
-                fallback_resp = await self.fallback_client.generate(f"{system_prompt}\nUser message: {message}")
-                return (fallback_resp or "").strip().lower()
-            except Exception as e2:
-                logger.error(f"[ChatbotGraph] Fallback LLM failed: {e2}")
-                return "rag_agent"
+            logger.error(f"[ChatbotGraph] All LLM providers failed: {e}")
+            return "rag_agent"
+
+    def _parse_decision(self, answer: str) -> str | None:
+        """The agent named by the LLM's answer (tolerating case, quotes, trailing dots), or None."""
+        decision = (answer or "").strip().strip("`'\".").strip().lower()
+        return decision if decision in self.agents else None
 
     def _heuristic_route(self, message: str) -> str | None:
         """Lightweight intent heuristic to avoid misrouting (e.g., definitions to lesson planning)."""
@@ -148,6 +159,29 @@ class ChatbotGraph:
             logger.error(f"[calendar_agent] Error storing plan: {e}", exc_info=True)
             return {"response": f"Failed to add events due to an error."}
 
+    async def stream_events(self, message: str, user_id: str) -> AsyncIterator[str]:
+        """
+        SSE frames for one message: a `route` event with the orchestrator's
+        decision, then the RAG agent streams `token` events while the other
+        agents send their whole result in the final `done` event.
+        """
+        state = await self.orchestrator_agent({"message": message, "user_id": user_id})
+        decision = state["next"]
+        yield format_event({"decision": decision}, event="route")
+
+        if decision == "rag_agent":
+            async for frame in answer_events(self.service.rag_response_stream(user_id, message), decision=decision):
+                yield frame
+            return
+
+        try:
+            result = await getattr(self, decision)(state)
+        except Exception as e:
+            logger.error(f"[ChatbotGraph] {decision} failed: {e}", exc_info=True)
+            yield format_event({"detail": str(e)}, event="error")
+            return
+        yield format_event({"answer": result.get("response", ""), "decision": decision}, event="done")
+
     # --- Build LangGraph workflow ---
     def build(self):
         workflow = StateGraph(dict)
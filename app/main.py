@@ -2,6 +2,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.clients.http_pool import aclose_async_http_client
 from app.models.base import Base
 from app.routers import auth_routes, tutor_routes, chatbot_routes
 from app.routers.agent_route import router as agent_router
@@ -57,6 +58,19 @@ async def print_routes():
         else:  # WebSockets don't have .methods
             print(f"  {route.path} → WebSocket")
 
+@app.on_event("startup")
+async def start_workers():
+    from app.container.core_container import container
+    await container.ingestion_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    from app.container.core_container import container
+    await container.ingestion_jobs.stop()
+    container.file_processing_service.extraction_engine.shutdown()
+    await aclose_async_http_client()
+
 # --------------------------
 # Entry point
 # --------------------------
@@ -1,15 +1,26 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, Computed, Index, Integer, String, ForeignKey, Float
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from pgvector.sqlalchemy import Vector
 
+FTS_CONFIG = "english"  # text search configuration of content_tsv
+
+
 class Embedding(Base):
     __tablename__ = "embeddings"
 
     id = Column(Integer, primary_key=True, index=True)
-    file_id = Column(Integer, ForeignKey("uploaded_files.id"))
+    file_id = Column(Integer, ForeignKey("uploaded_files.id"), index=True)
+    user_id = Column(String, index=True, nullable=True)  # copy of uploaded_files.user_id for scoped search
     content_chunk = Column(String, nullable=False)
+    chunk_hash = Column(String(64), index=True, nullable=True)  # sha256 of the normalized chunk text
     embedding_vector = Column(Vector(1024))  # pgvector-compatible
+    # Generated by Postgres for keyword search; never written by the app
+    content_tsv = Column(TSVECTOR, Computed(f"to_tsvector('{FTS_CONFIG}', content_chunk)", persisted=True))
 
     file = relationship("UploadedFile", back_populates="embeddings")
+
+    __table_args__ = (
+        Index("ix_embeddings_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
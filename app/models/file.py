@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from pgvector.sqlalchemy import Vector
 
 class UploadedFile(Base):
     __tablename__ = "uploaded_files"
@@ -9,5 +10,7 @@ class UploadedFile(Base):
     user_id = Column(String, index=True)  # Supabase user ID
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    content_hash = Column(String(64), index=True, nullable=True)  # sha256 of the uploaded bytes
+    summary_vector = Column(Vector(1024), nullable=True)  # mean of the file's chunk embeddings
 
     embeddings = relationship("Embedding", back_populates="file")
@@ -0,0 +1,25 @@
+# app/models/ingestion_job.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+import uuid
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, index=True, nullable=False)  # Supabase user ID
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)  # path in the storage bucket
+    spool_path = Column(String, nullable=True)  # local copy of the upload until the job finishes
+    status = Column(String, nullable=False, default="queued")  # queued | running | completed | failed
+    pages_done = Column(Integer, nullable=False, default=0)
+    chunks_done = Column(Integer, nullable=False, default=0)
+    vectors_done = Column(Integer, nullable=False, default=0)
+    chunks_reused = Column(Integer, nullable=False, default=0)  # unchanged chunks kept from a previous upload
+    chunks_deleted = Column(Integer, nullable=False, default=0)  # stale chunks removed on re-upload
+    file_id = Column(Integer, nullable=True)  # uploaded_files.id once ingested
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -4,17 +4,41 @@ import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.file import UploadedFile
-from app.models.embedding import Embedding
+from app.models.embedding import Embedding, FTS_CONFIG
 from app.repositories.base import BaseRepository
 from app.exceptions.base_exceptions import ValidationError
-from sqlalchemy import text
+from sqlalchemy import bindparam, cast, insert, null, select, text, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+from app.core.config import settings
+from app.utils.pg_copy import build_copy_payload, encode_int4, encode_text, encode_vector
+from app.utils.content_hash import hash_text
+from app.repositories.vector_index import VectorIndexManager
 
 logger = logging.getLogger(__name__)
 
 
+class RetrievedChunk:
+    """Lightweight retrieval result; `distance` is None for keyword/id lookups, `embedding` unless requested."""
+
+    __slots__ = ("id", "file_id", "content", "distance", "filename", "embedding")
+
+    def __init__(self, id, file_id, content, distance=None, filename=None, embedding=None):
+        self.id = id
+        self.file_id = file_id
+        self.content = content
+        self.distance = distance
+        self.filename = filename
+        self.embedding = embedding
+
+    def __repr__(self):
+        return f"RetrievedChunk(id={self.id}, file_id={self.file_id}, filename={self.filename!r}, distance={self.distance})"
+
+
 class EmbeddingRepository(BaseRepository[Embedding]):
     def __init__(self, db: Session):
         super().__init__(Embedding, db)
+        self.index_manager = VectorIndexManager()
 
     def store_file_and_embeddings(
         self,
@@ -26,55 +50,347 @@ class EmbeddingRepository(BaseRepository[Embedding]):
     ):
         """
         Persist uploaded file entry along with its embeddings.
+        The file row and all vectors are written in a single transaction.
         """
         try:
-            file_entry = UploadedFile(
-                user_id=user_id, filename=filename, file_path=file_path
-            )
-            self.db.add(file_entry)
+            file_entry = self.create_file_entry(user_id, filename, file_path)
+            self.bulk_insert_embeddings(file_entry.id, chunks, embeddings, user_id=user_id)
+            self.refresh_file_summary(file_entry.id)
             self.db.commit()
             self.db.refresh(file_entry)
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Failed to store uploaded file {filename}: {e}")
-            raise ValidationError(f"Failed to store uploaded file: {e}")
+            logger.error(f"Failed to store file and embeddings for {filename}: {e}")
+            raise ValidationError(f"Failed to store file and embeddings: {e}")
+
+        return file_entry, embeddings
 
+    def create_file_entry(
+        self, user_id: str, filename: str, file_path: str, content_hash: str = None
+    ) -> UploadedFile:
+        """
+        Add an uploaded file row and flush it to obtain its id.
+        Does not commit: streaming ingestion commits once all vectors are written.
+        """
+        file_entry = UploadedFile(
+            user_id=user_id, filename=filename, file_path=file_path, content_hash=content_hash
+        )
+        self.db.add(file_entry)
+        self.db.flush()
+        return file_entry
+
+    def get_chunk_hashes(self, file_id: int) -> set[str]:
+        """Hashes of the chunks currently stored for a file."""
+        rows = (
+            self.db.query(Embedding.chunk_hash)
+            .filter(Embedding.file_id == file_id, Embedding.chunk_hash.isnot(None))
+            .all()
+        )
+        return {row[0] for row in rows}
+
+    def delete_stale_chunks(self, file_id: int, stale_hashes: set[str]) -> int:
+        """
+        Delete a file's chunks whose hash is in `stale_hashes`, plus legacy rows
+        stored before chunk hashing existed. Does not commit.
+        """
+        condition = Embedding.chunk_hash.is_(None)
+        if stale_hashes:
+            condition = condition | Embedding.chunk_hash.in_(list(stale_hashes))
+        return (
+            self.db.query(Embedding)
+            .filter(Embedding.file_id == file_id, condition)
+            .delete(synchronize_session=False)
+        )
+
+    def bulk_insert_embeddings(
+        self,
+        file_id: int,
+        chunks: list[str],
+        embeddings: list[list[float]],
+        chunk_hashes: list[str] = None,
+        user_id: str = None,
+    ) -> int:
+        """
+        Insert many embedding rows in as few round trips as possible.
+        Does not commit: the caller owns the transaction.
+        `user_id` defaults to the owner of `file_id`.
+
+        - Postgres + large batches: binary COPY into `embeddings`
+        - otherwise: one multi-row INSERT (SQLAlchemy insertmanyvalues)
+        """
+        if len(chunks) != len(embeddings):
+            raise ValidationError(
+                f"Got {len(chunks)} chunks but {len(embeddings)} embeddings"
+            )
+        if not chunks:
+            return 0
+        if chunk_hashes is None:
+            chunk_hashes = [hash_text(c) for c in chunks]
+        if user_id is None:
+            user_id = self.db.get(UploadedFile, file_id).user_id
+
+        mode = settings.EMBEDDING_BULK_INSERT_MODE
+        use_copy = self.db.get_bind().dialect.name == "postgresql" and (
+            mode == "copy" or (mode == "auto" and len(chunks) >= settings.EMBEDDING_COPY_MIN_ROWS)
+        )
+
+        if use_copy:
+            self._copy_embeddings(file_id, user_id, chunks, embeddings, chunk_hashes)
+        else:
+            rows = [
+                {
+                    "file_id": file_id,
+                    "user_id": user_id,
+                    "content_chunk": chunk,
+                    "chunk_hash": chunk_hash,
+                    "embedding_vector": vector.tolist() if isinstance(vector, np.ndarray) else vector,
+                }
+                for chunk, vector, chunk_hash in zip(chunks, embeddings, chunk_hashes)
+            ]
+            self.db.execute(insert(Embedding), rows)
+
+        logger.info(f"Inserted {len(chunks)} embeddings for file {file_id} ({'COPY' if use_copy else 'multi-row INSERT'})")
+        return len(chunks)
+
+    def _copy_embeddings(
+        self, file_id: int, user_id: str, chunks: list[str], embeddings: list[list[float]], chunk_hashes: list[str]
+    ):
+        """Stream rows through COPY ... FROM STDIN (FORMAT binary) on the session's connection."""
+        payload = build_copy_payload(
+            (
+                (file_id, user_id, chunk, chunk_hash, vector)
+                for chunk, vector, chunk_hash in zip(chunks, embeddings, chunk_hashes)
+            ),
+            [encode_int4, encode_text, encode_text, encode_text, encode_vector],
+        )
+        # Reuse the session's DBAPI connection so COPY joins the current transaction
+        dbapi_conn = self.db.connection().connection
+        with dbapi_conn.cursor() as cursor:
+            cursor.copy_expert(
+                "COPY embeddings (file_id, user_id, content_chunk, chunk_hash, embedding_vector) "
+                "FROM STDIN WITH (FORMAT binary)",
+                payload,
+            )
+
+    def refresh_file_summary(self, file_id: int) -> None:
+        """
+        Set the file's summary vector to the mean of its chunk embeddings.
+        Computed by Postgres over the stored rows, so incremental re-uploads
+        stay exact. Does not commit.
+        """
+        centroid = select(func.avg(Embedding.embedding_vector)).where(Embedding.file_id == file_id)
+        self.db.execute(
+            update(UploadedFile)
+            .where(UploadedFile.id == file_id)
+            .values(summary_vector=centroid.scalar_subquery())
+        )
+
+    def get_top_k_files(self, query_vector: np.ndarray, top_k: int, user_id: str) -> list[int]:
+        """
+        Ids of the user's `top_k` files whose summary vector is closest to the
+        query, or None when the user has no more than `top_k` files (every file
+        would be searched anyway).
+        """
         try:
-            for chunk, vector in zip(chunks, embeddings):
-                # Ensure each embedding vector is a Python list
-                if isinstance(vector, np.ndarray):
-                    vector = vector.tolist()
-
-                emb_obj = Embedding(
-                    file_id=file_entry.id,
-                    content_chunk=chunk,
-                    embedding_vector=vector,
-                )
-                self.db.add(emb_obj)
-            self.db.commit()
+            if isinstance(query_vector, np.ndarray):
+                query_vector = query_vector.astype(np.float32, copy=False)
+            rows = self.db.execute(
+                select(UploadedFile.id)
+                .where(UploadedFile.user_id == user_id)
+                .order_by(UploadedFile.summary_vector.cosine_distance(query_vector))
+                .limit(top_k + 1)
+            ).all()
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Failed to store embeddings for {filename}: {e}")
-            raise ValidationError(f"Failed to store embeddings: {e}")
+            logger.error(f"Failed to rank files for user {user_id}: {e}")
+            raise ValidationError(f"Failed to rank files: {e}")
+        if len(rows) <= top_k:
+            return None
+        return [row[0] for row in rows[:top_k]]
 
-        return file_entry, embeddings
+    def get_by_ids(self, ids: list[int], with_vectors: bool = False) -> list[RetrievedChunk]:
+        """Chunk records for `ids`, in the order given."""
+        if not ids:
+            return []
+        stmt = self._chunk_select(with_vectors=with_vectors).where(Embedding.id.in_(ids))
+        by_id = {chunk.id: chunk for chunk in self._records(stmt)}
+        return [by_id[i] for i in ids if i in by_id]
 
-    def get_top_k_similar(self, query_vector: np.ndarray, top_k: int = 5):
+    def iter_user_vectors(self, user_id: str, after_id: int = 0, batch_size: int = 2000):
+        """Yield (ids, float32 matrix) batches of a user's vectors with id > after_id, by id."""
+        query = (
+            self.db.query(Embedding.id, Embedding.embedding_vector)
+            .filter(Embedding.user_id == user_id, Embedding.id > after_id)
+            .order_by(Embedding.id)
+            .execution_options(yield_per=batch_size)
+        )
+        ids, vectors = [], []
+        for row_id, vector in query:
+            ids.append(row_id)
+            vectors.append(vector)
+            if len(ids) == batch_size:
+                yield ids, np.asarray(vectors, dtype=np.float32)
+                ids, vectors = [], []
+        if ids:
+            yield ids, np.asarray(vectors, dtype=np.float32)
+
+    def _chunk_select(self, distance=None, with_vectors: bool = False):
+        """
+        Projection of the columns retrieval needs, with the source filename
+        joined in the same statement. The 1024-dim vector is only selected
+        when a re-ranking stage asks for it.
         """
-        Retrieve the top-k most similar embeddings using pgvector cosine distance.
+        columns = [
+            Embedding.id,
+            Embedding.file_id,
+            Embedding.content_chunk,
+            (distance if distance is not None else null()).label("distance"),
+            UploadedFile.filename,
+        ]
+        if with_vectors:
+            columns.append(Embedding.embedding_vector)
+        return select(*columns).outerjoin(UploadedFile, UploadedFile.id == Embedding.file_id)
+
+    def _records(self, stmt) -> list[RetrievedChunk]:
+        return [RetrievedChunk(*row) for row in self.db.execute(stmt)]
+
+    @staticmethod
+    def _require_user(user_id: str) -> None:
+        # Every search is scoped to one user's documents; never rank across tenants
+        if not user_id:
+            raise ValidationError("user_id is required for retrieval")
+
+    def get_top_k_similar(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        user_id: str = None,
+        with_vectors: bool = False,
+        file_ids: list[int] = None,
+    ) -> list[RetrievedChunk]:
         """
+        Retrieve the top-k most similar chunks using pgvector cosine distance.
+        The vector is sent as a bound parameter, so the statement text (and its
+        plan) is the same for every query and the ANN index can serve it.
+        Only `user_id`'s chunks are ranked; with `file_ids`, only chunks of
+        those files.
+
+        In halfvec precision, candidates come from the half-precision index and
+        are re-ranked by full-precision distance in the same statement.
+        """
+        self._require_user(user_id)
         try:
-            # Ensure query_vector is a Python list for SQL query
             if isinstance(query_vector, np.ndarray):
-                query_vector = query_vector.tolist()
+                query_vector = query_vector.astype(np.float32, copy=False)
 
-            results = (
-            self.db.query(Embedding)
-            .order_by(text(f"embedding_vector <=> ARRAY{query_vector}::vector"))
-            .limit(top_k)
-            .all()
-          )
-            return results
+            distance = Embedding.embedding_vector.cosine_distance(query_vector)
+            stmt = self._chunk_select(distance, with_vectors=with_vectors)
+            if self.index_manager.precision == "halfvec":
+                candidates = max(settings.VECTOR_RESCORE_CANDIDATES, top_k)
+                self.index_manager.apply_search_params(self.db, candidates)
+                compact = cast(Embedding.embedding_vector, HALFVEC(self.index_manager.dim))
+                candidate_ids = select(Embedding.id).where(Embedding.user_id == user_id)
+                if file_ids is not None:
+                    candidate_ids = candidate_ids.where(Embedding.file_id.in_(file_ids))
+                candidate_ids = (
+                    candidate_ids
+                    .order_by(compact.cosine_distance(query_vector))
+                    .limit(candidates)
+                )
+                stmt = stmt.where(Embedding.id.in_(candidate_ids))
+            else:
+                self.index_manager.apply_search_params(self.db, top_k)
+                stmt = stmt.where(Embedding.user_id == user_id)
+                if file_ids is not None:
+                    stmt = stmt.where(Embedding.file_id.in_(file_ids))
+
+            records = self._records(stmt.order_by(distance).limit(top_k))
+            # hnsw.iterative_scan = relaxed_order may return rows slightly out of order
+            records.sort(key=lambda chunk: chunk.distance)
+            return records
         except Exception as e:
             logger.error(f"Failed to retrieve top-{top_k} embeddings: {e}")
             raise ValidationError(f"Failed to retrieve embeddings: {e}")
+
+    def get_top_k_similar_batch(
+        self,
+        query_vectors: list,
+        top_k: int = 5,
+        user_id: str = None,
+        with_vectors: bool = False,
+    ) -> list[list[RetrievedChunk]]:
+        """
+        Top-k chunks for each of several query vectors in one round trip.
+
+        The vectors are bound as a single vector[] parameter and unnested
+        WITH ORDINALITY; a LATERAL subquery runs the same ranking as
+        `get_top_k_similar` once per row, so every query can use the ANN index.
+        Results come back in the order of `query_vectors`.
+        """
+        self._require_user(user_id)
+        if not len(query_vectors):
+            return []
+        try:
+            dim = self.index_manager.dim
+            vector_array = ARRAY(VECTOR(dim))
+            vectors = [np.asarray(v, dtype=np.float32) for v in query_vectors]
+            queries = (
+                func.unnest(cast(bindparam("query_vectors", vectors, type_=vector_array), vector_array))
+                .table_valued("vector", with_ordinality="query_index")
+                .render_derived(name="queries")
+            )
+
+            distance = Embedding.embedding_vector.cosine_distance(queries.c.vector)
+            hits = self._chunk_select(distance, with_vectors=with_vectors)
+            if self.index_manager.precision == "halfvec":
+                candidates = max(settings.VECTOR_RESCORE_CANDIDATES, top_k)
+                self.index_manager.apply_search_params(self.db, candidates)
+                compact = cast(Embedding.embedding_vector, HALFVEC(dim))
+                candidate_ids = (
+                    select(Embedding.id)
+                    .where(Embedding.user_id == user_id)
+                    .order_by(compact.cosine_distance(cast(queries.c.vector, HALFVEC(dim))))
+                    .limit(candidates)
+                )
+                hits = hits.where(Embedding.id.in_(candidate_ids))
+            else:
+                self.index_manager.apply_search_params(self.db, top_k)
+                hits = hits.where(Embedding.user_id == user_id)
+            hits = hits.order_by(distance).limit(top_k).lateral("hits")
+
+            stmt = (
+                select(queries.c.query_index, hits)
+                .select_from(queries)
+                .join(hits, true())
+                .order_by(queries.c.query_index, hits.c.distance)
+            )
+            results: list[list[RetrievedChunk]] = [[] for _ in vectors]
+            for query_index, *row in self.db.execute(stmt):
+                results[query_index - 1].append(RetrievedChunk(*row))
+            return results
+        except Exception as e:
+            logger.error(f"Failed to retrieve top-{top_k} embeddings for {len(query_vectors)} queries: {e}")
+            raise ValidationError(f"Failed to retrieve embeddings: {e}")
+
+    def get_top_k_lexical(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        user_id: str = None,
+        with_vectors: bool = False,
+    ) -> list[RetrievedChunk]:
+        """
+        Full-text top-k over the GIN-indexed `content_tsv` column, ranked by
+        ts_rank_cd. `websearch_to_tsquery` accepts free text ("quoted phrases",
+        -exclusions) and never raises on user syntax.
+        """
+        self._require_user(user_id)
+        try:
+            tsquery = func.websearch_to_tsquery(FTS_CONFIG, query_text)
+            stmt = self._chunk_select(with_vectors=with_vectors).where(
+                Embedding.user_id == user_id, Embedding.content_tsv.op("@@")(tsquery)
+            )
+            stmt = stmt.order_by(func.ts_rank_cd(Embedding.content_tsv, tsquery).desc()).limit(top_k)
+            return self._records(stmt)
+        except Exception as e:
+            logger.error(f"Failed to run full-text search for top-{top_k}: {e}")
+            raise ValidationError(f"Failed to run full-text search: {e}")
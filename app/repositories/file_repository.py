@@ -21,3 +21,11 @@ class FileRepository(BaseRepository[UploadedFile]):
             .filter(self.model.user_id == user_id, self.model.filename == filename)
             .first()
         )
+
+    # Get a user's file with identical content (whole-file dedup)
+    def get_by_content_hash(self, db: Session, user_id: str, content_hash: str) -> Optional[UploadedFile]:
+        return (
+            db.query(self.model)
+            .filter(self.model.user_id == user_id, self.model.content_hash == content_hash)
+            .first()
+        )
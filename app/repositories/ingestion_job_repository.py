@@ -0,0 +1,87 @@
+# app/repositories/ingestion_job_repository.py
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.repositories.base import BaseRepository
+from app.models.ingestion_job import IngestionJob
+
+
+class IngestionJobRepository(BaseRepository[IngestionJob]):
+    def __init__(self, db: Session):
+        super().__init__(IngestionJob, db)
+
+    def create_job(self, user_id: str, filename: str, file_path: str, spool_path: str) -> IngestionJob:
+        job = IngestionJob(
+            user_id=user_id,
+            filename=filename,
+            file_path=file_path,
+            spool_path=spool_path,
+            status="queued",
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[IngestionJob]:
+        return self.db.query(self.model).filter(self.model.id == job_id).first()
+
+    def get_for_user(self, job_id: str, user_id: str) -> Optional[IngestionJob]:
+        return (
+            self.db.query(self.model)
+            .filter(self.model.id == job_id, self.model.user_id == user_id)
+            .first()
+        )
+
+    def claim(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Atomically move a queued job to running. Returns None if the job is
+        missing or another worker claimed it first.
+        """
+        job = self.db.execute(
+            update(self.model)
+            .where(self.model.id == job_id, self.model.status == "queued")
+            .values(status="running", error=None, updated_at=func.now())
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        ).scalars().first()
+        self.db.commit()
+        return job
+
+    def heartbeat(self, job_id: str) -> None:
+        """Extend the lease of a running job (its `updated_at`)."""
+        self.db.execute(
+            update(self.model)
+            .where(self.model.id == job_id, self.model.status == "running")
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def requeue_expired(self, lease_seconds: float) -> int:
+        """Running jobs whose worker stopped heartbeating go back to queued."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        result = self.db.execute(
+            update(self.model)
+            .where(self.model.status == "running", self.model.updated_at < cutoff)
+            .values(status="queued")
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def get_queued(self) -> List[IngestionJob]:
+        return (
+            self.db.query(self.model)
+            .filter(self.model.status == "queued")
+            .order_by(self.model.created_at)
+            .all()
+        )
+
+    def update_job(self, job: IngestionJob, **fields) -> IngestionJob:
+        for field, value in fields.items():
+            setattr(job, field, value)
+        self.db.commit()
+        return job
@@ -0,0 +1,277 @@
+# app/repositories/mmap_vector_store.py
+"""
+Per-user vector store on memory-mapped files.
+
+Layout under `root/<sha256(user_id)[:32]>/`:
+
+    meta.json          {"dim", "dtype", "count", "max_id", "generation"}
+    vectors.<gen>.bin  row-major (count, dim) matrix, unit-normalized
+                       (float32, float16, or int8 codes)
+    ids.<gen>.bin      int64 embedding ids, one per row
+    scales.<gen>.bin   float32 per-row scales (int8 only)
+
+Only `meta.json` decides what is visible: writers append rows to the data
+files first and then atomically replace `meta.json`, so readers never see a
+partial row. A rebuild writes a new generation and swaps it in the same way;
+readers holding the old mapping keep a valid (unlinked) file until they
+reopen. Files are opened read-only with np.memmap, so every worker process
+shares the same pages through the OS page cache.
+
+Postgres stays the source of truth; `sync_from` copies a user's rows out of
+`embeddings`, incrementally by id or as a full rebuild.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.quantization import int8_dot, quantize_int8
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_BLOCK_ROWS = 2048  # rows scored at a time (compact blocks are widened to float32 in cache)
+_DTYPES = ("float32", "float16", "int8")
+
+
+class MmapVectorStore:
+    def __init__(self, root: str, dim: int = 1024, dtype: str = "float32"):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Vector store dtype must be one of {_DTYPES}")
+        self.root = root
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        # user dir -> ((meta inode, mtime_ns), meta, ids, matrix, scales)
+        self._readers: Dict[str, tuple] = {}
+        self._readers_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def compact(self) -> bool:
+        """True when stored vectors are lossy and results deserve full-precision re-scoring."""
+        return self.dtype != np.float32
+
+    # ---------- files ----------
+
+    def _user_dir(self, user_id: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32])
+
+    @staticmethod
+    def _paths(udir: str, generation: int) -> Tuple[str, str, str]:
+        return (
+            os.path.join(udir, f"vectors.{generation}.bin"),
+            os.path.join(udir, f"ids.{generation}.bin"),
+            os.path.join(udir, f"scales.{generation}.bin"),
+        )
+
+    @staticmethod
+    def _read_meta(udir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(udir, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_meta(udir: str, meta: dict) -> None:
+        tmp = os.path.join(udir, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(udir, "meta.json"))
+
+    @contextmanager
+    def _write_lock(self, udir: str):
+        """Serialize writers for one user across processes."""
+        os.makedirs(udir, exist_ok=True)
+        with open(os.path.join(udir, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _prepare(self, vectors) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Unit-normalize and encode rows: (matrix, None) or (int8 codes, scales)."""
+        vecs = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vecs = vecs / norms
+        if self.dtype == np.int8:
+            return quantize_int8(vecs)
+        return vecs.astype(self.dtype), None
+
+    def _append_rows(self, udir: str, meta: dict, ids, vectors) -> None:
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        vec_path, ids_path, scales_path = self._paths(udir, meta["generation"])
+        data, scales = self._prepare(vectors)
+        files = [(vec_path, data, self.dim * self.dtype.itemsize), (ids_path, ids, 8)]
+        if scales is not None:
+            files.append((scales_path, scales, 4))
+        for path, data, row_bytes in files:
+            with open(path, "ab") as f:
+                # Drop bytes a crashed writer appended past the committed count
+                f.truncate(meta["count"] * row_bytes)
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        meta["count"] += len(ids)
+        meta["max_id"] = max(meta["max_id"], int(ids.max()))
+
+    def _new_meta(self, generation: int = 0) -> dict:
+        return {
+            "dim": self.dim, "dtype": self.dtype.name, "count": 0, "max_id": 0, "generation": generation,
+        }
+
+    # ---------- writes ----------
+
+    def append(self, user_id: str, ids: List[int], vectors) -> None:
+        udir = self._user_dir(user_id)
+        with self._write_lock(udir):
+            meta = self._read_meta(udir) or self._new_meta()
+            if meta["dtype"] != self.dtype.name:
+                raise ValueError(
+                    f"Stored vectors are {meta['dtype']}, not {self.dtype.name}; rebuild with sync_from(rebuild=True)"
+                )
+            self._append_rows(udir, meta, ids, vectors)
+            self._write_meta(udir, meta)
+
+    def replace(self, user_id: str, batches: Iterable[Tuple[List[int], np.ndarray]]) -> None:
+        """Rebuild a user's store from `(ids, vectors)` batches as a new generation."""
+        udir = self._user_dir(user_id)
+        with self._write_lock(udir):
+            old = self._read_meta(udir)
+            meta = self._new_meta(old["generation"] + 1 if old else 0)
+            for path in self._paths(udir, meta["generation"]):
+                open(path, "wb").close()
+            for ids, vectors in batches:
+                self._append_rows(udir, meta, ids, vectors)
+            self._write_meta(udir, meta)
+            if old:
+                for path in self._paths(udir, old["generation"]):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def drop(self, user_id: str) -> None:
+        udir = self._user_dir(user_id)
+        with self._readers_lock:
+            self._readers.pop(udir, None)
+        shutil.rmtree(udir, ignore_errors=True)
+
+    def sync_from(self, embedding_repo, user_id: str, rebuild: bool = False) -> int:
+        """
+        Bring a user's store up to date with Postgres. Appends rows with ids above
+        the stored maximum, or rebuilds from scratch (needed after deletions).
+        Returns the number of rows written.
+        """
+        meta = self._read_meta(self._user_dir(user_id))
+        # A changed VECTOR_STORE_DTYPE migrates the user's store on its next sync
+        rebuild = rebuild or meta is None or meta["dtype"] != self.dtype.name
+        written = 0
+
+        def counted(batches):
+            nonlocal written
+            for ids, vectors in batches:
+                written += len(ids)
+                yield ids, vectors
+
+        if rebuild:
+            self.replace(user_id, counted(embedding_repo.iter_user_vectors(user_id)))
+        else:
+            for ids, vectors in counted(embedding_repo.iter_user_vectors(user_id, after_id=meta["max_id"])):
+                self.append(user_id, ids, vectors)
+        mode = "rebuild" if rebuild else "append"
+        logger.info(f"Vector store sync for user {user_id}: {written} rows ({mode})")
+        return written
+
+    # ---------- reads ----------
+
+    def exists(self, user_id: str) -> bool:
+        return os.path.exists(os.path.join(self._user_dir(user_id), "meta.json"))
+
+    def _open(self, user_id: str) -> Optional[tuple]:
+        """(meta, ids, matrix, scales or None) for a user's current generation."""
+        udir = self._user_dir(user_id)
+        try:
+            st = os.stat(os.path.join(udir, "meta.json"))
+        except FileNotFoundError:
+            return None
+
+        with self._readers_lock:
+            cached = self._readers.get(udir)
+            # os.replace gives every meta.json a new inode
+            version = (st.st_ino, st.st_mtime_ns)
+            if cached is not None and cached[0] == version:
+                return cached[1:]
+
+            meta = self._read_meta(udir)
+            count = meta["count"]
+            vec_path, ids_path, scales_path = self._paths(udir, meta["generation"])
+            scales = None
+            if count:
+                matrix = np.memmap(vec_path, dtype=meta["dtype"], mode="r", shape=(count, meta["dim"]))
+                ids = np.memmap(ids_path, dtype=np.int64, mode="r", shape=(count,))
+                if meta["dtype"] == "int8":
+                    scales = np.memmap(scales_path, dtype=np.float32, mode="r", shape=(count,))
+            else:
+                matrix = np.empty((0, meta["dim"]), dtype=meta["dtype"])
+                ids = np.empty(0, dtype=np.int64)
+            self._readers[udir] = (version, meta, ids, matrix, scales)
+            return meta, ids, matrix, scales
+
+    def search(self, user_id: str, query_vector, top_k: int = 5) -> List[Tuple[int, float]]:
+        """Exact top-k by cosine similarity: [(embedding id, score)], best first."""
+        opened = self._open(user_id)
+        if opened is None or top_k <= 0:
+            return []
+        _, ids, matrix, scales = opened
+        if not len(ids):
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        cand_rows, cand_scores = [], []
+        for start in range(0, len(ids), _SEARCH_BLOCK_ROWS):
+            block = slice(start, start + _SEARCH_BLOCK_ROWS)
+            if scales is not None:
+                scores = int8_dot(matrix[block], scales[block], query)
+            else:
+                # float16 has no BLAS path; score each block in float32
+                scores = np.asarray(matrix[block], dtype=np.float32) @ query
+            if len(scores) > top_k:
+                part = np.argpartition(scores, -top_k)[-top_k:]
+            else:
+                part = np.arange(len(scores))
+            cand_rows.append(part + start)
+            cand_scores.append(scores[part])
+
+        rows = np.concatenate(cand_rows)
+        scores = np.concatenate(cand_scores)
+        order = np.argsort(-scores)[:top_k]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in order]
+
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> MmapVectorStore:
+    """Process-wide handle on the local vector store."""
+    return MmapVectorStore(settings.VECTOR_STORE_DIR, dtype=settings.VECTOR_STORE_DTYPE)
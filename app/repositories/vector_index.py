@@ -0,0 +1,117 @@
+# app/repositories/vector_index.py
+import logging
+import math
+from typing import Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAMES = {
+    "full": "ix_embeddings_embedding_vector_ann",
+    "halfvec": "ix_embeddings_embedding_half_ann",
+}
+INDEX_NAME = INDEX_NAMES["full"]
+_INDEX_TYPES = ("hnsw", "ivfflat", "none")
+_PRECISIONS = tuple(INDEX_NAMES)
+
+
+class VectorIndexManager:
+    """
+    Creates the approximate-nearest-neighbour index on `embeddings.embedding_vector`
+    and applies its per-query search parameters.
+
+    - hnsw: `m` / `ef_construction` at build time, `hnsw.ef_search` per query.
+    - ivfflat: `lists` at build time (rows / 1000, sqrt(rows) past 1M rows),
+      `ivfflat.probes` per query. Build it after data is loaded; lists are
+      trained on the rows present at creation time.
+    - none: exact sequential scan.
+
+    With precision "halfvec" the index is built on `embedding_vector::halfvec(dim)`:
+    half the index memory, searched on the compact form and re-scored at full
+    precision by the repository.
+    """
+
+    def __init__(
+        self,
+        index_type: str = None,
+        table: str = "embeddings",
+        column: str = "embedding_vector",
+        index_name: str = None,
+        precision: str = None,
+        dim: int = 1024,
+    ):
+        index_type = (index_type or settings.VECTOR_INDEX_TYPE).lower()
+        if index_type not in _INDEX_TYPES:
+            raise ValueError(f"Unknown vector index type '{index_type}', expected one of {_INDEX_TYPES}")
+        precision = (precision or settings.VECTOR_SEARCH_PRECISION).lower()
+        if precision not in _PRECISIONS:
+            raise ValueError(f"Unknown vector search precision '{precision}', expected one of {_PRECISIONS}")
+        self.index_type = index_type
+        self.precision = precision
+        self.table = table
+        self.column = column
+        self.dim = dim
+        self.index_name = index_name or INDEX_NAMES[precision]
+
+    def _ivfflat_lists(self, conn: Connection) -> int:
+        if settings.IVFFLAT_LISTS > 0:
+            return settings.IVFFLAT_LISTS
+        rows = conn.execute(text(f"SELECT count(*) FROM {self.table}")).scalar() or 0
+        lists = rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+        return max(lists, 1)
+
+    def create_index_sql(self, conn: Connection) -> str:
+        if self.index_type == "hnsw":
+            with_clause = f"m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION}"
+        else:
+            with_clause = f"lists = {self._ivfflat_lists(conn)}"
+        if self.precision == "halfvec":
+            target = f"(({self.column}::halfvec({self.dim})) halfvec_cosine_ops)"
+        else:
+            target = f"({self.column} vector_cosine_ops)"
+        return (
+            f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {self.table} "
+            f"USING {self.index_type} {target} WITH ({with_clause})"
+        )
+
+    def ensure_index(self, engine: Engine, rebuild: bool = False) -> None:
+        """Create the configured index if missing (or drop and recreate it with `rebuild`)."""
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.begin() as conn:
+            if rebuild or self.index_type == "none":
+                conn.execute(text(f"DROP INDEX IF EXISTS {self.index_name}"))
+            if self.index_type == "none":
+                logger.info("Vector index disabled; searches use an exact scan")
+                return
+            conn.execute(text(self.create_index_sql(conn)))
+        logger.info(f"Vector index {self.index_name} ({self.index_type}) is in place")
+
+    def apply_search_params(self, db: Union[Session, Connection], top_k: int = 0) -> None:
+        """
+        Set the index search breadth for the current transaction.
+        `set_config(..., true)` is the bind-parameter form of `SET LOCAL`.
+        """
+        dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+        if dialect.name != "postgresql":
+            return
+        if self.index_type == "hnsw":
+            # ef_search below k would silently return fewer than k rows
+            value = max(settings.HNSW_EF_SEARCH, top_k)
+            db.execute(text("SELECT set_config('hnsw.ef_search', :v, true)"), {"v": str(value)})
+            if settings.HNSW_ITERATIVE_SCAN:
+                # Filtered (per-user) scans keep walking the graph until k rows match
+                db.execute(
+                    text("SELECT set_config('hnsw.iterative_scan', :v, true)"),
+                    {"v": settings.HNSW_ITERATIVE_SCAN},
+                )
+        elif self.index_type == "ivfflat":
+            db.execute(
+                text("SELECT set_config('ivfflat.probes', :v, true)"),
+                {"v": str(settings.IVFFLAT_PROBES)},
+            )
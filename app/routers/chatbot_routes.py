@@ -2,16 +2,33 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.deps import get_current_user
-from app.clients.supabase_client import get_db
+from app.clients.supabase_client import get_db, SessionLocal
 from app.graph.langgraph_chatbot import ChatbotGraph
 from app.agents.chatbot_agent import ChatbotService
+from app.utils.sse import sse_response
 import asyncio
+from typing import AsyncIterator
 
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
 
 class ChatRequest(BaseModel):
     message: str
+    stream: bool = False  # answer as Server-Sent Events
+
+
+async def stream_chat(message: str, user_id: str) -> AsyncIterator[str]:
+    """
+    SSE frames for one message. The request's `get_db` session is closed as
+    soon as the endpoint returns, before the body streams, so the stream opens
+    and closes its own session.
+    """
+    db = SessionLocal()
+    try:
+        async for frame in ChatbotGraph(db).stream_events(message, user_id):
+            yield frame
+    finally:
+        db.close()
 
 
 @router.post("/")
@@ -24,7 +41,11 @@ async def chat_endpoint(
     Main chatbot endpoint.
     Runs the LangGraph workflow, which orchestrates agents
     (lesson, video, web, rag, calendar, etc.).
+    With `stream`, the answer is sent as Server-Sent Events.
     """
+    if request.stream:
+        return sse_response(stream_chat(request.message, user["sub"]))
+
     graph = ChatbotGraph(db).build()
 
     # Run the graph with user message
@@ -1,10 +1,12 @@
 import logging
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.deps import get_current_user
 from app.clients.supabase_client import get_db
 from app.container.core_container import container  # global singleton container
+from app.schemas.ingestion import IngestionJobOut
+from app.utils.sse import answer_events, sse_response
 
 # Configure logger
 logger = logging.getLogger("tutor_routes")
@@ -23,6 +25,7 @@ router = APIRouter(prefix="/tutor", tags=["Tutor"])
 # Use services directly from container
 file_processing_service = container.file_processing_service
 embedding_service = container.embedding_service
+ingestion_jobs = container.ingestion_jobs
 storage_service = container.storage_service
 rag_service = container.rag_service
 summarize_video_service = container.summarize_video_service
@@ -32,7 +35,7 @@ class VideoLink(BaseModel):
     url: str
 
 
-@router.post("/upload")
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_and_embed(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -51,29 +54,40 @@ async def upload_and_embed(
     )
     logger.info(f"File '{file.filename}' uploaded successfully")
 
-    # Extract and chunk text
-    text = file_processing_service.extract_text_from_pdf(file_bytes)
-    chunks = file_processing_service.chunk_text(text)
-    logger.info(f"Extracted and chunked text into {len(chunks)} chunks")
-
-    # Create embeddings (async)
-    await embedding_service.create_and_store_embeddings(
+    # Extraction, chunking and embedding run in the background ingestion queue
+    job = await ingestion_jobs.submit(
         user_id=current_user["sub"],
         filename=file.filename,
         file_path=file_path,
-        chunks=chunks
+        file_bytes=file_bytes,
     )
-    logger.info(f"Embeddings stored for file '{file.filename}'")
+    logger.info(f"Ingestion job {job.id} queued for file '{file.filename}'")
+
+    return {"message": "File uploaded, ingestion queued", "job_id": job.id, "status": job.status}
+
 
-    return {"message": "File uploaded and embeddings stored", "num_chunks": len(chunks)}
+@router.get("/jobs/{job_id}", response_model=IngestionJobOut)
+async def get_ingestion_job(
+    job_id: str,
+    current_user=Depends(get_current_user),
+):
+    job = ingestion_jobs.get_job(job_id, user_id=current_user["sub"])
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingestion job not found")
+    return job
 
 @router.post("/ask")
 async def ask_question(
     question: str,
+    stream: bool = False,
     current_user=Depends(get_current_user),
 ):
     logger.info(f"User {current_user['sub']} asking question: {question}")
 
+    if stream:
+        # Server-Sent Events: token deltas as they are generated, then the full answer
+        return sse_response(answer_events(rag_service.chat_stream(user_input=question, user_id=current_user['sub'])))
+
     # Use RAG service from container
     answer =await rag_service.chat(user_input=question, user_id=current_user['sub'])
 
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class IngestionJobOut(BaseModel):
+    id: str
+    filename: str
+    status: str
+    pages_done: int
+    chunks_done: int
+    vectors_done: int
+    chunks_reused: int = 0
+    chunks_deleted: int = 0
+    file_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -7,6 +7,9 @@ from app.models.file import UploadedFile
 from app.repositories.embedding_repository import EmbeddingRepository
 from app.exceptions.base_exceptions import ExternalServiceError, ValidationError
 from app.clients.cohere_client import CohereClient
+from app.cache.embedding_cache import get_embedding_cache
+from app.cache.query_cache import get_query_embedding_cache
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,36 +27,97 @@ class EmbeddingService:
         except ValueError as e:
             raise ExternalServiceError(f"Cohere embedding client not available: {e}")
 
-    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        if not texts:
-            return []
+        # Shared (model, text-hash) -> vector cache; None when disabled
+        self.cache = get_embedding_cache()
+        # Normalized-question memo in front of embed_query; None when disabled
+        self.query_cache = get_query_embedding_cache()
 
-        embeddings = []
-        for text in texts:
-            emb = await self.client.embed(text)
+    @property
+    def model_name(self) -> str:
+        return self.client.embedding_model
+
+    async def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        # Pack chunks into provider-sized batches, several batches in flight at once
+        embeddings = await self.client.embed_many(
+            texts,
+            batch_size=settings.EMBED_BATCH_SIZE,
+            max_concurrency=settings.EMBED_MAX_CONCURRENCY,
+        )
 
-            # Dimension check
+        # Dimension check
+        for emb in embeddings:
             if len(emb) != EXPECTED_DIM:
                 raise ValidationError(
                     f"Embedding dimension mismatch: got {len(emb)}, expected {EXPECTED_DIM}"
                 )
+        return embeddings
+
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
 
-            embeddings.append(emb)
+        if self.cache is None:
+            embeddings = await self._embed_uncached(texts)
+            logger.info(f"Generated {len(embeddings)} embeddings via CohereClient")
+            return embeddings
 
-        logger.info(f"Generated {len(embeddings)} embeddings via CohereClient")
+        embeddings = self.cache.get_many(self.model_name, texts)
+
+        # Only send texts we have never seen, each one once
+        pending = {}
+        for text, emb in zip(texts, embeddings):
+            if emb is None:
+                pending.setdefault(self.cache.make_key(self.model_name, text), text)
+
+        if pending:
+            new_texts = list(pending.values())
+            new_embeddings = await self._embed_uncached(new_texts)
+            self.cache.set_many(self.model_name, new_texts, new_embeddings)
+            by_key = dict(zip(pending.keys(), new_embeddings))
+            embeddings = [
+                emb if emb is not None else by_key[self.cache.make_key(self.model_name, text)]
+                for text, emb in zip(texts, embeddings)
+            ]
+
+        logger.info(
+            f"Embeddings for {len(texts)} texts: {len(texts) - len(pending)} from cache, "
+            f"{len(pending)} generated via CohereClient"
+        )
         return embeddings
 
     async def embed_query(self, query: str) -> List[float]:
         if not query.strip():
             raise ValidationError("Query text is empty")
 
+        if self.query_cache is None:
+            return await self._embed_query_uncached(query)
+        return await self.query_cache.get_or_compute(
+            self.model_name, query, lambda: self._embed_query_uncached(query)
+        )
+
+    async def _embed_query_uncached(self, query: str) -> List[float]:
+        if self.cache is not None:
+            cached = self.cache.get(self.model_name, query)
+            if cached is not None:
+                return cached
+
         emb = await self.client.embed(query)
         if len(emb) != EXPECTED_DIM:
             raise ValidationError(
                 f"Query embedding dimension mismatch: got {len(emb)}, expected {EXPECTED_DIM}"
             )
+
+        if self.cache is not None:
+            self.cache.set(self.model_name, query, emb)
         return emb
 
+    def cache_stats(self) -> dict:
+        """Hit/miss metrics of the embedding caches, for logging and monitoring."""
+        return {
+            "query_cache": self.query_cache.stats() if self.query_cache else None,
+            "embedding_cache": self.cache.stats() if self.cache else None,
+        }
+
     async def create_and_store_embeddings(
         self,
         user_id: str,
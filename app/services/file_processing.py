@@ -1,36 +1,106 @@
 # app/services/file_processing.py
 import pdfplumber
 from io import BytesIO
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import AsyncIterator, Iterator, List, Optional
+from app.core.config import settings
 from app.exceptions.base_exceptions import ValidationError, ExternalServiceError
+from app.services.pdf_extraction import PdfExtractionEngine
+from app.utils.chunker import TokenChunker
+
+
+class TextChunkStream:
+    """
+    Incremental chunker: feed page texts one at a time and get back the
+    chunks that are complete so far. Only a small tail is kept between
+    pages, so memory does not grow with document size.
+    """
+
+    def __init__(self, chunker: TokenChunker, buffer_chunks: int = 4):
+        self.chunker = chunker
+        self.buffer_chunks = buffer_chunks
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text + "\n"
+        spans = self.chunker.split_spans(self.buffer)
+        if len(spans) <= self.buffer_chunks:
+            return []
+        chunks = [self.buffer[s:e] for s, e in spans[:-1]]
+        # The last chunk may continue on the next page; carry it over
+        self.buffer = self.buffer[spans[-1][0]:]
+        return chunks
+
+    def finish(self) -> List[str]:
+        chunks = self.chunker.split(self.buffer)
+        self.buffer = ""
+        return chunks
 
 
 class FileProcessingService:
 
-    def extract_text_from_pdf(self, file_bytes: bytes) -> str:
+    def __init__(self, extraction_engine: Optional[PdfExtractionEngine] = None):
+        self.extraction_engine = extraction_engine or PdfExtractionEngine()
+
+    def iter_pdf_pages(self, file_bytes: bytes) -> Iterator[str]:
+        """Yield the text of each PDF page in order, releasing page objects as it goes."""
         try:
-            text = ""
             # Wrap bytes in BytesIO to make it file-like
             with pdfplumber.open(BytesIO(file_bytes)) as pdf:
                 for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                    page_text = page.extract_text() or ""
+                    page.flush_cache()
+                    yield page_text
+        except Exception as e:
+            raise ExternalServiceError(f"Failed to extract text from PDF: {str(e)}")
+
+    def extract_text_from_pdf(self, file_bytes: bytes) -> str:
+        try:
+            text = "".join(
+                page_text + "\n" for page_text in self.iter_pdf_pages(file_bytes) if page_text
+            )
             if not text.strip():
                 raise ValidationError("PDF contains no extractable text.")
             return text
         except Exception as e:
             raise ExternalServiceError(f"Failed to extract text from PDF: {str(e)}")
 
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 50) -> list[str]:
+    async def aiter_pdf_pages(self, file_bytes: bytes) -> AsyncIterator[str]:
+        """Async page iterator backed by the process-pool extraction engine."""
+        async for batch in self.extraction_engine.iter_page_batches(file_bytes):
+            for page_text in batch:
+                yield page_text
+
+    async def extract_text_from_pdf_async(self, file_bytes: bytes) -> str:
+        """Non-blocking variant of `extract_text_from_pdf` for async handlers."""
+        pages = await self.extraction_engine.extract_pages(file_bytes)
+        text = "".join(page_text + "\n" for page_text in pages if page_text)
+        if not text.strip():
+            raise ValidationError("PDF contains no extractable text.")
+        return text
+
+    def chunk_spans(
+        self, text: str, chunk_size: int = None, overlap: int = None
+    ) -> list[tuple[int, int]]:
+        """(start, end) offsets of token-bounded, sentence-aligned chunks of `text`."""
+        return self._chunker(chunk_size, overlap).split_spans(text)
+
+    def chunk_text(self, text: str, chunk_size: int = None, overlap: int = None) -> list[str]:
+        """Split text into chunks of at most `chunk_size` tokens with `overlap` tokens of overlap."""
         try:
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=overlap
-            )
-            chunks = splitter.split_text(text)
+            chunks = [text[s:e] for s, e in self.chunk_spans(text, chunk_size, overlap)]
             if not chunks:
                 raise ValidationError("Text could not be split into chunks.")
             return chunks
         except Exception as e:
             raise ExternalServiceError(f"Failed to chunk text: {str(e)}")
+
+    def chunk_stream(self, chunk_size: int = None, overlap: int = None) -> TextChunkStream:
+        """Incremental counterpart of `chunk_text` for page-by-page ingestion."""
+        return TextChunkStream(self._chunker(chunk_size, overlap))
+
+    @staticmethod
+    def _chunker(chunk_size: Optional[int], overlap: Optional[int]) -> TokenChunker:
+        return TokenChunker(
+            max_tokens=chunk_size or settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS if overlap is None else overlap,
+        )
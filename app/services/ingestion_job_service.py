@@ -0,0 +1,191 @@
+# app/services/ingestion_job_service.py
+import asyncio
+import logging
+import os
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ingestion_job import IngestionJob
+from app.repositories.embedding_repository import EmbeddingRepository
+from app.repositories.ingestion_job_repository import IngestionJobRepository
+from app.services.embedding_service import EmbeddingService
+from app.services.file_processing import FileProcessingService
+from app.services.ingestion_pipeline import IngestionPipeline, IngestionProgress
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class IngestionJobService:
+    """
+    Background ingestion queue for uploaded documents.
+
+    Uploads are spooled to local disk and recorded as `ingestion_jobs` rows,
+    then processed by a fixed number of worker tasks. Progress (pages,
+    chunks, vectors) is written back to the job row as batches land.
+
+    A worker claims a job atomically (queued -> running) and heartbeats it
+    while it runs. On startup, queued jobs and running jobs whose heartbeat
+    is older than INGEST_LEASE_SECONDS are picked up again.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        file_processing_service: FileProcessingService,
+        num_workers: Optional[int] = None,
+        spool_dir: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.file_processing_service = file_processing_service
+        self.num_workers = num_workers or settings.INGEST_WORKERS
+        self.spool_dir = spool_dir or settings.INGEST_SPOOL_DIR
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    # --- lifecycle ---
+
+    async def start(self):
+        if self._workers:
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        self._requeue_unfinished()
+        logger.info(f"Started {self.num_workers} ingestion workers")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _requeue_unfinished(self):
+        db = self.session_factory()
+        try:
+            repo = IngestionJobRepository(db)
+            # Running jobs are only taken over once their worker's lease lapsed;
+            # a live worker (in this or another process) keeps heartbeating.
+            expired = repo.requeue_expired(settings.INGEST_LEASE_SECONDS)
+            if expired:
+                logger.info(f"Re-queued {expired} ingestion jobs whose lease expired")
+            for job in repo.get_queued():
+                if job.spool_path and os.path.exists(job.spool_path):
+                    self._queue.put_nowait(job.id)
+                    logger.info(f"Re-queued ingestion job {job.id} ({job.filename})")
+                else:
+                    repo.update_job(job, status="failed", error="Upload was lost before ingestion finished")
+        finally:
+            db.close()
+
+    # --- public API ---
+
+    async def submit(self, user_id: str, filename: str, file_path: str, file_bytes: bytes) -> IngestionJob:
+        """Persist the upload and enqueue it; returns immediately with the queued job."""
+        if self._queue is None:
+            raise RuntimeError("IngestionJobService is not started")
+
+        db = self.session_factory()
+        try:
+            repo = IngestionJobRepository(db)
+            job = repo.create_job(user_id, filename, file_path, spool_path=None)
+            spool_path = os.path.join(self.spool_dir, f"{job.id}.pdf")
+            await asyncio.to_thread(self._write_spool, spool_path, file_bytes)
+            repo.update_job(job, spool_path=spool_path)
+            db.refresh(job)
+            db.expunge(job)
+        finally:
+            db.close()
+
+        await self._queue.put(job.id)
+        logger.info(f"Queued ingestion job {job.id} for '{filename}'")
+        return job
+
+    def get_job(self, job_id: str, user_id: str) -> Optional[IngestionJob]:
+        db = self.session_factory()
+        try:
+            job = IngestionJobRepository(db).get_for_user(job_id, user_id)
+            if job is not None:
+                db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    # --- worker ---
+
+    @staticmethod
+    def _write_spool(path: str, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @staticmethod
+    def _read_spool(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _build_pipeline(self, db: Session) -> IngestionPipeline:
+        return IngestionPipeline(
+            embedding_service=EmbeddingService(db),
+            embedding_repo=EmbeddingRepository(db),
+            file_processing_service=self.file_processing_service,
+        )
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception:
+                logger.exception(f"[worker {worker_id}] Unexpected error in ingestion job {job_id}")
+            finally:
+                self._queue.task_done()
+
+    async def _heartbeat(self, job_repo: IngestionJobRepository, job_id: str):
+        while True:
+            await asyncio.sleep(settings.INGEST_HEARTBEAT_SECONDS)
+            job_repo.heartbeat(job_id)
+
+    async def _process(self, job_id: str):
+        # Job status lives in its own session so progress commits never touch
+        # the pipeline's transaction, which only commits once at the end.
+        job_db = self.session_factory()
+        work_db = self.session_factory()
+        heartbeat: Optional[asyncio.Task] = None
+        try:
+            job_repo = IngestionJobRepository(job_db)
+            job = job_repo.claim(job_id)
+            if job is None:
+                return  # finished, missing, or claimed by another worker
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_repo, job_id))
+
+            def on_progress(progress: IngestionProgress):
+                job_repo.update_job(job, **progress.model_dump())
+
+            try:
+                file_bytes = await asyncio.to_thread(self._read_spool, job.spool_path)
+                file_entry, progress = await self._build_pipeline(work_db).run(
+                    user_id=job.user_id,
+                    filename=job.filename,
+                    file_path=job.file_path,
+                    file_bytes=file_bytes,
+                    on_progress=on_progress,
+                )
+                job_repo.update_job(job, status="completed", file_id=file_entry.id, **progress.model_dump())
+                logger.info(f"Ingestion job {job_id} completed")
+            except Exception as e:
+                job_repo.update_job(job, status="failed", error=str(e))
+                logger.error(f"Ingestion job {job_id} failed: {e}")
+
+            if job.spool_path and os.path.exists(job.spool_path):
+                os.remove(job.spool_path)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            work_db.close()
+            job_db.close()
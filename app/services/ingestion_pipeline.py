@@ -0,0 +1,219 @@
+# app/services/ingestion_pipeline.py
+import asyncio
+import logging
+from typing import Callable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.cache.semantic_cache import get_semantic_cache
+from app.core.config import settings
+from app.exceptions.base_exceptions import ValidationError
+from app.models.file import UploadedFile
+from app.repositories.embedding_repository import EmbeddingRepository
+from app.repositories.file_repository import FileRepository
+from app.repositories.mmap_vector_store import get_vector_store
+from app.services.embedding_service import EmbeddingService
+from app.services.file_processing import FileProcessingService
+from app.utils.content_hash import hash_bytes, hash_text
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+
+class IngestionProgress(BaseModel):
+    pages_done: int = 0
+    chunks_done: int = 0
+    vectors_done: int = 0
+    chunks_reused: int = 0
+    chunks_deleted: int = 0
+
+
+class IngestionPipeline:
+    """
+    Streaming document ingestion: page -> chunk -> embedding batch -> DB batch.
+
+    Each stage runs as its own task and hands work to the next through a
+    bounded asyncio.Queue, so PDF parsing (in the extraction process pool)
+    overlaps with network-bound embedding and only a few batches are ever
+    held in memory.
+    The file row and all of its vectors are committed in one transaction.
+
+    Re-uploads are incremental: a byte-identical file is a no-op, and for a
+    changed file with the same name only new chunks are embedded while
+    chunks that disappeared are deleted.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        embedding_repo: EmbeddingRepository,
+        file_processing_service: FileProcessingService,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.embedding_service = embedding_service
+        self.embedding_repo = embedding_repo
+        self.file_repo = FileRepository(embedding_repo.db)
+        self.file_processing_service = file_processing_service
+        # One pipeline batch keeps every concurrent embedding request busy
+        self.batch_size = batch_size or settings.EMBED_BATCH_SIZE * settings.EMBED_MAX_CONCURRENCY
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+
+    async def _produce_chunks(
+        self,
+        file_bytes: bytes,
+        known_hashes: Set[str],
+        seen_hashes: Set[str],
+        out: asyncio.Queue,
+        progress: IngestionProgress,
+    ):
+        chunker = self.file_processing_service.chunk_stream()
+        chunks_batch: List[str] = []
+        hashes_batch: List[str] = []
+
+        async def emit(chunks: List[str]):
+            nonlocal chunks_batch, hashes_batch
+            for chunk in chunks:
+                chunk_hash = hash_text(chunk)
+                if chunk_hash in seen_hashes:
+                    continue  # repeated within this document
+                seen_hashes.add(chunk_hash)
+                if chunk_hash in known_hashes:
+                    progress.chunks_reused += 1  # unchanged since the last upload
+                    continue
+
+                chunks_batch.append(chunk)
+                hashes_batch.append(chunk_hash)
+                if len(chunks_batch) >= self.batch_size:
+                    await out.put((chunks_batch, hashes_batch))
+                    chunks_batch, hashes_batch = [], []
+
+        # Pages are parsed in the extraction pool and arrive in page order
+        async for page_text in self.file_processing_service.aiter_pdf_pages(file_bytes):
+            progress.pages_done += 1
+            await emit(chunker.feed(page_text))
+        await emit(chunker.finish())
+
+        if chunks_batch:
+            await out.put((chunks_batch, hashes_batch))
+        await out.put(_DONE)
+
+    async def _embed_batches(self, inp: asyncio.Queue, out: asyncio.Queue, progress: IngestionProgress):
+        while (item := await inp.get()) is not _DONE:
+            chunks, hashes = item
+            vectors = await self.embedding_service.create_embeddings(chunks)
+            progress.chunks_done += len(chunks)
+            await out.put((chunks, hashes, vectors))
+        await out.put(_DONE)
+
+    async def _write_batches(
+        self,
+        file_id: int,
+        user_id: str,
+        inp: asyncio.Queue,
+        progress: IngestionProgress,
+        on_progress: Optional[Callable[[IngestionProgress], None]],
+    ):
+        while (item := await inp.get()) is not _DONE:
+            chunks, hashes, vectors = item
+            self.embedding_repo.bulk_insert_embeddings(
+                file_id, chunks, vectors, chunk_hashes=hashes, user_id=user_id
+            )
+            progress.vectors_done += len(vectors)
+            if on_progress:
+                on_progress(progress)
+
+    def _sync_vector_store(self, user_id: str, rebuild: bool):
+        """Mirror committed vectors into the local store; deletions need a rebuild."""
+        store = get_vector_store()
+        try:
+            store.sync_from(self.embedding_repo, user_id, rebuild=rebuild)
+        except Exception as e:
+            # Postgres has the data; drop the local copy so the next query rebuilds it
+            logger.error(f"Vector store sync failed for user {user_id}: {e}")
+            store.drop(user_id)
+
+    async def run(
+        self,
+        user_id: str,
+        filename: str,
+        file_path: str,
+        file_bytes: bytes,
+        on_progress: Optional[Callable[[IngestionProgress], None]] = None,
+    ) -> Tuple[UploadedFile, IngestionProgress]:
+        progress = IngestionProgress()
+        db = self.embedding_repo.db
+        content_hash = hash_bytes(file_bytes)
+
+        # Byte-identical upload: nothing to do
+        duplicate = self.file_repo.get_by_content_hash(db, user_id, content_hash)
+        if duplicate is not None:
+            logger.info(f"'{filename}' is identical to stored file {duplicate.id}; skipping ingestion")
+            return duplicate, progress
+
+        try:
+            file_entry = self.file_repo.get_by_filename(db, user_id, filename)
+            if file_entry is not None:
+                # Re-upload of an edited file: keep chunks whose hash is unchanged
+                known_hashes = self.embedding_repo.get_chunk_hashes(file_entry.id)
+                file_entry.file_path = file_path
+                file_entry.content_hash = content_hash
+                logger.info(f"Re-ingesting '{filename}' incrementally ({len(known_hashes)} stored chunks)")
+            else:
+                known_hashes = set()
+                file_entry = self.embedding_repo.create_file_entry(
+                    user_id, filename, file_path, content_hash=content_hash
+                )
+
+            seen_hashes: Set[str] = set()
+            chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            vector_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            tasks = [
+                asyncio.create_task(
+                    self._produce_chunks(file_bytes, known_hashes, seen_hashes, chunk_queue, progress)
+                ),
+                asyncio.create_task(self._embed_batches(chunk_queue, vector_queue, progress)),
+                asyncio.create_task(self._write_batches(file_entry.id, user_id, vector_queue, progress, on_progress)),
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except Exception:
+                # One stage failed: stop the others so nothing blocks on a full queue
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+            if not seen_hashes:
+                raise ValidationError("PDF contains no extractable text.")
+
+            # Chunks that no longer appear in the document (and legacy unhashed rows)
+            progress.chunks_deleted = self.embedding_repo.delete_stale_chunks(
+                file_entry.id, known_hashes - seen_hashes
+            )
+            # Routing vector for two-stage retrieval, over the final set of chunks
+            self.embedding_repo.refresh_file_summary(file_entry.id)
+
+            db.commit()
+            db.refresh(file_entry)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ingestion failed for {filename}: {e}")
+            raise
+
+        if settings.RETRIEVER_BACKEND == "mmap":
+            self._sync_vector_store(user_id, rebuild=progress.chunks_deleted > 0)
+
+        # The user's document set changed: cached answers may be stale
+        answer_cache = get_semantic_cache()
+        if answer_cache is not None:
+            answer_cache.invalidate_user(user_id)
+
+        logger.info(
+            f"Ingested '{filename}': {progress.pages_done} pages, "
+            f"{progress.chunks_done} chunks embedded, {progress.chunks_reused} reused, "
+            f"{progress.chunks_deleted} deleted, {progress.vectors_done} vectors"
+        )
+        return file_entry, progress
@@ -4,6 +4,9 @@ from typing import List, Optional
 from app.clients.base_client import LLMClient
 from app.clients.mistralai_client import MistralChatClient
 from app.clients.cohere_client import CohereClient
+from app.clients.llm_gateway import LLMGateway
+from app.core.config import settings
+from app.utils.context_packer import ContextPacker
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +14,8 @@ logger = logging.getLogger(__name__)
 class LangChainLLMService:
     """
     Unified LLM service with dependency-injected primary and fallback clients.
-    Default: Mistral (primary), Cohere (fallback).
+    Default: Mistral (primary), Cohere (fallback), routed through LLMGateway
+    (circuit breakers + hedging).
     """
 
     def __init__(
@@ -22,43 +26,34 @@ class LangChainLLMService:
         # Inject clients or use defaults
         self.primary_client = primary_client or MistralChatClient()
         self.fallback_client = fallback_client or CohereClient()
+        self.gateway = LLMGateway(
+            [("mistral", self.primary_client), ("cohere", self.fallback_client)],
+            cache_ttl=settings.LLM_CACHE_TTL_LESSON_SUMMARY,
+        )
+        self.packer = ContextPacker(doc_budget=settings.SUMMARY_INPUT_TOKENS)
 
-    async def summarize_lessons(self, lessons: List[str]) -> str:
+    async def summarize_lessons(self, lessons: List[str], bypass_cache: bool = False) -> str:
         """
-        Summarize a list of lessons using the primary client,
-        fallback to secondary on failure (e.g., rate limit).
-        Always returns a string.
+        Summarize a list of lessons using the primary client; the fallback
+        takes over when the primary fails, is circuit-broken or is too slow.
+        Identical lesson sets are answered from the LLM response cache unless
+        `bypass_cache` is set. Always returns a string.
         """
         if not lessons:
             return "No lessons provided to summarize."
 
+        # Keep the prompt inside the summary budget; later lessons are dropped first
+        packed, report = self.packer.pack_documents(lessons)
+        if report.docs_truncated or report.docs_dropped:
+            logger.info(f"[LangChainLLMService] Packed lessons: {report.model_dump()}")
+
         summary_prompt = (
             "Summarize the following lessons concisely and clearly:\n"
-            + "\n".join(lessons)
+            + "\n".join(packed)
         )
 
-        # --- Try primary client (Mistral) ---
-        try:
-            logger.info("[LangChainLLMService] Using primary client")
-            response = await self.primary_client.generate(prompt=summary_prompt)
-
-            # Normalize response into string
-            if isinstance(response, str):
-                return response
-            if hasattr(response, "answer"):
-                return str(response.answer)
-            if hasattr(response, "content"):
-                return str(response.content)
-            return str(response)
-
-        except Exception as e:
-            logger.warning(f"[LangChainLLMService] Primary client failed: {e}")
-
-        # --- Fallback to secondary client (Cohere) ---
         try:
-            logger.info("[LangChainLLMService] Falling back to secondary client")
-            result = await self.fallback_client.generate(prompt=summary_prompt)
-            return str(result)
+            return await self.gateway.generate(summary_prompt, bypass_cache=bypass_cache)
         except Exception as e:
             logger.error(f"[LangChainLLMService] Both clients failed: {e}")
             raise RuntimeError(f"LLM summarization failed: {e}")
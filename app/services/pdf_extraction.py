@@ -0,0 +1,130 @@
+# app/services/pdf_extraction.py
+import asyncio
+import concurrent.futures
+import contextlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import AsyncIterator, List, Optional
+
+import pdfplumber
+
+from app.core.config import settings
+from app.exceptions.base_exceptions import ExternalServiceError
+
+logger = logging.getLogger(__name__)
+
+
+# --- Worker functions (module level so they can be pickled) ---
+
+def _count_pages(source) -> int:
+    with pdfplumber.open(source) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_page_range(source, start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end) of the PDF at `source`."""
+    texts = []
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page.extract_text() or "")
+            page.flush_cache()
+    return texts
+
+
+class PdfExtractionEngine:
+    """
+    Extracts PDF text on a process pool, off the event loop.
+
+    Large documents are split into page ranges that run in parallel worker
+    processes; results are yielded strictly in page order. Small documents
+    are extracted in a single thread, where pool overhead would dominate.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        min_pages_for_pool: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task or settings.PDF_PAGES_PER_TASK
+        self.min_pages_for_pool = min_pages_for_pool or settings.PDF_POOL_MIN_PAGES
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app does not fork workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started PDF extraction pool with {self.max_workers} workers")
+        return self._executor
+
+    async def iter_page_batches(self, file_bytes: bytes) -> AsyncIterator[List[str]]:
+        """Yield lists of page texts, in page order."""
+        try:
+            num_pages = await asyncio.to_thread(_count_pages, BytesIO(file_bytes))
+        except Exception as e:
+            raise ExternalServiceError(f"Failed to extract text from PDF: {str(e)}")
+
+        if num_pages < self.min_pages_for_pool or self.max_workers <= 1:
+            for start in range(0, num_pages, self.pages_per_task):
+                end = min(start + self.pages_per_task, num_pages)
+                try:
+                    yield await asyncio.to_thread(_extract_page_range, BytesIO(file_bytes), start, end)
+                except Exception as e:
+                    raise ExternalServiceError(f"Failed to extract text from PDF: {str(e)}")
+            return
+
+        # Workers open the PDF from a temp file instead of each receiving a pickled copy
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        pending: deque = deque()  # concurrent futures, in page order
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(file_bytes)
+
+            ranges = deque(
+                (start, min(start + self.pages_per_task, num_pages))
+                for start in range(0, num_pages, self.pages_per_task)
+            )
+            # Keep a bounded window of ranges in flight so memory stays flat
+            window = self.max_workers * 2
+            while ranges or pending:
+                while ranges and len(pending) < window:
+                    start, end = ranges.popleft()
+                    pending.append(self.executor.submit(_extract_page_range, path, start, end))
+                try:
+                    # Stays in `pending` while awaited so cleanup can see it
+                    batch = await asyncio.wrap_future(pending[0])
+                except Exception as e:
+                    raise ExternalServiceError(f"Failed to extract text from PDF: {str(e)}")
+                pending.popleft()
+                yield batch
+        finally:
+            # Ranges already running in a worker cannot be cancelled; wait for
+            # them so the file is no longer open when it is removed
+            running = [future for future in pending if not future.cancel()]
+            try:
+                if running:
+                    await asyncio.to_thread(concurrent.futures.wait, running)
+            finally:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+
+    async def extract_pages(self, file_bytes: bytes) -> List[str]:
+        pages: List[str] = []
+        async for batch in self.iter_page_batches(file_bytes):
+            pages.extend(batch)
+        return pages
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
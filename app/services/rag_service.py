@@ -1,13 +1,20 @@
 # app/services/rag_service.py
 import logging
 import numpy as np
+from typing import AsyncIterator, List
 from sqlalchemy.orm import Session
 from app.services.embedding_service import EmbeddingService
-from app.repositories.embedding_repository import EmbeddingRepository
+from app.repositories.embedding_repository import EmbeddingRepository, RetrievedChunk
 from app.repositories.file_repository import FileRepository
 from app.repositories.chat_history_repository import ChatHistoryRepository
 from app.exceptions.base_exceptions import ExternalServiceError
 from app.clients.mistralai_client import MistralChatClient
+from app.cache.semantic_cache import fingerprint_chunks, get_semantic_cache, is_follow_up
+from app.core.config import settings
+from app.repositories.mmap_vector_store import MmapVectorStore, get_vector_store
+from app.utils.rank_fusion import reciprocal_rank_fusion
+from app.utils.mmr import maximal_marginal_relevance
+from app.utils.context_packer import ContextPacker
 
 logger = logging.getLogger("RAGService")
 logger.setLevel(logging.INFO)
@@ -21,18 +28,302 @@ class SQLAlchemyRetriever:
         self.embedding_service = embedding_service
         self.top_k = top_k
 
-    async def get_relevant_documents(self, query: str):
+    async def get_relevant_chunks(
+        self,
+        query: str,
+        query_vector=None,
+        user_id: str = None,
+        top_k: int = None,
+        with_vectors: bool = False,
+    ) -> List[RetrievedChunk]:
+        """
+        Top-k chunk records for `query`, limited to `user_id`'s documents when given.
+        Pass `query_vector` to reuse an existing embedding, `top_k` to override the
+        default, `with_vectors` when a later stage needs each chunk's embedding.
+        """
         logger.info("Retrieving documents for query: %s", query)
-        query_vector = np.array(await self.embedding_service.embed_query(query), dtype=np.float32)
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_query(query)
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+
+        try:
+            return self.embedding_repo.get_top_k_similar(
+                query_vector, top_k or self.top_k, user_id=user_id, with_vectors=with_vectors
+            )
+        except Exception as e:
+            logger.exception("Failed to fetch relevant documents")
+            raise ExternalServiceError(f"DB retrieval error: {e}")
+
+    async def get_relevant_documents(self, query: str, user_id: str = None):
+        results = await self.get_relevant_chunks(query, user_id=user_id)
+        return [c.content for c in results]
+
+
+class FileRoutedRetriever(SQLAlchemyRetriever):
+    """
+    Two-stage pgvector retrieval: rank the user's files by their summary
+    vector, then search chunks only inside the closest `top_files` files.
+    Users with few files (or queries without a user) get a flat search, and
+    so does a query whose routed files hold fewer than top_k matching chunks.
+    """
+
+    def __init__(
+        self,
+        embedding_repo: EmbeddingRepository,
+        embedding_service: EmbeddingService,
+        top_k: int = 5,
+        top_files: int = 5,
+    ):
+        super().__init__(embedding_repo, embedding_service, top_k)
+        self.top_files = top_files
+
+    async def get_relevant_chunks(
+        self,
+        query: str,
+        query_vector=None,
+        user_id: str = None,
+        top_k: int = None,
+        with_vectors: bool = False,
+    ) -> List[RetrievedChunk]:
+        if user_id is None:
+            return await super().get_relevant_chunks(query, query_vector, user_id, top_k, with_vectors)
+
+        logger.info("Retrieving documents (file-routed) for query: %s", query)
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_query(query)
+        query_vector = np.asarray(query_vector, dtype=np.float32)
 
+        top_k = top_k or self.top_k
         try:
-            results = self.embedding_repo.get_top_k_similar(query_vector, self.top_k)
-            return [e.content_chunk for e in results]
+            file_ids = self.embedding_repo.get_top_k_files(query_vector, self.top_files, user_id)
+            chunks = self.embedding_repo.get_top_k_similar(
+                query_vector, top_k, user_id=user_id, with_vectors=with_vectors, file_ids=file_ids
+            )
+            if file_ids is not None and len(chunks) < top_k:
+                # Routing missed (e.g. files without a summary vector yet): search everything
+                logger.info("File-routed search returned %d of %d chunks; using a flat search", len(chunks), top_k)
+                chunks = self.embedding_repo.get_top_k_similar(
+                    query_vector, top_k, user_id=user_id, with_vectors=with_vectors
+                )
+            return chunks
         except Exception as e:
             logger.exception("Failed to fetch relevant documents")
             raise ExternalServiceError(f"DB retrieval error: {e}")
 
 
+def rescore_full_precision(query_vector, chunks: List[RetrievedChunk], top_k: int) -> List[RetrievedChunk]:
+    """Order chunks (loaded with vectors) by exact cosine similarity; keep top_k."""
+    if not chunks:
+        return []
+    matrix = np.stack([np.asarray(c.embedding, dtype=np.float32) for c in chunks])
+    query = np.asarray(query_vector, dtype=np.float32)
+    scores = (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+    order = np.argsort(-scores)[:top_k]
+    for i in order:
+        chunks[i].distance = float(1.0 - scores[i])
+    return [chunks[i] for i in order]
+
+
+def attach_vectors(embedding_repo: EmbeddingRepository, chunks: List[RetrievedChunk]) -> List[RetrievedChunk]:
+    """
+    Load embeddings for the chunks that lack them in one round trip, keeping
+    order and distances. Chunks deleted in the meantime are dropped.
+    """
+    missing = [c.id for c in chunks if c.embedding is None]
+    if missing:
+        vectors = {c.id: c.embedding for c in embedding_repo.get_by_ids(missing, with_vectors=True)}
+        for chunk in chunks:
+            if chunk.embedding is None:
+                chunk.embedding = vectors.get(chunk.id)
+    return [c for c in chunks if c.embedding is not None]
+
+
+class MmapRetriever(SQLAlchemyRetriever):
+    """
+    Retriever that answers top-k from the local memory-mapped per-user store
+    (exact NumPy scan), then loads the winning chunks by primary key.
+    A user's store is built from Postgres on first use; unscoped queries
+    fall back to pgvector.
+    """
+
+    def __init__(
+        self,
+        embedding_repo: EmbeddingRepository,
+        embedding_service: EmbeddingService,
+        top_k: int = 5,
+        store: MmapVectorStore = None,
+    ):
+        super().__init__(embedding_repo, embedding_service, top_k)
+        self.store = store or get_vector_store()
+
+    async def get_relevant_chunks(
+        self,
+        query: str,
+        query_vector=None,
+        user_id: str = None,
+        top_k: int = None,
+        with_vectors: bool = False,
+    ) -> List[RetrievedChunk]:
+        if user_id is None:
+            return await super().get_relevant_chunks(query, query_vector, top_k=top_k, with_vectors=with_vectors)
+
+        logger.info("Retrieving documents from local vector store for query: %s", query)
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_query(query)
+
+        try:
+            if not self.store.exists(user_id):
+                self.store.sync_from(self.embedding_repo, user_id)
+            top_k = top_k or self.top_k
+            if not self.store.compact:
+                hits = self.store.search(user_id, query_vector, top_k)
+                chunks = self.embedding_repo.get_by_ids([row_id for row_id, _ in hits], with_vectors=with_vectors)
+                distances = {row_id: 1.0 - score for row_id, score in hits}
+                for chunk in chunks:
+                    chunk.distance = distances[chunk.id]
+                return chunks
+
+            # Lossy float16/int8 scores pick candidates; full-precision vectors decide the order
+            hits = self.store.search(user_id, query_vector, max(settings.VECTOR_RESCORE_CANDIDATES, top_k))
+            chunks = self.embedding_repo.get_by_ids([row_id for row_id, _ in hits], with_vectors=True)
+            return rescore_full_precision(query_vector, chunks, top_k)
+        except Exception as e:
+            logger.exception("Failed to fetch relevant documents")
+            raise ExternalServiceError(f"Vector store retrieval error: {e}")
+
+
+class HybridRetriever:
+    """
+    Fuses a dense (vector) retriever with Postgres full-text search by
+    reciprocal rank fusion, so exact terms, formula names and course codes
+    rank well without raising top_k. Both candidate lists are fetched without
+    vectors; `with_vectors` loads them for the fused top_k only.
+    """
+
+    def __init__(
+        self,
+        dense: SQLAlchemyRetriever,
+        top_k: int = 5,
+        candidates: int = 20,
+        rrf_k: int = 60,
+    ):
+        self.dense = dense
+        self.embedding_repo = dense.embedding_repo
+        self.embedding_service = dense.embedding_service
+        self.top_k = top_k
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    async def get_relevant_chunks(
+        self,
+        query: str,
+        query_vector=None,
+        user_id: str = None,
+        top_k: int = None,
+        with_vectors: bool = False,
+    ) -> List[RetrievedChunk]:
+        top_k = top_k or self.top_k
+        pool = max(self.candidates, top_k)
+        dense_hits = await self.dense.get_relevant_chunks(query, query_vector, user_id=user_id, top_k=pool)
+
+        try:
+            lexical_hits = self.embedding_repo.get_top_k_lexical(query, pool, user_id=user_id)
+        except Exception as e:
+            # Keyword search is a precision boost; vector results alone are still valid
+            logger.warning(f"Full-text search failed, using vector results only: {e}")
+            self.embedding_repo.db.rollback()
+            lexical_hits = []
+
+        fused = reciprocal_rank_fusion([dense_hits, lexical_hits], k=self.rrf_k, key=lambda c: c.id)
+        chunks = [chunk for chunk, _ in fused[:top_k]]
+        return attach_vectors(self.embedding_repo, chunks) if with_vectors else chunks
+
+    async def get_relevant_documents(self, query: str, user_id: str = None):
+        results = await self.get_relevant_chunks(query, user_id=user_id)
+        return [c.content for c in results]
+
+
+class MMRRetriever:
+    """
+    Re-ranking stage over any retriever: over-fetches `fetch_k` candidates and
+    keeps `top_k` by maximal marginal relevance, dropping the near-duplicates
+    that overlapping chunks produce. Every knob can be overridden per call.
+    """
+
+    def __init__(self, base, top_k: int = 5, fetch_k: int = 20, lambda_mult: float = 0.5):
+        self.base = base
+        self.embedding_repo = base.embedding_repo
+        self.embedding_service = base.embedding_service
+        self.top_k = top_k
+        self.fetch_k = fetch_k
+        self.lambda_mult = lambda_mult
+
+    async def get_relevant_chunks(
+        self,
+        query: str,
+        query_vector=None,
+        user_id: str = None,
+        top_k: int = None,
+        with_vectors: bool = False,
+        mmr: bool = True,
+        fetch_k: int = None,
+        lambda_mult: float = None,
+    ) -> List[RetrievedChunk]:
+        top_k = top_k or self.top_k
+        if not mmr:
+            return await self.base.get_relevant_chunks(
+                query, query_vector, user_id=user_id, top_k=top_k, with_vectors=with_vectors
+            )
+
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_query(query)
+        candidates = await self.base.get_relevant_chunks(
+            query, query_vector, user_id=user_id, top_k=max(fetch_k or self.fetch_k, top_k)
+        )
+        if len(candidates) <= top_k:
+            return attach_vectors(self.embedding_repo, candidates) if with_vectors else candidates
+
+        # MMR compares candidates with each other: load vectors for the final
+        # candidate set only, not for every list the base stage fused
+        candidates = attach_vectors(self.embedding_repo, candidates)
+        picked = maximal_marginal_relevance(
+            query_vector,
+            np.stack([np.asarray(c.embedding, dtype=np.float32) for c in candidates]),
+            k=top_k,
+            lambda_mult=self.lambda_mult if lambda_mult is None else lambda_mult,
+        )
+        return [candidates[i] for i in picked]
+
+    async def get_relevant_documents(self, query: str, user_id: str = None, **kwargs):
+        results = await self.get_relevant_chunks(query, user_id=user_id, **kwargs)
+        return [c.content for c in results]
+
+
+def build_retriever(embedding_repo: EmbeddingRepository, embedding_service: EmbeddingService, top_k: int = 5):
+    """
+    Retriever for the configured RETRIEVER_BACKEND (pgvector searches are
+    routed through per-file summary vectors when enabled), optionally fused
+    with keyword search and re-ranked by MMR.
+    """
+    if settings.RETRIEVER_BACKEND == "mmap":
+        retriever = MmapRetriever(embedding_repo, embedding_service, top_k)
+    elif settings.FILE_ROUTING_ENABLED:
+        retriever = FileRoutedRetriever(
+            embedding_repo, embedding_service, top_k, top_files=settings.FILE_ROUTING_TOP_FILES
+        )
+    else:
+        retriever = SQLAlchemyRetriever(embedding_repo, embedding_service, top_k)
+    if settings.HYBRID_SEARCH_ENABLED:
+        retriever = HybridRetriever(
+            retriever, top_k, candidates=settings.HYBRID_CANDIDATES, rrf_k=settings.RRF_K
+        )
+    if settings.MMR_ENABLED:
+        retriever = MMRRetriever(
+            retriever, top_k, fetch_k=settings.MMR_FETCH_K, lambda_mult=settings.MMR_LAMBDA
+        )
+    return retriever
+
+
 class RAGService:
     """Retrieval-Augmented Generation (RAG) service with memory and context."""
 
@@ -47,9 +338,12 @@ class RAGService:
         self.embedding_repo = EmbeddingRepository(db)
         self.file_repo = FileRepository(db)
         self.chat_repo = ChatHistoryRepository(db)
-        self.retriever = SQLAlchemyRetriever(self.embedding_repo, self.embedding_service, top_k)
+        self.retriever = build_retriever(self.embedding_repo, self.embedding_service, top_k)
         self.memory_size = memory_size  # last N messages
         self.llm_client = MistralChatClient()
+        # Semantic answer cache shared across requests; None when disabled
+        self.answer_cache = get_semantic_cache()
+        self.packer = ContextPacker(settings.CONTEXT_DOC_TOKENS, settings.CONTEXT_HISTORY_TOKENS)
 
     async def _call_llm(self, prompt: str):
         """Call Mistral LLM with prompt and return plain text answer."""
@@ -66,20 +360,41 @@ class RAGService:
             logger.error(f"Mistral client request failed: {e}")
             raise ExternalServiceError(f"Mistral client request failed: {e}")
 
-    async def chat(self, user_input: str, user_id: str):
-        """Main method to handle chat with memory and retrieval."""
+    async def _prepare(self, user_input: str, user_id: str):
+        """
+        Retrieve context and build the prompt for `user_input`.
+        Returns (query_vector, context fingerprint, cached answer, prompt); the
+        prompt is None when the semantic cache already has an answer.
+        """
         if not user_input.strip():
             raise ValueError("Input cannot be empty")
 
         # 1. Fetch last N chat messages for user
         past_messages = self.chat_repo.get_last_n_messages(user_id, self.memory_size)
 
-        # 2. Build chat memory
-        chat_context = "\n".join([f"{msg.role}: {msg.message}" for msg in past_messages])
+        # 2. Build chat memory (repository returns newest first)
+        history = [f"{msg.role}: {msg.message}" for msg in reversed(past_messages)]
+
+        # 3. Retrieve relevant documents (query embedding is memoized)
+        query_vector = await self.embedding_service.embed_query(user_input)
+        chunks = await self.retriever.get_relevant_chunks(user_input, query_vector, user_id=user_id)
+        # Tag each chunk with its file so the model can cite sources
+        docs = [f"[{c.filename}] {c.content}" if c.filename else c.content for c in chunks]
 
-        # 3. Retrieve relevant documents
-        docs = await self.retriever.get_relevant_documents(user_input)
-        doc_context = "\n\n".join(docs) if docs else "No context found."
+        # 3b. Near-identical question over the same chunks: reuse the stored answer.
+        # History changes with every exchange, so it only keys follow-up questions.
+        fingerprint = fingerprint_chunks((c.id for c in chunks), history if is_follow_up(user_input) else ())
+        if self.answer_cache is not None:
+            cached = self.answer_cache.lookup(user_id, query_vector, fingerprint)
+            if cached is not None:
+                logger.info("Semantic cache hit for user %s", user_id)
+                return query_vector, fingerprint, cached, None
+
+        # Fit documents and history into their token budgets, best chunks / newest turns first
+        packed = self.packer.pack(docs, history)
+        logger.info("Packed prompt context: %s", packed.report.model_dump())
+        doc_context = "\n\n".join(packed.documents) if packed.documents else "No context found."
+        chat_context = "\n".join(packed.history)
 
         # 4. Construct the prompt in best-practice style
         prompt = (
@@ -89,12 +404,52 @@ class RAGService:
             f"user: {user_input}\n\n"
             "Provide a clear, concise answer. Include sources if possible.\nAnswer:"
         )
+        return query_vector, fingerprint, None, prompt
+
+    async def chat(self, user_input: str, user_id: str):
+        """Main method to handle chat with memory and retrieval."""
+        query_vector, fingerprint, cached, prompt = await self._prepare(user_input, user_id)
+        if cached is not None:
+            self._save_exchange(user_id, user_input, cached)
+            return cached
 
         # 5. Call LLM
         response_text = await self._call_llm(prompt)
 
+        if self.answer_cache is not None:
+            self.answer_cache.store(user_id, query_vector, fingerprint, response_text)
+
         # 6. Save chat history
-        self.chat_repo.save_message(user_id=user_id, role="user", message=user_input)
-        self.chat_repo.save_message(user_id=user_id, role="assistant", message=response_text)
+        self._save_exchange(user_id, user_input, response_text)
 
         return response_text
+
+    async def chat_stream(self, user_input: str, user_id: str) -> AsyncIterator[str]:
+        """
+        Same as `chat`, but yields the answer as text deltas while the LLM
+        generates it. History and the answer cache are written once the stream
+        has finished; an interrupted stream stores nothing.
+        """
+        query_vector, fingerprint, cached, prompt = await self._prepare(user_input, user_id)
+        if cached is not None:
+            self._save_exchange(user_id, user_input, cached)
+            yield cached
+            return
+
+        parts = []
+        try:
+            async for delta in self.llm_client.stream(prompt):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Mistral streaming request failed: {e}")
+            raise ExternalServiceError(f"Mistral streaming request failed: {e}")
+
+        response_text = "".join(parts).strip()
+        if self.answer_cache is not None:
+            self.answer_cache.store(user_id, query_vector, fingerprint, response_text)
+        self._save_exchange(user_id, user_input, response_text)
+
+    def _save_exchange(self, user_id: str, user_input: str, response_text: str):
+        self.chat_repo.save_message(user_id=user_id, role="user", message=user_input)
+        self.chat_repo.save_message(user_id=user_id, role="assistant", message=response_text)
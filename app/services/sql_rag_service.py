@@ -1,6 +1,5 @@
 # app/services/sql_rag_service.py
-import numpy as np
-from app.repositories.embedding_repository import EmbeddingRepository
+from app.repositories.embedding_repository import EmbeddingRepository, RetrievedChunk
 from app.repositories.file_repository import FileRepository
 
 
@@ -13,9 +12,21 @@ class SQLRAGService:
         self.embedding_repo = embedding_repo
         self.file_repo = file_repo
 
-    def get_similar_documents(self, query_embedding: list[float], k: int = 5):
+    def get_similar_documents(
+        self, query_embedding: list[float], k: int = 5, user_id: str = None
+    ) -> list[RetrievedChunk]:
         """
         Retrieve top-k similar documents using pgvector cosine similarity.
         """
-        query_embedding_np = np.array(query_embedding)
-        return self.embedding_repo.find_similar(query_embedding_np, k)
+        return self.embedding_repo.get_top_k_similar(query_embedding, top_k=k, user_id=user_id)
+
+    def get_similar_documents_batch(
+        self, query_embeddings: list[list[float]], k: int = 5, user_id: str = None
+    ) -> list[list[RetrievedChunk]]:
+        """
+        Top-k similar documents for each query embedding, fetched in a single
+        database round trip. Use this for multi-question flows (several lesson
+        subtopics, expanded queries) instead of calling
+        `get_similar_documents` in a loop.
+        """
+        return self.embedding_repo.get_top_k_similar_batch(query_embeddings, top_k=k, user_id=user_id)
@@ -4,6 +4,8 @@ from fastapi import HTTPException
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
 from app.core.config import settings
 from app.clients.gemini_client import GeminiClient
+from app.clients.llm_gateway import LLMGateway
+from app.utils.context_packer import ContextPacker
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,6 +13,9 @@ logger.setLevel(logging.INFO)
 
 # Instantiate Gemini client
 gemini_client = GeminiClient(model_name="gemini-1.5-flash")
+# Same transcript, same prompt: summaries are served from the LLM response cache
+summary_llm = LLMGateway([("gemini", gemini_client)], cache_ttl=settings.LLM_CACHE_TTL_VIDEO_SUMMARY)
+transcript_packer = ContextPacker(doc_budget=settings.SUMMARY_INPUT_TOKENS)
 
 
 def extract_video_id(url: str) -> str:
@@ -51,9 +56,12 @@ def get_transcript(video_url: str) -> str:
 async def summarize_text(text: str) -> str:
     """Summarize transcript using GeminiClient."""
     try:
-        prompt = f"Summarize the following YouTube video transcript:\n\n{text}"
-        response = await gemini_client.generate(prompt)
-        return response.text
+        # Long transcripts are cut to the summary budget instead of overflowing the context
+        packed, report = transcript_packer.pack_documents([text])
+        if report.docs_truncated:
+            logger.info(f"Transcript truncated for summarization: {report.model_dump()}")
+        prompt = f"Summarize the following YouTube video transcript:\n\n{packed[0] if packed else ''}"
+        return await summary_llm.generate(prompt)
     except Exception as e:
         logger.error(f"Summarization failed: {e}")
         raise HTTPException(status_code=500, detail=f"Summarization failed: {e}")
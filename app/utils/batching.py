@@ -0,0 +1,42 @@
+# app/utils/batching.py
+import asyncio
+from typing import Awaitable, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(items: Sequence[T], size: int) -> List[Sequence[T]]:
+    """Split `items` into consecutive slices of at most `size` elements."""
+    if size <= 0:
+        raise ValueError("Batch size must be a positive integer")
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def map_batches(
+    func: Callable[[Sequence[T]], Awaitable[List[R]]],
+    items: Sequence[T],
+    batch_size: int,
+    max_concurrency: int = 1,
+) -> List[R]:
+    """
+    Run `func` over `items` in batches of `batch_size`, with at most
+    `max_concurrency` batches in flight at once.
+    Results are flattened in the same order as the input items.
+    """
+    if not items:
+        return []
+
+    batches = chunked(items, batch_size)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(batch: Sequence[T]) -> List[R]:
+        async with semaphore:
+            results = await func(batch)
+        if len(results) != len(batch):
+            raise ValueError(f"Batch returned {len(results)} results for {len(batch)} inputs")
+        return results
+
+    # gather() preserves argument order, so the output lines up with `items`
+    batch_results = await asyncio.gather(*(_run(batch) for batch in batches))
+    return [result for batch in batch_results for result in batch]
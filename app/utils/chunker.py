@@ -0,0 +1,142 @@
+# app/utils/chunker.py
+"""
+Token-aware, sentence-preserving text chunker.
+
+Chunks are returned as (start, end) offsets into the source string, so no
+substrings are copied until a caller actually needs the text.
+
+Token counts are an approximation of subword tokenizers (Cohere / Mistral):
+one token per word or punctuation mark, plus one per 8 characters by which
+words run longer than usual. That tracks provider limits far better than
+character counts while staying a pure regex / str.split pass.
+"""
+import re
+from typing import Callable, List, Optional, Tuple
+
+Span = Tuple[int, int]
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+# Sentence boundary: terminal punctuation followed by whitespace, or a blank line
+_SENTENCE_BREAK_RE = re.compile(r"([.!?])\s+|\n\s*\n")
+
+_CHARS_PER_WORD = 7  # typical word + separator; longer words cost extra tokens
+_CHARS_PER_EXTRA_TOKEN = 8
+
+
+def _count_range(text: str, start: int, end: int) -> int:
+    # str.split and a bounded regex scan keep this in C for large inputs
+    words = len(text[start:end].split())
+    extra = max(0, (end - start) - _CHARS_PER_WORD * words) // _CHARS_PER_EXTRA_TOKEN
+    return words + len(_PUNCT_RE.findall(text, start, end)) + extra
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of model tokens in `text`."""
+    return _count_range(text, 0, len(text))
+
+
+def _token_weight(token: str) -> int:
+    """Approximate token count of a single `_TOKEN_RE` match."""
+    return 1 + max(0, len(token) - _CHARS_PER_WORD) // _CHARS_PER_EXTRA_TOKEN
+
+
+def _sentence_spans(text: str) -> List[Span]:
+    spans = []
+    start = 0
+    for match in _SENTENCE_BREAK_RE.finditer(text):
+        # Keep the punctuation mark, drop the whitespace after it
+        end = match.start() + 1 if match.group(1) else match.start()
+        if end > start:
+            spans.append((start, end))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+
+    # Strip outer whitespace (start of text, spaces before a blank line, ...)
+    trimmed = []
+    for s, e in spans:
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            trimmed.append((s, e))
+    return trimmed
+
+
+class TokenChunker:
+    """
+    Pack whole sentences into chunks of at most `max_tokens`, carrying up to
+    `overlap_tokens` worth of trailing sentences into the next chunk.
+    Sentences longer than `max_tokens` are split at token boundaries.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap_tokens: int = 32,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be in [0, max_tokens)")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        if token_counter is None:
+            self._count = _count_range
+            self._token_weight = _token_weight
+        else:
+            self._count = lambda text, s, e: token_counter(text[s:e])
+            self._token_weight = token_counter
+
+    def _units(self, text: str) -> List[Tuple[int, int, int]]:
+        """Sentence-sized (start, end, tokens) units, none above max_tokens."""
+        units = []
+        for s, e in _sentence_spans(text):
+            n = self._count(text, s, e)
+            if n <= self.max_tokens:
+                units.append((s, e, n))
+                continue
+            # Oversized sentence: cut at token boundaries
+            piece_start, piece_tokens, last_end = s, 0, s
+            for match in _TOKEN_RE.finditer(text, s, e):
+                t = self._token_weight(match.group())
+                if piece_tokens + t > self.max_tokens and piece_tokens:
+                    units.append((piece_start, last_end, piece_tokens))
+                    piece_start, piece_tokens = match.start(), 0
+                piece_tokens += t
+                last_end = match.end()
+            if piece_tokens:
+                units.append((piece_start, last_end, piece_tokens))
+        return units
+
+    def split_spans(self, text: str) -> List[Span]:
+        units = self._units(text)
+        spans: List[Span] = []
+        current: List[Tuple[int, int, int]] = []
+        current_tokens = 0
+
+        for unit in units:
+            if current and current_tokens + unit[2] > self.max_tokens:
+                spans.append((current[0][0], current[-1][1]))
+                # Seed the next chunk with trailing sentences for overlap
+                overlap, overlap_tokens = [], 0
+                for prev in reversed(current):
+                    if overlap_tokens + prev[2] > self.overlap_tokens:
+                        break
+                    overlap.insert(0, prev)
+                    overlap_tokens += prev[2]
+                while overlap and overlap_tokens + unit[2] > self.max_tokens:
+                    overlap_tokens -= overlap.pop(0)[2]
+                current, current_tokens = overlap, overlap_tokens
+            current.append(unit)
+            current_tokens += unit[2]
+
+        if current:
+            spans.append((current[0][0], current[-1][1]))
+        return spans
+
+    def split(self, text: str) -> List[str]:
+        return [text[s:e] for s, e in self.split_spans(text)]
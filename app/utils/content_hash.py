@@ -0,0 +1,18 @@
+# app/utils/content_hash.py
+import hashlib
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC unicode, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hex sha256 of raw file content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Hex sha256 of normalized text, so whitespace-only edits hash the same."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
@@ -0,0 +1,124 @@
+# app/utils/context_packer.py
+"""
+Token-budgeted prompt packing.
+
+Documents and conversation history get separate budgets:
+- documents arrive best-first; they are added whole while they fit, the first
+  one that does not fit is truncated (if enough budget is left to be useful)
+  and every lower-ranked document is dropped;
+- history arrives oldest-first; the newest messages are kept and older ones
+  are dropped, so the conversation stays contiguous.
+
+Token counts come from `token_counter`, by default the approximation in
+app.utils.chunker that is also used for chunk sizing.
+"""
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.utils.chunker import count_tokens
+
+TRUNCATION_MARKER = " …"
+
+
+class PackReport(BaseModel):
+    doc_budget: int
+    history_budget: int
+    doc_tokens: int = 0
+    history_tokens: int = 0
+    docs_in: int = 0
+    docs_packed: int = 0
+    docs_truncated: int = 0
+    docs_dropped: int = 0
+    history_in: int = 0
+    history_packed: int = 0
+    history_dropped: int = 0
+
+
+class PackedContext(BaseModel):
+    documents: List[str]
+    history: List[str]
+    report: PackReport
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, token_counter: Callable[[str], int] = count_tokens
+) -> str:
+    """Longest whitespace-bounded prefix of `text` within `max_tokens` (binary search on length)."""
+    if max_tokens <= 0:
+        return ""
+    if token_counter(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if token_counter(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text.rfind(" ", 0, lo + 1)
+    return text[: cut if cut > 0 else lo].rstrip()
+
+
+class ContextPacker:
+    def __init__(
+        self,
+        doc_budget: int,
+        history_budget: int = 0,
+        token_counter: Optional[Callable[[str], int]] = None,
+        min_truncated_tokens: int = 48,
+    ):
+        self.doc_budget = doc_budget
+        self.history_budget = history_budget
+        self.count = token_counter or count_tokens
+        # A truncated document shorter than this is noise; drop it instead
+        self.min_truncated_tokens = min_truncated_tokens
+
+    def pack_documents(self, documents: List[str], budget: Optional[int] = None) -> Tuple[List[str], PackReport]:
+        budget = self.doc_budget if budget is None else budget
+        report = PackReport(doc_budget=budget, history_budget=self.history_budget, docs_in=len(documents))
+        packed: List[str] = []
+        used = 0
+        for doc in documents:
+            tokens = self.count(doc)
+            if used + tokens <= budget:
+                packed.append(doc)
+                used += tokens
+                continue
+            remaining = budget - used
+            if remaining >= self.min_truncated_tokens:
+                cut = truncate_to_tokens(doc, remaining - self.count(TRUNCATION_MARKER), self.count)
+                if cut:
+                    packed.append(cut + TRUNCATION_MARKER)
+                    used += self.count(packed[-1])
+                    report.docs_truncated = 1
+            break
+
+        report.docs_packed = len(packed)
+        report.docs_dropped = len(documents) - len(packed)
+        report.doc_tokens = used
+        return packed, report
+
+    def pack_history(self, messages: List[str], budget: Optional[int] = None) -> Tuple[List[str], int]:
+        """Newest messages that fit in `budget`, returned oldest-first, plus their token count."""
+        budget = self.history_budget if budget is None else budget
+        kept: List[str] = []
+        used = 0
+        for message in reversed(messages):
+            tokens = self.count(message)
+            if used + tokens > budget:
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+        return kept, used
+
+    def pack(self, documents: List[str], history: Optional[List[str]] = None) -> PackedContext:
+        docs, report = self.pack_documents(documents)
+        history = history or []
+        kept, history_tokens = self.pack_history(history)
+        report.history_in = len(history)
+        report.history_packed = len(kept)
+        report.history_dropped = len(history) - len(kept)
+        report.history_tokens = history_tokens
+        return PackedContext(documents=docs, history=kept, report=report)
@@ -0,0 +1,53 @@
+# app/utils/mmr.py
+from typing import List
+
+import numpy as np
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def maximal_marginal_relevance(
+    query_vector,
+    candidate_vectors,
+    k: int = 5,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """
+    Pick `k` candidate indices by maximal marginal relevance:
+
+        argmax_i  lambda * sim(q, d_i) - (1 - lambda) * max_{j in selected} sim(d_i, d_j)
+
+    `lambda_mult=1` is plain similarity ranking, lower values favour diversity.
+    All similarities are cosine and computed up front in two matrix products;
+    each greedy step then only updates a running max, so the loop is O(n) per pick.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return []
+
+    candidates = _unit_rows(candidates.reshape(n, -1))
+    query = _unit_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of every candidate to anything already selected
+    redundancy = pairwise[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, pairwise[best], out=redundancy)
+
+    return selected
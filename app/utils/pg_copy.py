@@ -0,0 +1,60 @@
+# app/utils/pg_copy.py
+"""
+Encoders for PostgreSQL's binary COPY format.
+
+Only the column types the ingestion path writes are supported. Each encoder
+turns a Python value into the type's binary wire representation.
+"""
+import struct
+from io import BytesIO
+from typing import Any, Callable, Iterable, List, Sequence
+
+import numpy as np
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+Encoder = Callable[[Any], bytes]
+
+
+def encode_int4(value: int) -> bytes:
+    return struct.pack(">i", value)
+
+
+def encode_int8(value: int) -> bytes:
+    return struct.pack(">q", value)
+
+
+def encode_text(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+def encode_vector(value: Sequence[float]) -> bytes:
+    """pgvector `vector` binary form: int16 dim, int16 unused, float4[dim] big-endian."""
+    arr = np.asarray(value, dtype=">f4")
+    return struct.pack(">HH", arr.shape[0], 0) + arr.tobytes()
+
+
+def build_copy_payload(rows: Iterable[Sequence[Any]], encoders: List[Encoder]) -> BytesIO:
+    """
+    Serialize `rows` into a binary COPY stream.
+    `encoders` gives one encoder per column; None values are written as NULL.
+    """
+    buf = BytesIO()
+    buf.write(COPY_SIGNATURE)
+    buf.write(struct.pack(">ii", 0, 0))  # flags, header extension length
+
+    n_fields = struct.pack(">h", len(encoders))
+    null_field = struct.pack(">i", -1)
+    for row in rows:
+        buf.write(n_fields)
+        for value, encode in zip(row, encoders):
+            if value is None:
+                buf.write(null_field)
+                continue
+            data = encode(value)
+            buf.write(struct.pack(">i", len(data)))
+            buf.write(data)
+
+    buf.write(struct.pack(">h", -1))  # trailer
+    buf.seek(0)
+    return buf
@@ -0,0 +1,26 @@
+# app/utils/quantization.py
+from typing import Tuple
+
+import numpy as np
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-vector int8 quantization.
+    Returns (codes int8 of shape (n, dim), scales float32 of shape (n,)) with
+    vector ~= codes * scale; a quarter of the float32 size plus 4 bytes per row.
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales) -> np.ndarray:
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def int8_dot(codes, scales, query) -> np.ndarray:
+    """Dot products of quantized rows with a float32 query, without materializing the rows."""
+    return (np.asarray(codes, dtype=np.float32) @ np.asarray(query, dtype=np.float32)) * scales
@@ -0,0 +1,34 @@
+# app/utils/rank_fusion.py
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[T]],
+    k: int = 60,
+    key: Callable[[T], Hashable] = lambda item: item,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[T, float]]:
+    """
+    Merge ranked lists with reciprocal rank fusion:
+    score(d) = sum_i weight_i / (k + rank_i(d)), ranks starting at 1.
+
+    Items are matched across lists by `key`; the first occurrence is kept.
+    Returns (item, score) pairs, best first. Ties keep first-seen order.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    if len(weights) != len(rankings):
+        raise ValueError("weights must have one entry per ranking")
+
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            items.setdefault(item_key, item)
+            scores[item_key] = scores.get(item_key, 0.0) + weight / (k + rank)
+
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [(items[item_key], scores[item_key]) for item_key in ordered]
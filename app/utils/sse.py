@@ -0,0 +1,45 @@
+# app/utils/sse.py
+"""
+Server-Sent Events helpers for streamed answers.
+
+A streamed answer is a sequence of `token` events ({"delta": "..."}) followed
+by one `done` event carrying the full answer, or an `error` event if the
+source fails mid-stream (the HTTP status is already 200 by then).
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(data: Any, event: Optional[str] = None) -> str:
+    """One SSE frame; `data` is JSON-encoded so newlines in text stay inside a single data line."""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def answer_events(deltas: AsyncIterator[str], **done_fields) -> AsyncIterator[str]:
+    """`token` event per text delta, then `done` with the joined answer and `done_fields`."""
+    parts = []
+    try:
+        async for delta in deltas:
+            if delta:
+                parts.append(delta)
+                yield format_event({"delta": delta}, event="token")
+    except Exception as e:
+        logger.error(f"Streaming answer failed after {len(parts)} deltas: {e}")
+        yield format_event({"detail": str(e)}, event="error")
+        return
+    yield format_event({"answer": "".join(parts), **done_fields}, event="done")
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Disable proxy buffering so each token reaches the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,78 @@
+# benchmarks/bench_chunker.py
+"""
+Micro-benchmark: built-in TokenChunker vs LangChain's RecursiveCharacterTextSplitter.
+
+Usage:
+    python -m benchmarks.bench_chunker --mb 4 --repeat 3
+"""
+import argparse
+import random
+import time
+
+from app.utils.chunker import TokenChunker, count_tokens
+
+WORDS = (
+    "gradient descent backpropagation matrix vector learning rate loss function "
+    "neural network layer activation softmax entropy regularization dropout batch "
+    "the a of and to in is that for on with as by"
+).split()
+
+
+def make_text(n_bytes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < n_bytes:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + "."
+        if rng.random() < 0.1:
+            sentence += "\n\n"
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)
+
+
+def bench(label, fn, text, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    mb = len(text) / 1e6
+    print(f"{label:<34} {best * 1000:9.1f} ms  {mb / best:7.2f} MB/s  {len(result):6d} chunks")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=4.0, help="size of the synthetic document")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    args = parser.parse_args()
+
+    text = make_text(int(args.mb * 1e6))
+    print(f"Document: {len(text) / 1e6:.1f} MB, ~{count_tokens(text):,} tokens\n")
+
+    chunker = TokenChunker(max_tokens=args.max_tokens, overlap_tokens=args.overlap_tokens)
+    bench("TokenChunker.split_spans", chunker.split_spans, text, args.repeat)
+    spans = bench("TokenChunker.split (with copies)", chunker.split, text, args.repeat)
+    worst = max(count_tokens(c) for c in spans)
+    print(f"{'':<34} max chunk size: {worst} tokens (limit {args.max_tokens})")
+
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        print("\nlangchain-text-splitters not installed; skipping RecursiveCharacterTextSplitter")
+        return
+
+    # Same average size in characters (~4 chars per token) for a fair comparison
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.max_tokens * 4, chunk_overlap=args.overlap_tokens * 4
+    )
+    chunks = bench("RecursiveCharacterTextSplitter", splitter.split_text, text, args.repeat)
+    worst = max(count_tokens(c) for c in chunks)
+    print(f"{'':<34} max chunk size: {worst} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_mmr.py
+"""
+Prompt tokens needed for full answer coverage: plain top-k vs MMR re-ranking.
+
+Synthetic corpus: each topic is a run of sentences, chunked with the
+production TokenChunker (overlap included), so neighbouring chunks of a
+topic are near-duplicates. A chunk's embedding is the mean of its sentences'
+topic vectors plus noise. Each question needs facts from several topics with
+decreasing relevance; "coverage" means every needed topic appears in the
+selected chunks. For each strategy we find the smallest k reaching full
+coverage and report the prompt tokens of those k chunks.
+
+Usage:
+    python -m benchmarks.bench_mmr --trials 200 --lambda 0.5
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.utils.chunker import TokenChunker, count_tokens
+from app.utils.mmr import maximal_marginal_relevance
+
+WORDS = (
+    "gradient descent backpropagation matrix vector learning rate loss function "
+    "neural network layer activation softmax entropy regularization dropout batch"
+).split()
+
+
+def build_corpus(rng, np_rng, n_topics, sentences_per_topic, dim, chunker):
+    topic_vecs = np_rng.standard_normal((n_topics, dim)).astype(np.float32)
+    topic_vecs /= np.linalg.norm(topic_vecs, axis=1, keepdims=True)
+
+    sentences, sentence_topics = [], []
+    for t in range(n_topics):
+        for _ in range(sentences_per_topic):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 20)))
+            sentences.append(f"Topic {t}: {words}.")
+            sentence_topics.append(t)
+
+    text = " ".join(sentences)
+    # Character offset of each sentence start -> topic
+    starts, pos = [], 0
+    for sentence in sentences:
+        starts.append(pos)
+        pos += len(sentence) + 1
+
+    chunks, chunk_vecs, chunk_topics = [], [], []
+    for s, e in chunker.split_spans(text):
+        topics = [sentence_topics[i] for i, st in enumerate(starts) if s <= st < e]
+        if not topics:
+            continue
+        vec = topic_vecs[topics].mean(axis=0) + 0.05 * np_rng.standard_normal(dim).astype(np.float32)
+        chunks.append(text[s:e])
+        chunk_vecs.append(vec)
+        chunk_topics.append(set(topics))
+    return topic_vecs, chunks, np.stack(chunk_vecs), chunk_topics
+
+
+def k_for_coverage(order, chunk_topics, needed):
+    covered = set()
+    for k, idx in enumerate(order, start=1):
+        covered |= chunk_topics[idx] & needed
+        if covered == needed:
+            return k
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--sentences-per-topic", type=int, default=30)
+    parser.add_argument("--needed-topics", type=int, default=3)
+    parser.add_argument("--fetch-k", type=int, default=30)
+    parser.add_argument("--lambda", dest="lambda_mult", type=float, default=0.5)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    np_rng = np.random.default_rng(0)
+    chunker = TokenChunker(max_tokens=128, overlap_tokens=32)
+    topic_vecs, chunks, chunk_vecs, chunk_topics = build_corpus(
+        rng, np_rng, args.topics, args.sentences_per_topic, args.dim, chunker
+    )
+    unit = chunk_vecs / np.linalg.norm(chunk_vecs, axis=1, keepdims=True)
+    chunk_tokens = np.array([count_tokens(c) for c in chunks])
+    print(f"{len(chunks)} chunks, {chunk_tokens.mean():.0f} tokens each on average\n")
+
+    results = {"top-k": [], "mmr": []}
+    mmr_time = 0.0
+    for _ in range(args.trials):
+        needed = rng.sample(range(args.topics), args.needed_topics)
+        weights = np.linspace(1.0, 0.5, args.needed_topics, dtype=np.float32)[:, None]
+        query = (topic_vecs[needed] * weights).sum(axis=0)
+
+        scores = unit @ (query / np.linalg.norm(query))
+        ranked = np.argsort(-scores)
+        candidates = ranked[: args.fetch_k]
+
+        start = time.perf_counter()
+        picked = maximal_marginal_relevance(query, chunk_vecs[candidates], k=args.fetch_k, lambda_mult=args.lambda_mult)
+        mmr_time += time.perf_counter() - start
+        mmr_order = candidates[picked]
+
+        for name, order in (("top-k", ranked[: args.fetch_k]), ("mmr", mmr_order)):
+            k = k_for_coverage(order, chunk_topics, set(needed))
+            if k is not None:
+                results[name].append((k, int(chunk_tokens[order[:k]].sum())))
+
+    print(f"{'strategy':<8} {'covered':>8} {'mean k':>8} {'mean prompt tokens':>20}")
+    for name, rows in results.items():
+        if rows:
+            ks, tokens = zip(*rows)
+            print(f"{name:<8} {len(rows):>4}/{args.trials:<3} {np.mean(ks):8.2f} {np.mean(tokens):20.0f}")
+        else:
+            print(f"{name:<8} {0:>4}/{args.trials:<3} {'-':>8} {'-':>20}")
+    print(f"\nMMR selection: {mmr_time / args.trials * 1e6:.0f} us per query over {args.fetch_k} candidates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_vector_search.py
+"""
+Top-k vector search latency (p50 / p99) as the table grows.
+
+Loads random unit vectors into a scratch table with binary COPY, and after
+each growth step measures bound-parameter cosine top-k queries with an exact
+scan and with the configured ANN index.
+
+Usage:
+    python -m benchmarks.bench_vector_search --db-url postgresql://... \
+        --sizes 10000 100000 1000000 --queries 200 --index hnsw [--precision halfvec]
+
+With --precision halfvec the index is built on the half-precision cast and
+queries re-score its candidates at full precision, as the app does.
+
+Needs a Postgres database with the pgvector extension; the scratch table is
+dropped at the end unless --keep is given.
+"""
+import argparse
+import time
+
+import numpy as np
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import Column, Integer, MetaData, Table, cast, create_engine, select, text
+
+from app.core.config import settings
+from app.repositories.vector_index import VectorIndexManager
+from app.utils.pg_copy import build_copy_payload, encode_vector
+
+TABLE = "bench_embeddings"
+
+
+def random_vectors(rng, n, dim):
+    vecs = rng.standard_normal((n, dim), dtype=np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def load(engine, rng, n, dim, batch=50_000):
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cur:
+            for start in range(0, n, batch):
+                rows = [(v,) for v in random_vectors(rng, min(batch, n - start), dim)]
+                cur.copy_expert(
+                    f"COPY {TABLE} (embedding_vector) FROM STDIN WITH (FORMAT BINARY)",
+                    build_copy_payload(rows, [encode_vector]),
+                )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def search_stmt(table, manager, q, top_k, candidates):
+    vec = table.c.embedding_vector
+    stmt = select(table.c.id).order_by(vec.cosine_distance(q)).limit(top_k)
+    if manager is not None and manager.precision == "halfvec":
+        compact = cast(vec, HALFVEC(manager.dim)).cosine_distance(q)
+        stmt = stmt.where(table.c.id.in_(select(table.c.id).order_by(compact).limit(candidates)))
+    return stmt
+
+
+def measure(engine, table, manager, queries, top_k, candidates):
+    latencies = []
+    with engine.connect() as conn:
+        for q in queries:
+            with conn.begin():
+                if manager is not None:
+                    manager.apply_search_params(conn, candidates if manager.precision == "halfvec" else top_k)
+                start = time.perf_counter()
+                conn.execute(search_stmt(table, manager, q, top_k, candidates)).all()
+                latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default=settings.SUPABASE_DB_URL)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--index", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--precision", choices=["full", "halfvec"], default="full")
+    parser.add_argument("--candidates", type=int, default=settings.VECTOR_RESCORE_CANDIDATES)
+    parser.add_argument("--skip-exact", action="store_true", help="skip the sequential-scan baseline")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    metadata = MetaData()
+    table = Table(
+        TABLE, metadata,
+        Column("id", Integer, primary_key=True),
+        Column("embedding_vector", Vector(args.dim)),
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    manager = VectorIndexManager(
+        args.index, table=TABLE, index_name=f"{TABLE}_ann", precision=args.precision, dim=args.dim
+    )
+    rng = np.random.default_rng(0)
+    queries = list(random_vectors(rng, args.queries, args.dim))
+
+    print(f"{'rows':>10} {'mode':<12} {'p50 ms':>9} {'p99 ms':>9} {'build s':>8} {'index':>10}")
+    loaded = 0
+    try:
+        for size in sorted(args.sizes):
+            load(engine, rng, size - loaded, args.dim)
+            loaded = size
+            with engine.begin() as conn:
+                conn.execute(text(f"ANALYZE {TABLE}"))
+
+            if not args.skip_exact:
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {manager.index_name}"))
+                p50, p99 = measure(engine, table, None, queries, args.top_k, args.candidates)
+                print(f"{size:>10} {'exact':<12} {p50:9.2f} {p99:9.2f} {'':>8}")
+
+            start = time.perf_counter()
+            manager.ensure_index(engine, rebuild=True)
+            build = time.perf_counter() - start
+            with engine.connect() as conn:
+                index_size = conn.execute(
+                    text("SELECT pg_size_pretty(pg_relation_size(CAST(:name AS regclass)))"),
+                    {"name": manager.index_name},
+                ).scalar()
+            p50, p99 = measure(engine, table, manager, queries, args.top_k, args.candidates)
+            mode = f"{args.index}/{args.precision}"
+            print(f"{size:>10} {mode:<12} {p50:9.2f} {p99:9.2f} {build:8.1f} {index_size:>10}")
+    finally:
+        if not args.keep:
+            metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,47 @@
 # init_db.py
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from app.models.base import Base
 from app.models.embedding import Embedding  # 👈 ensures table gets registered
 from app.models.file import UploadedFile  
 from app.models.chat_history import ChatHistory# 👈 ensures table gets registered
 from app.models.user import User
 from app.core.config import settings
+from app.repositories.vector_index import VectorIndexManager
 from app.models.progress import Progress  # 👈 ensures table gets registered
 from app.models.calendar_event import CalendarEvent  # 👈 ensures table gets registered
+from app.models.ingestion_job import IngestionJob  # 👈 ensures table gets registered
 logging.basicConfig(level=logging.INFO)
 
+# Idempotent upgrades for databases created before a column/index existed.
+# create_all() only creates missing tables, never missing columns.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE uploaded_files ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_uploaded_files_content_hash ON uploaded_files (content_hash)",
+    "ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS chunk_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_embeddings_chunk_hash ON embeddings (chunk_hash)",
+    "ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS chunks_reused INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS chunks_deleted INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS user_id VARCHAR",
+    "UPDATE embeddings e SET user_id = f.user_id FROM uploaded_files f "
+    "WHERE e.file_id = f.id AND e.user_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_embeddings_user_id ON embeddings (user_id)",
+    "ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', content_chunk)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_embeddings_content_tsv ON embeddings USING gin (content_tsv)",
+    "CREATE INDEX IF NOT EXISTS ix_embeddings_file_id ON embeddings (file_id)",
+    "ALTER TABLE uploaded_files ADD COLUMN IF NOT EXISTS summary_vector vector(1024)",
+    "UPDATE uploaded_files f SET summary_vector = "
+    "(SELECT avg(e.embedding_vector) FROM embeddings e WHERE e.file_id = f.id) "
+    "WHERE f.summary_vector IS NULL",
+]
+
+
+def upgrade_schema(engine):
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
+
 def init_db():
     logging.info("Creating tables...")
 
@@ -19,6 +50,8 @@ def init_db():
 
     # Create all tables from models
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    VectorIndexManager().ensure_index(engine)
 
     logging.info("✅ Tables created successfully in Supabase!")
 
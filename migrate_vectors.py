@@ -0,0 +1,77 @@
+# migrate_vectors.py
+"""
+Move existing vectors to a compact search representation.
+
+    # Postgres: build the half-precision ANN index, then drop the full one
+    python migrate_vectors.py --precision halfvec
+
+    # Back to the full-precision index
+    python migrate_vectors.py --precision full
+
+    # Local mmap stores: re-encode every user's vectors (float32 | float16 | int8)
+    python migrate_vectors.py --store-dtype int8
+
+Set VECTOR_SEARCH_PRECISION / VECTOR_STORE_DTYPE to the same values so the app
+queries the new representation. Full-precision vectors in `embeddings` are
+never modified; they remain the source for re-scoring and rebuilds.
+"""
+import argparse
+import logging
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.embedding import Embedding
+from app.models.file import UploadedFile  # 👈 resolves Embedding.file
+from app.repositories.embedding_repository import EmbeddingRepository
+from app.repositories.mmap_vector_store import MmapVectorStore
+from app.repositories.vector_index import INDEX_NAMES, VectorIndexManager
+
+logging.basicConfig(level=logging.INFO)
+
+
+def migrate_index(engine, precision: str):
+    manager = VectorIndexManager(precision=precision)
+    # Build the new index before dropping the old one so search never loses its index
+    manager.ensure_index(engine)
+    with engine.begin() as conn:
+        for other, name in INDEX_NAMES.items():
+            if other != precision:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        size = conn.execute(
+            text("SELECT pg_size_pretty(pg_relation_size(CAST(:name AS regclass)))"), {"name": manager.index_name}
+        ).scalar()
+    logging.info(f"✅ {precision} index {manager.index_name} in place ({size})")
+
+
+def migrate_store(engine, dtype: str):
+    store = MmapVectorStore(settings.VECTOR_STORE_DIR, dtype=dtype)
+    db = sessionmaker(bind=engine)()
+    try:
+        repo = EmbeddingRepository(db)
+        user_ids = [row[0] for row in db.query(Embedding.user_id).filter(Embedding.user_id.isnot(None)).distinct()]
+        for user_id in user_ids:
+            store.sync_from(repo, user_id, rebuild=True)
+        logging.info(f"✅ Re-encoded {len(user_ids)} user stores as {dtype}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--precision", choices=sorted(INDEX_NAMES), help="Postgres ANN index precision")
+    parser.add_argument("--store-dtype", choices=["float32", "float16", "int8"], help="local mmap store encoding")
+    args = parser.parse_args()
+    if not args.precision and not args.store_dtype:
+        parser.error("nothing to do: pass --precision and/or --store-dtype")
+
+    engine = create_engine(settings.SUPABASE_DB_URL)
+    if args.precision:
+        migrate_index(engine, args.precision)
+    if args.store_dtype:
+        migrate_store(engine, args.store_dtype)
+
+
+if __name__ == "__main__":
+    main()
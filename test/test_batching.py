@@ -0,0 +1,21 @@
+import asyncio
+from app.utils.batching import chunked, map_batches
+
+
+def test_chunked_splits_into_fixed_size_slices():
+    assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+
+def test_map_batches_preserves_input_order():
+    calls = []
+
+    async def fake_embed(batch):
+        calls.append(list(batch))
+        # Finish later batches first to make sure ordering does not depend on timing
+        await asyncio.sleep(0.01 * (10 - batch[0]))
+        return [[float(x)] for x in batch]
+
+    result = asyncio.run(map_batches(fake_embed, list(range(10)), batch_size=3, max_concurrency=4))
+
+    assert result == [[float(x)] for x in range(10)]
+    assert len(calls) == 4
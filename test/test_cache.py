@@ -0,0 +1,113 @@
+import numpy as np
+
+from app.cache.embedding_cache import EmbeddingCache
+from app.cache.llm_response_cache import LLMResponseCache
+from app.cache.lru import LRUCache
+from app.cache.semantic_cache import SemanticAnswerCache, fingerprint_chunks, is_follow_up
+from app.cache.sqlite_store import SQLiteKVStore
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_counts_hits_and_misses():
+    cache = LRUCache(maxsize=4)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SQLiteKVStore(str(tmp_path / "cache.sqlite3"))
+    store.set_many([("k1", b"\x01\x02"), ("k2", b"\x03")])
+
+    assert store.get_many(["k1", "k2", "k3"]) == {"k1": b"\x01\x02", "k2": b"\x03"}
+    store.close()
+
+
+def test_lru_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.lru.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_semantic_cache_matches_similar_question_over_same_chunks():
+    cache = SemanticAnswerCache(threshold=0.95)
+    fp = fingerprint_chunks([3, 1, 2])
+    cache.store("u1", [1.0, 0.0, 0.0], fp, "answer")
+
+    assert cache.lookup("u1", [0.99, 0.05, 0.0], fingerprint_chunks([1, 2, 3])) == "answer"
+    assert cache.lookup("u1", [0.0, 1.0, 0.0], fp) is None
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fingerprint_chunks([1, 2, 4])) is None
+    assert cache.lookup("u2", [1.0, 0.0, 0.0], fp) is None
+
+    cache.invalidate_user("u1")
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fp) is None
+
+
+def test_follow_up_questions_are_detected():
+    assert not is_follow_up("What is a derivative in calculus?")
+    assert not is_follow_up("Explain the chain rule")
+    assert is_follow_up("and the second one?")
+    assert is_follow_up("Can you explain it again?")
+    assert is_follow_up("why?")
+
+
+def test_semantic_cache_fingerprint_includes_conversation_history():
+    cache = SemanticAnswerCache(threshold=0.95)
+    history = ["user: what is a derivative?", "assistant: the rate of change."]
+    cache.store("u1", [1.0, 0.0, 0.0], fingerprint_chunks([1, 2], history), "answer")
+
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fingerprint_chunks([2, 1], list(history))) == "answer"
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fingerprint_chunks([1, 2])) is None
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fingerprint_chunks([1, 2], history[::-1])) is None
+    assert cache.lookup("u1", [1.0, 0.0, 0.0], fingerprint_chunks([1, 2], history + ["user: and integrals?"])) is None
+
+
+def test_llm_response_cache_survives_restart_until_expiry(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm.sqlite3")
+    key = LLMResponseCache.make_key("mistral", "m", "prompt", system="sys", params={"temperature": 0.2})
+    LLMResponseCache(path=path).set(key, "answer", ttl=60)
+
+    restarted = LLMResponseCache(path=path)
+    assert restarted.get(key) == "answer"
+    assert restarted.stats()["disk_hits"] == 1
+
+    monkeypatch.setattr("app.cache.llm_response_cache.time.time", lambda: 10**12)
+    assert LLMResponseCache(path=path).get(key) is None
+    assert key != LLMResponseCache.make_key("mistral", "m", "prompt", system="sys", params={"temperature": 0.7})
+
+
+def test_embedding_cache_promotes_disk_hits_and_keys_by_model(tmp_path):
+    path = str(tmp_path / "emb.sqlite3")
+    vector = [0.1, -2.5, 3.0]
+    EmbeddingCache(path=path).set("mistral-embed", "hello", vector)
+
+    restarted = EmbeddingCache(path=path)
+    cached = restarted.get("mistral-embed", "hello")
+    assert cached == np.float32(vector).tolist()  # stored as float32
+    assert restarted.stats()["disk_hits"] == 1
+
+    restarted.get("mistral-embed", "hello")
+    assert restarted.stats()["memory_hits"] == 1  # promoted to the memory tier
+    assert restarted.get("other-model", "hello") is None
+    assert restarted.stats()["misses"] == 1
@@ -0,0 +1,35 @@
+from app.utils.chunker import TokenChunker, count_tokens
+
+
+def test_count_tokens_counts_words_and_punctuation():
+    assert count_tokens("Hello, world.") == 4
+
+
+def test_chunks_respect_token_limit_and_sentence_boundaries():
+    text = " ".join(f"Sentence number {i} is here." for i in range(100))
+    chunker = TokenChunker(max_tokens=30, overlap_tokens=0)
+
+    spans = chunker.split_spans(text)
+
+    assert len(spans) > 1
+    for start, end in spans:
+        chunk = text[start:end]
+        assert count_tokens(chunk) <= 30
+        assert chunk.startswith("Sentence") and chunk.endswith(".")
+
+
+def test_overlap_repeats_trailing_sentence():
+    text = "One two three. Four five six. Seven eight nine. Ten eleven twelve."
+    chunker = TokenChunker(max_tokens=8, overlap_tokens=4)
+
+    chunks = chunker.split(text)
+
+    assert chunks[0] == "One two three. Four five six."
+    assert chunks[1].startswith("Four five six.")
+
+
+def test_oversized_sentence_is_split_on_token_boundaries():
+    text = " ".join(["word"] * 50)
+    spans = TokenChunker(max_tokens=20, overlap_tokens=0).split_spans(text)
+
+    assert [count_tokens(text[s:e]) for s, e in spans] == [20, 20, 10]
@@ -0,0 +1,37 @@
+from app.utils.context_packer import ContextPacker, truncate_to_tokens
+from app.utils.chunker import count_tokens
+
+
+def _words(n, word="token"):
+    return " ".join([word] * n)
+
+
+def test_documents_fill_budget_best_first_and_truncate_the_overflow():
+    packer = ContextPacker(doc_budget=100, min_truncated_tokens=10)
+    docs = [_words(40, "alpha"), _words(40, "beta"), _words(40, "gamma"), _words(40, "delta")]
+
+    packed, report = packer.pack_documents(docs)
+
+    assert packed[:2] == docs[:2]
+    assert packed[2].startswith("gamma") and len(packed) == 3
+    assert report.docs_truncated == 1 and report.docs_dropped == 1
+    assert report.doc_tokens <= 100
+
+
+def test_history_keeps_newest_messages_in_order():
+    packer = ContextPacker(doc_budget=0, history_budget=25)
+    history = [f"user: {_words(10, str(i))}" for i in range(5)]
+
+    packed = packer.pack([], history)
+
+    assert packed.history == history[-2:]
+    assert packed.report.history_dropped == 3
+
+
+def test_truncate_to_tokens_respects_budget():
+    text = _words(500)
+
+    cut = truncate_to_tokens(text, 50)
+
+    assert count_tokens(cut) <= 50
+    assert text.startswith(cut)
@@ -0,0 +1,103 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.ingestion_job import IngestionJob
+from app.repositories.ingestion_job_repository import IngestionJobRepository
+from app.services.ingestion_job_service import IngestionJobService
+from app.services.ingestion_pipeline import IngestionProgress
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    IngestionJob.__table__.create(engine)
+    return sessionmaker(bind=engine, expire_on_commit=True)
+
+
+class _FakePipeline:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def run(self, user_id, filename, file_path, file_bytes, on_progress=None):
+        self.calls.append((user_id, filename, file_bytes))
+        if self.error:
+            raise self.error
+        progress = IngestionProgress(pages_done=2, chunks_done=3, vectors_done=3)
+        on_progress(progress)
+        return SimpleNamespace(id=42), progress
+
+
+def _service(session_factory, tmp_path, pipeline):
+    service = IngestionJobService(session_factory, file_processing_service=None, num_workers=1, spool_dir=str(tmp_path))
+    service._build_pipeline = lambda db: pipeline
+    return service
+
+
+def test_claim_is_atomic(session_factory):
+    db = session_factory()
+    repo = IngestionJobRepository(db)
+    job_id = repo.create_job("user-1", "a.pdf", "user-1/a.pdf", spool_path=None).id
+
+    assert repo.claim(job_id).status == "running"
+    assert repo.claim(job_id) is None
+    assert IngestionJobRepository(session_factory()).claim(job_id) is None
+
+
+@pytest.mark.parametrize("error", [None, RuntimeError("embedding failed")])
+def test_submit_processes_job_to_a_final_state(session_factory, tmp_path, error):
+    pipeline = _FakePipeline(error)
+    service = _service(session_factory, tmp_path, pipeline)
+
+    async def run():
+        await service.start()
+        job = await service.submit("user-1", "a.pdf", "user-1/a.pdf", b"%PDF")
+        assert job.status == "queued"
+        await service._queue.join()
+        await service.stop()
+        return service.get_job(job.id, "user-1"), job.spool_path
+
+    job, spool_path = asyncio.run(run())
+
+    assert pipeline.calls == [("user-1", "a.pdf", b"%PDF")]
+    if error is None:
+        assert (job.status, job.file_id, job.pages_done, job.vectors_done) == ("completed", 42, 2, 3)
+    else:
+        assert (job.status, job.error) == ("failed", "embedding failed")
+    assert not os.path.exists(spool_path)
+
+
+def test_requeue_takes_over_only_jobs_with_expired_lease(session_factory, tmp_path):
+    db = session_factory()
+    repo = IngestionJobRepository(db)
+    jobs = {}
+    for name in ("queued", "live", "stale", "lost"):
+        spool_path = str(tmp_path / f"{name}.pdf") if name != "lost" else str(tmp_path / "missing.pdf")
+        if name != "lost":
+            with open(spool_path, "wb") as f:
+                f.write(b"%PDF")
+        jobs[name] = repo.create_job("user-1", f"{name}.pdf", f"user-1/{name}.pdf", spool_path=spool_path)
+    repo.claim(jobs["live"].id)
+    repo.claim(jobs["stale"].id)
+    repo.update_job(jobs["stale"], updated_at=datetime.now(timezone.utc) - timedelta(hours=1))
+
+    service = _service(session_factory, tmp_path, _FakePipeline())
+    service._queue = asyncio.Queue()
+    service._requeue_unfinished()
+
+    queued = []
+    while not service._queue.empty():
+        queued.append(service._queue.get_nowait())
+    assert sorted(queued) == sorted([jobs["queued"].id, jobs["stale"].id])
+
+    db.expire_all()
+    assert jobs["live"].status == "running"
+    assert jobs["stale"].status == "queued"
+    assert jobs["lost"].status == "failed"
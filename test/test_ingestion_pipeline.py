@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ingestion_pipeline
+from app.services.ingestion_pipeline import IngestionPipeline
+from app.utils.content_hash import hash_bytes, hash_text
+
+
+class _FakeDB:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def refresh(self, obj):
+        pass
+
+
+class _FakeEmbeddingRepo:
+    """In-memory chunks per file: {file_id: {chunk_hash: text}}."""
+
+    def __init__(self, files=None):
+        self.db = _FakeDB()
+        self.chunks = {file_id: dict(chunks) for file_id, chunks in (files or {}).items()}
+        self.deleted = []
+
+    def get_chunk_hashes(self, file_id):
+        return set(self.chunks.get(file_id, {}))
+
+    def create_file_entry(self, user_id, filename, file_path, content_hash=None):
+        return SimpleNamespace(id=len(self.chunks) + 1, filename=filename, file_path=file_path, content_hash=content_hash)
+
+    def bulk_insert_embeddings(self, file_id, chunks, vectors, chunk_hashes=None, user_id=None):
+        self.chunks.setdefault(file_id, {}).update(zip(chunk_hashes, chunks))
+        return len(chunks)
+
+    def delete_stale_chunks(self, file_id, stale_hashes):
+        self.deleted.extend(sorted(stale_hashes))
+        for chunk_hash in stale_hashes:
+            self.chunks[file_id].pop(chunk_hash)
+        return len(stale_hashes)
+
+    def refresh_file_summary(self, file_id):
+        pass
+
+
+class _FakeFileRepo:
+    def __init__(self, files=()):
+        self.files = list(files)
+
+    def get_by_content_hash(self, db, user_id, content_hash):
+        return next((f for f in self.files if f.content_hash == content_hash), None)
+
+    def get_by_filename(self, db, user_id, filename):
+        return next((f for f in self.files if f.filename == filename), None)
+
+
+class _FakeEmbeddingService:
+    def __init__(self):
+        self.embedded = []
+
+    async def create_embeddings(self, chunks):
+        self.embedded.extend(chunks)
+        return [[0.0, 1.0] for _ in chunks]
+
+
+class _OnePageOneChunk:
+    def feed(self, text):
+        return [text]
+
+    def finish(self):
+        return []
+
+
+class _FakeFileProcessing:
+    """A "PDF" is its pages joined by newlines; each page is one chunk."""
+
+    def chunk_stream(self):
+        return _OnePageOneChunk()
+
+    async def aiter_pdf_pages(self, file_bytes):
+        for page in file_bytes.decode().split("\n"):
+            yield page
+
+
+@pytest.fixture(autouse=True)
+def _no_answer_cache(monkeypatch):
+    monkeypatch.setattr(ingestion_pipeline, "get_semantic_cache", lambda: None)
+
+
+def _pipeline(embedding_repo, stored_files=()):
+    pipeline = IngestionPipeline(
+        embedding_service=_FakeEmbeddingService(),
+        embedding_repo=embedding_repo,
+        file_processing_service=_FakeFileProcessing(),
+        batch_size=2,
+    )
+    pipeline.file_repo = _FakeFileRepo(stored_files)
+    return pipeline
+
+
+def _run(pipeline, file_bytes, filename="notes.pdf"):
+    return asyncio.run(pipeline.run("user-1", filename, f"user-1/{filename}", file_bytes))
+
+
+def test_new_file_embeds_every_distinct_chunk():
+    repo = _FakeEmbeddingRepo()
+    pipeline = _pipeline(repo)
+
+    file_entry, progress = _run(pipeline, b"intro\nbody\nintro\nend")
+
+    assert pipeline.embedding_service.embedded == ["intro", "body", "end"]
+    assert set(repo.chunks[file_entry.id].values()) == {"intro", "body", "end"}
+    assert (progress.pages_done, progress.chunks_done, progress.vectors_done) == (4, 3, 3)
+    assert repo.db.commits == 1
+
+
+def test_byte_identical_upload_is_a_no_op():
+    content = b"intro\nbody"
+    stored = SimpleNamespace(id=1, filename="notes.pdf", content_hash=hash_bytes(content))
+    repo = _FakeEmbeddingRepo({1: {hash_text("intro"): "intro", hash_text("body"): "body"}})
+    pipeline = _pipeline(repo, [stored])
+
+    file_entry, progress = _run(pipeline, content, filename="copy.pdf")
+
+    assert file_entry is stored
+    assert pipeline.embedding_service.embedded == []
+    assert progress.pages_done == 0
+    assert repo.db.commits == 0
+
+
+def test_reupload_embeds_new_chunks_and_deletes_stale_ones():
+    stored = SimpleNamespace(id=1, filename="notes.pdf", file_path="user-1/notes.pdf", content_hash="old")
+    repo = _FakeEmbeddingRepo({1: {hash_text(text): text for text in ("intro", "body", "old ending")}})
+    pipeline = _pipeline(repo, [stored])
+
+    file_entry, progress = _run(pipeline, b"intro\nbody\nnew section\nnew ending")
+
+    assert file_entry is stored
+    assert file_entry.content_hash == hash_bytes(b"intro\nbody\nnew section\nnew ending")
+    assert pipeline.embedding_service.embedded == ["new section", "new ending"]
+    assert repo.deleted == [hash_text("old ending")]
+    assert set(repo.chunks[1].values()) == {"intro", "body", "new section", "new ending"}
+    assert (progress.chunks_reused, progress.chunks_done, progress.chunks_deleted) == (2, 2, 1)
@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+
+from app.cache.llm_response_cache import LLMResponseCache
+from app.clients import llm_gateway
+from app.clients.llm_gateway import CircuitBreaker, LLMGateway
+from app.clients.rate_limiter import ProviderRateLimiter
+from app.exceptions.base_exceptions import ExternalServiceError
+
+
+@pytest.fixture(autouse=True)
+def _fresh_latency_trackers(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_latencies", {})
+
+
+class FakeClient:
+    def __init__(self, answer="ok", delay=0.0, fail=False):
+        self.answer = answer
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return self.answer
+
+
+def _gateway(primary, fallback, hedging=False, clock=None):
+    breakers = {
+        name: CircuitBreaker(name, failure_threshold=2, reset_timeout=30, clock=clock or (lambda: 0.0))
+        for name in ("primary", "fallback")
+    }
+    return LLMGateway([("primary", primary), ("fallback", fallback)], hedging=hedging, breakers=breakers)
+
+
+def test_falls_back_when_primary_fails():
+    gateway = _gateway(FakeClient(fail=True), FakeClient("fallback"))
+
+    assert asyncio.run(gateway.generate("q")) == "fallback"
+
+
+def test_open_breaker_skips_provider_until_reset():
+    now = [0.0]
+    primary = FakeClient(fail=True)
+    gateway = _gateway(primary, FakeClient("fallback"), clock=lambda: now[0])
+
+    for _ in range(3):
+        asyncio.run(gateway.generate("q"))
+    assert primary.calls == 2  # opened after two failures
+
+    now[0] = 31.0
+    primary.fail = False
+    assert asyncio.run(gateway.generate("q")) == "ok"  # trial call closes the breaker
+    assert gateway.stats()["providers"]["primary"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_hedges_a_slow_primary(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_DEFAULT_DELAY", 0.01)
+    primary = FakeClient("slow", delay=1.0)
+    gateway = _gateway(primary, FakeClient("fast"), hedging=True)
+
+    assert asyncio.run(gateway.generate("q")) == "fast"
+    assert gateway.hedged_calls == 1
+
+
+def test_latency_is_shared_and_counts_calls_that_lost_a_hedge(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_DEFAULT_DELAY", 0.05)
+    gateway = _gateway(FakeClient("slow", delay=1.0), FakeClient("fast", delay=0.2), hedging=True)
+    other = _gateway(FakeClient(), FakeClient())
+
+    assert asyncio.run(gateway.generate("q")) == "fast"
+
+    # The cancelled primary is recorded at its elapsed time, the winner at its own latency
+    primary_samples = list(other.providers[0].latency.samples)
+    assert len(primary_samples) == 1 and primary_samples[0] >= 0.2
+    assert len(other.providers[1].latency.samples) == 1
+
+
+def test_raises_when_every_provider_fails():
+    gateway = _gateway(FakeClient(fail=True), FakeClient(fail=True))
+
+    with pytest.raises(ExternalServiceError):
+        asyncio.run(gateway.generate("q"))
+
+
+def test_identical_prompts_are_answered_from_cache(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("app.clients.llm_gateway.get_llm_response_cache", lambda: cache)
+    primary = FakeClient("summary")
+    gateway = _gateway(primary, FakeClient("fallback"))
+    gateway.cache_ttl = 60
+
+    first = asyncio.run(gateway.generate("same prompt", system="s"))
+    second = asyncio.run(gateway.generate("same prompt", system="s"))
+    asyncio.run(gateway.generate("same prompt", system="s", bypass_cache=True))
+
+    assert first == second == "summary"
+    assert primary.calls == 2
+
+
+def test_fallback_answers_expire_quickly(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("app.clients.llm_gateway.get_llm_response_cache", lambda: cache)
+    monkeypatch.setattr("app.core.config.settings.LLM_CACHE_TTL_FALLBACK", 0)
+    primary = FakeClient(fail=True)
+    fallback = FakeClient("fallback")
+    gateway = _gateway(primary, fallback)
+    gateway.cache_ttl = 60
+
+    assert asyncio.run(gateway.generate("q")) == "fallback"
+    primary.fail = False
+    assert asyncio.run(gateway.generate("q")) == "ok"  # fallback answer was not reused
+    assert asyncio.run(gateway.generate("q")) == "ok"
+    assert primary.calls == 2
+
+
+def test_answers_rejected_by_cache_if_are_not_stored(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("app.clients.llm_gateway.get_llm_response_cache", lambda: cache)
+    primary = FakeClient("not an agent")
+    gateway = _gateway(primary, FakeClient("fallback"))
+    gateway.cache_ttl = 60
+
+    for _ in range(2):
+        asyncio.run(gateway.generate("q", cache_if=lambda answer: answer.endswith("_agent")))
+    primary.answer = "rag_agent"
+    for _ in range(2):
+        asyncio.run(gateway.generate("q", cache_if=lambda answer: answer.endswith("_agent")))
+
+    assert primary.calls == 3
+
+
+def test_hedge_losers_are_settled_before_generate_returns(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_DEFAULT_DELAY", 0.05)
+    gateway = _gateway(FakeClient("slow", delay=1.0), FakeClient("fast", delay=0.2), hedging=True)
+
+    async def run():
+        answer = await gateway.generate("q")
+        # No further loop iteration: the cancelled primary must already be done
+        return answer, len(gateway.providers[0].latency.samples)
+
+    assert asyncio.run(run()) == ("fast", 1)
+
+
+class LimitedClient(FakeClient):
+    def __init__(self, limiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    async def generate(self, prompt, **kwargs):
+        async with self.limiter.acquire():
+            return await super().generate(prompt, **kwargs)
+
+
+def test_rate_limit_wait_is_not_counted_as_provider_latency():
+    limiter = ProviderRateLimiter("primary", max_in_flight=1)
+    gateway = _gateway(LimitedClient(limiter, delay=0.01), FakeClient())
+
+    async def run():
+        async def hold_slot():
+            async with limiter.acquire():
+                await asyncio.sleep(0.3)
+
+        holder = asyncio.create_task(hold_slot())
+        await asyncio.sleep(0)
+        answer = await gateway.generate("q")
+        await holder
+        return answer
+
+    assert asyncio.run(run()) == "ok"
+    (latency,) = gateway.providers[0].latency.samples
+    assert latency < 0.2
@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.repositories.mmap_vector_store import MmapVectorStore
+
+
+def _vectors(n, dim=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_search_returns_nearest_ids_best_first(tmp_path):
+    store = MmapVectorStore(str(tmp_path), dim=8, dtype="float32")
+    vecs = _vectors(50)
+    store.append("u1", list(range(1, 51)), vecs)
+
+    hits = store.search("u1", vecs[9], top_k=3)
+
+    assert hits[0][0] == 10
+    assert abs(hits[0][1] - 1.0) < 1e-5
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+    assert store.search("someone-else", vecs[9]) == []
+
+
+def test_appends_are_visible_to_other_readers(tmp_path):
+    writer = MmapVectorStore(str(tmp_path), dim=8)
+    reader = MmapVectorStore(str(tmp_path), dim=8)
+    vecs = _vectors(20)
+
+    writer.append("u1", list(range(1, 11)), vecs[:10])
+    assert len(reader.search("u1", vecs[0], top_k=100)) == 10
+
+    writer.append("u1", list(range(11, 21)), vecs[10:])
+    assert reader.search("u1", vecs[15], top_k=1)[0][0] == 16
+
+
+def test_sync_appends_new_rows_and_rebuilds_after_deletes(tmp_path):
+    class Repo:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def iter_user_vectors(self, user_id, after_id=0):
+            batch = [(i, v) for i, v in self.rows if i > after_id]
+            if batch:
+                yield [i for i, _ in batch], np.stack([v for _, v in batch])
+
+    vecs = _vectors(6)
+    repo = Repo([(i + 1, vecs[i]) for i in range(4)])
+    store = MmapVectorStore(str(tmp_path), dim=8)
+
+    assert store.sync_from(repo, "u1") == 4
+    repo.rows.append((5, vecs[4]))
+    assert store.sync_from(repo, "u1") == 1
+
+    repo.rows = [(5, vecs[4]), (6, vecs[5])]
+    store.sync_from(repo, "u1", rebuild=True)
+    assert sorted(i for i, _ in store.search("u1", vecs[0], top_k=10)) == [5, 6]
+
+
+def test_int8_store_finds_same_neighbour_and_migrates_on_sync(tmp_path):
+    vecs = _vectors(40, dim=8, seed=3)
+    float_store = MmapVectorStore(str(tmp_path), dim=8, dtype="float32")
+    float_store.append("u1", list(range(1, 41)), vecs)
+
+    class Repo:
+        def iter_user_vectors(self, user_id, after_id=0):
+            yield list(range(1, 41)), vecs
+
+    int8_store = MmapVectorStore(str(tmp_path), dim=8, dtype="int8")
+    assert int8_store.compact
+    int8_store.sync_from(Repo(), "u1")  # dtype changed: full rebuild
+
+    assert int8_store.search("u1", vecs[7], top_k=1)[0][0] == 8
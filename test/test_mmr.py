@@ -0,0 +1,25 @@
+import numpy as np
+
+from app.utils.mmr import maximal_marginal_relevance
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 1.0, 0.0])
+    candidates = np.array([
+        [1.0, 0.9, 0.0],   # most relevant
+        [1.0, 0.89, 0.0],  # near-duplicate of the first
+        [0.0, 1.0, 0.1],   # less relevant, different content
+    ])
+
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_with_lambda_one_is_similarity_order():
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(16)
+    candidates = rng.standard_normal((10, 16))
+    unit = candidates / np.linalg.norm(candidates, axis=1, keepdims=True)
+    expected = list(np.argsort(-(unit @ query))[:4])
+
+    assert maximal_marginal_relevance(query, candidates, k=4, lambda_mult=1.0) == expected
+    assert maximal_marginal_relevance(query, [], k=4) == []
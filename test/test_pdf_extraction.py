@@ -0,0 +1,75 @@
+import asyncio
+import os
+import tempfile
+
+from app.services.pdf_extraction import PdfExtractionEngine
+
+
+def _make_pdf(num_pages: int) -> bytes:
+    """Minimal valid PDF whose page i shows the text "Page i"."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i in range(num_pages):
+        content = f"BT /F1 12 Tf 72 720 Td (Page {i}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), num_pages)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def _temp_pdfs():
+    return {name for name in os.listdir(tempfile.gettempdir()) if name.endswith(".pdf")}
+
+
+def test_small_pdf_extracts_in_order_without_pool():
+    engine = PdfExtractionEngine(max_workers=2, pages_per_task=2, min_pages_for_pool=10)
+
+    pages = asyncio.run(engine.extract_pages(_make_pdf(5)))
+
+    assert [p.strip() for p in pages] == [f"Page {i}" for i in range(5)]
+    assert engine._executor is None
+
+
+def test_pool_path_yields_pages_in_order_and_removes_temp_file():
+    engine = PdfExtractionEngine(max_workers=2, pages_per_task=2, min_pages_for_pool=2)
+    before = _temp_pdfs()
+    try:
+        pages = asyncio.run(engine.extract_pages(_make_pdf(7)))
+    finally:
+        engine.shutdown()
+
+    assert [p.strip() for p in pages] == [f"Page {i}" for i in range(7)]
+    assert _temp_pdfs() <= before
+
+
+def test_pool_path_cleans_up_when_consumer_stops_early():
+    engine = PdfExtractionEngine(max_workers=2, pages_per_task=1, min_pages_for_pool=2)
+    before = _temp_pdfs()
+
+    async def first_batch():
+        batches = engine.iter_page_batches(_make_pdf(8))
+        batch = await batches.__anext__()
+        await batches.aclose()
+        return batch
+
+    try:
+        batch = asyncio.run(first_batch())
+    finally:
+        engine.shutdown()
+
+    assert [p.strip() for p in batch] == ["Page 0"]
+    assert _temp_pdfs() <= before
@@ -0,0 +1,23 @@
+import struct
+from app.utils.pg_copy import COPY_SIGNATURE, build_copy_payload, encode_int4, encode_text, encode_vector
+
+
+def test_encode_vector_uses_pgvector_binary_layout():
+    data = encode_vector([1.0, -2.5])
+
+    assert struct.unpack(">HH", data[:4]) == (2, 0)
+    assert struct.unpack(">2f", data[4:]) == (1.0, -2.5)
+
+
+def test_copy_payload_has_header_rows_and_trailer():
+    payload = build_copy_payload(
+        [(7, "chunk", [0.5]), (8, None, [1.0])],
+        [encode_int4, encode_text, encode_vector],
+    ).getvalue()
+
+    assert payload.startswith(COPY_SIGNATURE)
+    assert payload.endswith(struct.pack(">h", -1))
+    # header (11 + 8) then first tuple: field count, int4 id
+    assert struct.unpack(">hii", payload[19:29]) == (3, 4, 7)
+    # NULL text field of the second tuple is encoded as length -1
+    assert struct.pack(">i", -1) in payload
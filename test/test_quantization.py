@@ -0,0 +1,23 @@
+import numpy as np
+
+from app.utils.quantization import dequantize_int8, int8_dot, quantize_int8
+
+
+def test_int8_round_trip_is_close():
+    vecs = np.random.default_rng(0).standard_normal((20, 64)).astype(np.float32)
+
+    codes, scales = quantize_int8(vecs)
+
+    assert codes.dtype == np.int8 and scales.shape == (20,)
+    assert np.abs(dequantize_int8(codes, scales) - vecs).max() <= scales.max() / 2 + 1e-6
+
+
+def test_int8_dot_matches_float_dot():
+    rng = np.random.default_rng(1)
+    vecs = rng.standard_normal((50, 128)).astype(np.float32)
+    query = rng.standard_normal(128).astype(np.float32)
+
+    codes, scales = quantize_int8(vecs)
+
+    np.testing.assert_allclose(int8_dot(codes, scales, query), vecs @ query, atol=0.5)
+    assert np.argmax(int8_dot(codes, scales, query)) == np.argmax(vecs @ query)
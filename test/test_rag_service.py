@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.cache.semantic_cache import SemanticAnswerCache
+from app.repositories.embedding_repository import RetrievedChunk
+from app.services.rag_service import RAGService
+from app.utils.context_packer import ContextPacker
+
+
+class _FakeChatRepo:
+    def __init__(self):
+        self.messages = []
+
+    def get_last_n_messages(self, user_id, n):
+        return list(reversed(self.messages[-n:]))  # newest first
+
+    def save_message(self, user_id, role, message):
+        self.messages.append(SimpleNamespace(role=role, message=message))
+
+
+class _FakeEmbeddingService:
+    async def embed_query(self, text):
+        return np.ones(8, dtype=np.float32)
+
+
+class _FakeRetriever:
+    async def get_relevant_chunks(self, query, query_vector=None, user_id=None):
+        return [RetrievedChunk(1, 1, "A derivative is a rate of change.", filename="calculus.pdf")]
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, user):
+        self.calls += 1
+        return SimpleNamespace(answer=f"answer {self.calls}")
+
+
+def _service():
+    service = RAGService.__new__(RAGService)
+    service.chat_repo = _FakeChatRepo()
+    service.embedding_service = _FakeEmbeddingService()
+    service.retriever = _FakeRetriever()
+    service.llm_client = _FakeLLM()
+    service.memory_size = 7
+    service.answer_cache = SemanticAnswerCache(threshold=0.95)
+    service.packer = ContextPacker(3000, 1000)
+    return service
+
+
+def test_repeated_question_is_answered_from_the_semantic_cache():
+    service = _service()
+
+    first = asyncio.run(service.chat("What is a derivative in calculus?", "u1"))
+    second = asyncio.run(service.chat("What is a derivative in calculus?", "u1"))
+
+    assert first == second == "answer 1"
+    assert service.llm_client.calls == 1
+    assert len(service.chat_repo.messages) == 4  # both exchanges are still recorded
+
+
+def test_follow_up_question_is_not_reused_across_conversation_states():
+    service = _service()
+
+    asyncio.run(service.chat("and the second one?", "u1"))
+    asyncio.run(service.chat("and the second one?", "u1"))
+
+    assert service.llm_client.calls == 2
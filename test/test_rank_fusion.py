@@ -0,0 +1,20 @@
+from app.utils.rank_fusion import reciprocal_rank_fusion
+
+
+def test_items_ranked_well_by_both_lists_win():
+    dense = ["a", "b", "c", "d"]
+    lexical = ["c", "x", "a"]
+
+    fused = [item for item, _ in reciprocal_rank_fusion([dense, lexical], k=60)]
+
+    assert fused[:2] == ["a", "c"]
+    assert set(fused) == {"a", "b", "c", "d", "x"}
+
+
+def test_fusion_matches_items_by_key():
+    dense = [{"id": 1}, {"id": 2}]
+    lexical = [{"id": 2}]
+
+    fused = reciprocal_rank_fusion([dense, lexical], key=lambda item: item["id"])
+
+    assert [item["id"] for item, _ in fused] == [2, 1]
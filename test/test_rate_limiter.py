@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from app.clients.rate_limiter import ProviderRateLimiter, TokenBucket
+
+
+def test_token_bucket_delay_until_refill():
+    now = [0.0]
+    bucket = TokenBucket(rate=10, capacity=10, clock=lambda: now[0])
+    bucket.consume(10)
+
+    assert bucket.delay(5) == 0.5
+    now[0] = 0.5
+    assert bucket.delay(5) == 0.0
+    assert bucket.delay(50) == 0.5  # larger than capacity: waits for a full bucket
+
+
+def test_in_flight_cap_and_fifo_order():
+    limiter = ProviderRateLimiter("test", max_in_flight=2)
+    order, peak = [], [0]
+
+    async def call(i):
+        async with limiter.acquire():
+            order.append(i)
+            peak[0] = max(peak[0], limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call(i) for i in range(6)))
+
+    asyncio.run(run())
+
+    assert order == list(range(6))
+    assert peak[0] == 2
+    assert limiter.stats()["acquired"] == 6 and limiter.stats()["queue_depth"] == 0
+
+
+def test_requests_per_second_spaces_out_calls():
+    limiter = ProviderRateLimiter("test", requests_per_second=20)
+
+    async def run():
+        for _ in range(25):  # 20 burst + 5 paced at 50 ms
+            async with limiter.acquire():
+                pass
+
+    start = time.monotonic()
+    asyncio.run(run())
+
+    assert time.monotonic() - start >= 0.2
+    assert limiter.stats()["max_wait_seconds"] > 0
+
+
+def test_limiter_survives_a_new_event_loop_per_call():
+    # Streamlit runs every action in its own asyncio.run
+    limiter = ProviderRateLimiter("test", max_in_flight=1)
+
+    async def contended():
+        async def call():
+            async with limiter.acquire():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(call(), call(), call())
+
+    asyncio.run(contended())
+    asyncio.run(contended())
+
+    assert limiter.stats()["acquired"] == 6 and limiter.in_flight == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+
+from app.repositories.embedding_repository import RetrievedChunk
+from app.services.rag_service import FileRoutedRetriever, HybridRetriever, MMRRetriever
+
+
+def _vector(i: int) -> np.ndarray:
+    vector = np.zeros(8, dtype=np.float32)
+    vector[i % 8] = 1.0
+    return vector
+
+
+class _FakeRepo:
+    """Records which chunk ids were loaded with their vectors."""
+
+    def __init__(self, lexical_ids):
+        self.db = None
+        self.lexical_ids = lexical_ids
+        self.vector_loads = []
+
+    def get_top_k_lexical(self, query, top_k, user_id=None, with_vectors=False):
+        assert not with_vectors
+        return [RetrievedChunk(i, 1, f"chunk {i}") for i in self.lexical_ids[:top_k]]
+
+    def get_by_ids(self, ids, with_vectors=False):
+        if with_vectors:
+            self.vector_loads.append(list(ids))
+        return [RetrievedChunk(i, 1, f"chunk {i}", embedding=_vector(i) if with_vectors else None) for i in ids]
+
+
+class _FakeDense:
+    def __init__(self, repo, ids):
+        self.embedding_repo = repo
+        self.embedding_service = None
+        self.ids = ids
+
+    async def get_relevant_chunks(self, query, query_vector=None, user_id=None, top_k=5, with_vectors=False):
+        assert not with_vectors
+        return [RetrievedChunk(i, 1, f"chunk {i}", distance=0.1 * rank) for rank, i in enumerate(self.ids[:top_k])]
+
+
+def test_hybrid_loads_vectors_for_fused_top_k_only():
+    repo = _FakeRepo(lexical_ids=[7, 8, 9, 1])
+    hybrid = HybridRetriever(_FakeDense(repo, ids=[1, 2, 3, 4]), top_k=3, candidates=4)
+
+    chunks = asyncio.run(hybrid.get_relevant_chunks("q", np.ones(8), user_id="u1", with_vectors=True))
+
+    assert [c.id for c in chunks] == [1, 7, 2]
+    assert repo.vector_loads == [[1, 7, 2]]
+    assert chunks[0].distance == 0.0
+    assert all(c.embedding is not None for c in chunks)
+
+
+def test_mmr_over_hybrid_loads_each_candidate_vector_once():
+    repo = _FakeRepo(lexical_ids=[10, 11, 12, 13, 14, 15])
+    hybrid = HybridRetriever(_FakeDense(repo, ids=[1, 2, 3, 4, 5, 6]), top_k=3, candidates=6)
+    mmr = MMRRetriever(hybrid, top_k=2, fetch_k=5)
+
+    chunks = asyncio.run(mmr.get_relevant_chunks("q", np.ones(8), user_id="u1"))
+
+    assert len(chunks) == 2
+    # Five fused candidates hydrated in one round trip, not 2 x 6 per-list vectors
+    assert len(repo.vector_loads) == 1
+    assert len(repo.vector_loads[0]) == 5
+
+
+class _RoutingRepo:
+    def __init__(self, routed_ids, flat_ids):
+        self.routed_ids = routed_ids
+        self.flat_ids = flat_ids
+        self.searches = []
+
+    def get_top_k_files(self, query_vector, top_k, user_id):
+        return [4, 2]
+
+    def get_top_k_similar(self, query_vector, top_k, user_id=None, with_vectors=False, file_ids=None):
+        self.searches.append(file_ids)
+        ids = self.routed_ids if file_ids is not None else self.flat_ids
+        return [RetrievedChunk(i, 1, f"chunk {i}") for i in ids[:top_k]]
+
+
+def test_file_routing_falls_back_to_flat_search_when_short():
+    repo = _RoutingRepo(routed_ids=[1], flat_ids=[1, 5, 6])
+    retriever = FileRoutedRetriever(repo, embedding_service=None, top_k=3, top_files=2)
+
+    chunks = asyncio.run(retriever.get_relevant_chunks("q", np.ones(8), user_id="u1"))
+
+    assert [c.id for c in chunks] == [1, 5, 6]
+    assert repo.searches == [[4, 2], None]
+
+
+def test_file_routing_keeps_a_full_routed_result():
+    repo = _RoutingRepo(routed_ids=[1, 2, 3], flat_ids=[1, 5, 6])
+    retriever = FileRoutedRetriever(repo, embedding_service=None, top_k=3, top_files=2)
+
+    chunks = asyncio.run(retriever.get_relevant_chunks("q", np.ones(8), user_id="u1"))
+
+    assert [c.id for c in chunks] == [1, 2, 3]
+    assert repo.searches == [[4, 2]]
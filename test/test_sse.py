@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+from app.utils.sse import answer_events, format_event
+
+
+async def _deltas(parts, fail=False):
+    for part in parts:
+        yield part
+    if fail:
+        raise RuntimeError("provider went away")
+
+
+def _collect(events):
+    async def run():
+        return [frame async for frame in events]
+    return asyncio.run(run())
+
+
+def test_format_event_keeps_newlines_in_one_data_line():
+    frame = format_event({"delta": "line 1\nline 2"}, event="token")
+
+    assert frame.startswith("event: token\ndata: ")
+    assert frame.endswith("\n\n") and frame.count("\n") == 3
+
+
+def test_answer_events_end_with_the_full_answer():
+    frames = _collect(answer_events(_deltas(["Hel", "lo"]), decision="rag_agent"))
+
+    assert [f.split("\n")[0] for f in frames] == ["event: token", "event: token", "event: done"]
+    done = json.loads(frames[-1].split("data: ", 1)[1])
+    assert done == {"answer": "Hello", "decision": "rag_agent"}
+
+
+def test_answer_events_report_failures_in_stream():
+    frames = _collect(answer_events(_deltas(["partial"], fail=True)))
+
+    assert frames[-1].startswith("event: error")
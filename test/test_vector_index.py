@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.exceptions.base_exceptions import ValidationError
+from app.models.embedding import Embedding
+from app.models.file import UploadedFile  # noqa: F401  (resolves the relationship)
+from app.repositories.vector_index import VectorIndexManager
+
+
+def test_hnsw_index_sql_uses_cosine_ops():
+    sql = VectorIndexManager("hnsw").create_index_sql(conn=None)
+
+    assert "USING hnsw (embedding_vector vector_cosine_ops)" in sql
+    assert "ef_construction" in sql
+
+
+def test_similarity_query_binds_the_vector():
+    query = np.ones(1024, dtype=np.float32)
+    stmt = select(Embedding.id).order_by(Embedding.embedding_vector.cosine_distance(query)).limit(5)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+
+    # The vector travels as a parameter; the statement text stays constant
+    assert "<=>" in str(compiled)
+    assert "1.0" not in str(compiled)
+    assert len(compiled.params) == 2
+
+
+class _RecordingSession:
+    """Just enough of a Session to capture the statement a repository method runs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    @property
+    def dialect(self):
+        return postgresql.dialect()
+
+    def execute(self, stmt, *args):
+        self.statements.append(stmt)
+        return _Rows(self.rows)
+
+
+class _Rows(list):
+    def all(self):
+        return list(self)
+
+
+def test_batch_similarity_is_one_lateral_statement():
+    from app.repositories.embedding_repository import EmbeddingRepository
+
+    rows = [(1, 10, 1, "a", 0.1, "f.pdf"), (1, 11, 1, "b", 0.2, "f.pdf"), (3, 12, 2, "c", 0.3, "g.pdf")]
+    session = _RecordingSession(rows)
+    repo = EmbeddingRepository(session)
+    repo.index_manager.precision = "full"
+    repo.index_manager.index_type = "none"
+
+    results = repo.get_top_k_similar_batch([np.ones(1024)] * 3, top_k=2, user_id="u1")
+
+    assert [[c.id for c in hits] for hits in results] == [[10, 11], [], [12]]
+    assert len(session.statements) == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "WITH ORDINALITY AS queries(vector, query_index)" in sql
+    assert "JOIN LATERAL" in sql
+
+
+def test_file_routing_skips_users_with_few_files():
+    from app.repositories.embedding_repository import EmbeddingRepository
+
+    query = np.ones(1024, dtype=np.float32)
+    few = EmbeddingRepository(_RecordingSession([(1,), (2,)]))
+    many = EmbeddingRepository(_RecordingSession([(4,), (2,), (9,)]))
+
+    assert few.get_top_k_files(query, top_k=2, user_id="u1") is None
+    assert many.get_top_k_files(query, top_k=2, user_id="u1") == [4, 2]
+
+
+def test_similarity_search_can_be_limited_to_files():
+    from app.repositories.embedding_repository import EmbeddingRepository
+
+    session = _RecordingSession([])
+    repo = EmbeddingRepository(session)
+    repo.index_manager.precision = "full"
+    repo.index_manager.index_type = "none"
+
+    repo.get_top_k_similar(np.ones(1024), top_k=3, user_id="u1", file_ids=[4, 2])
+
+    sql = str(session.statements[-1].compile(dialect=postgresql.dialect()))
+    assert "embeddings.file_id IN" in sql
+
+
+def _user_scoped_repo(rows=()):
+    from app.repositories.embedding_repository import EmbeddingRepository
+
+    session = _RecordingSession(list(rows))
+    repo = EmbeddingRepository(session)
+    repo.index_manager.precision = "full"
+    repo.index_manager.index_type = "none"
+    return repo, session
+
+
+def _compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_every_search_path_filters_by_user():
+    repo, session = _user_scoped_repo()
+
+    repo.get_top_k_similar(np.ones(1024), top_k=3, user_id="u1")
+    repo.get_top_k_similar_batch([np.ones(1024)], top_k=3, user_id="u1")
+    repo.get_top_k_lexical("derivatives", top_k=3, user_id="u1")
+
+    assert len(session.statements) == 3
+    for stmt in session.statements:
+        assert "embeddings.user_id = " in _compiled(stmt)
+
+
+def test_halfvec_candidates_are_filtered_by_user():
+    repo, session = _user_scoped_repo()
+    repo.index_manager.precision = "halfvec"
+
+    repo.get_top_k_similar(np.ones(1024), top_k=3, user_id="u1")
+    repo.get_top_k_similar_batch([np.ones(1024)], top_k=3, user_id="u1")
+
+    for stmt in session.statements:
+        assert "embeddings.user_id = " in _compiled(stmt)
+
+
+def test_search_without_user_is_rejected():
+    repo, session = _user_scoped_repo()
+
+    with pytest.raises(ValidationError):
+        repo.get_top_k_similar(np.ones(1024), top_k=3, user_id=None)
+    with pytest.raises(ValidationError):
+        repo.get_top_k_similar_batch([np.ones(1024)], top_k=3, user_id=None)
+    with pytest.raises(ValidationError):
+        repo.get_top_k_lexical("derivatives", top_k=3, user_id=None)
+    assert session.statements == []
+
+
+def test_chunk_select_loads_vectors_only_on_request():
+    repo, _ = _user_scoped_repo()
+
+    assert "embedding_vector" not in _compiled(repo._chunk_select())
+    assert "embedding_vector" in _compiled(repo._chunk_select(with_vectors=True))